@@ -0,0 +1,159 @@
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, Response
+
+from airflowapi import configuration
+from airflowapi.constants import *
+
+RETRY_AFTER_HEADER = "Retry-After"
+RATE_LIMIT_OPTION_FORMAT = "{namespace}_rate_limit"
+RATE_LIMIT_BURST_OPTION_FORMAT = "{namespace}_rate_limit_burst"
+MAX_TRACKED_CLIENTS = 10000
+
+RATE_LIMITED_MESSAGE = "Too many requests to the {namespace} endpoints, retry later"
+OVERLOADED_MESSAGE = "Too many expensive requests are in progress, retry later"
+
+HEAVY_REQUEST_CONCURRENCY = configuration.getint("heavy_request_concurrency", 2)
+HEAVY_REQUEST_RETRY_AFTER = configuration.getint("heavy_request_retry_after", 1)
+
+
+class TokenBucket(object):
+    """Allows `rate` requests per second on average, and bursts of up to `capacity` requests"""
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def acquire(self, now):
+        """Take a token, returning 0 when one was available or else the seconds until one will be"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self, now):
+        return self.tokens + (now - self.updated_at) * self.rate >= self.capacity
+
+
+class RateLimiter(object):
+    """Token buckets keyed by client, remembering at most `max_clients` of them"""
+
+    def __init__(self, rate, capacity, max_clients=MAX_TRACKED_CLIENTS, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_clients = max_clients
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client):
+        with self._lock:
+            now = self.clock()
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                if len(self._buckets) >= self.max_clients:
+                    self._forget_idle_clients(now)
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.capacity, now)
+            else:
+                self._buckets.move_to_end(client)
+            return bucket.acquire(now)
+
+    def _forget_idle_clients(self, now):
+        # A client whose bucket refilled behaves exactly like a new client, so it doesn't need to be remembered
+        for client in [client for client, bucket in self._buckets.items() if bucket.is_full(now)]:
+            del self._buckets[client]
+        # When every client is still active, forget the ones that were seen the longest ago
+        while len(self._buckets) >= self.max_clients:
+            self._buckets.popitem(last=False)
+
+
+def _option_name(option_format, namespace_name):
+    return option_format.format(namespace=namespace_name.replace(" ", "_"))
+
+
+def rate_limiter_for_namespace(namespace_name):
+    """The rate limiter configured for a namespace in airflow.cfg, or None when it isn't rate limited"""
+    rate = configuration.getfloat(_option_name(RATE_LIMIT_OPTION_FORMAT, namespace_name), 0)
+    if not rate or rate <= 0:
+        return None
+    capacity = configuration.getfloat(_option_name(RATE_LIMIT_BURST_OPTION_FORMAT, namespace_name), max(1.0, rate))
+    return RateLimiter(rate, capacity)
+
+
+def _rejection(status, message, retry_after):
+    return Response(
+        json.dumps({"message": message}),
+        status=status,
+        mimetype=JSON_MIME_TYPE,
+        headers={RETRY_AFTER_HEADER: str(max(1, int(math.ceil(retry_after))))}
+    )
+
+
+def rate_limit_namespaces(url_prefix, namespace_routes):
+    """Build a before_request hook rate limiting each client per route, at the rate configured for its namespace.
+
+    `namespace_routes` maps the route a namespace is mounted on to its name, requests are attributed to a namespace by
+    the first segment of their path. Every route of a namespace has its own bucket, so cheap lookups don't use up the
+    allowance of expensive listings.
+    """
+    limiters = {}
+    for route, namespace_name in namespace_routes.items():
+        limiter = rate_limiter_for_namespace(namespace_name)
+        if limiter is not None:
+            limiters[route.strip("/")] = (namespace_name, limiter)
+
+    def enforce_rate_limit():
+        if not limiters or not request.path.startswith(url_prefix):
+            return None
+        segment = request.path[len(url_prefix):].strip("/").split("/", 1)[0]
+        if segment not in limiters:
+            return None
+        namespace_name, limiter = limiters[segment]
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        retry_after = limiter.acquire((request.remote_addr, rule))
+        if retry_after:
+            return _rejection(
+                TOO_MANY_REQUESTS_RESPONSE_CODE,
+                RATE_LIMITED_MESSAGE.format(namespace=namespace_name),
+                retry_after
+            )
+        return None
+
+    return enforce_rate_limit
+
+
+_heavy_requests = threading.BoundedSemaphore(HEAVY_REQUEST_CONCURRENCY) if HEAVY_REQUEST_CONCURRENCY > 0 else None
+
+
+def heavy_request(func):
+    """Reject the request straight away when too many expensive requests are already being handled by this process.
+
+    A streamed response is produced after the handler returns, so it holds its slot until the server closes it.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        semaphore = _heavy_requests
+        if semaphore is None:
+            return func(*args, **kwargs)
+        if not semaphore.acquire(blocking=False):
+            return _rejection(SERVICE_UNAVAILABLE_RESPONSE_CODE, OVERLOADED_MESSAGE, HEAVY_REQUEST_RETRY_AFTER)
+        try:
+            response = func(*args, **kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+        if isinstance(response, Response) and response.is_streamed:
+            response.call_on_close(semaphore.release)
+        else:
+            semaphore.release()
+        return response
+    return wrapper
@@ -0,0 +1,316 @@
+"""Serve the API from an asyncio server such as uvicorn, outside of the Airflow webserver.
+
+Requests to the v1 resources are handed to the same Flask blueprint the plugin registers, running on a bounded pool of
+`asgi_worker_threads` threads, so the handlers and their database sessions behave exactly as they do in the
+webserver. Waiting for a DAG run is served natively instead: waiters are coroutines and a single poller looks up every
+watched DAG run with one query per `asgi_wait_poll_interval`, so thousands of idle waiters hold no thread. The wait is
+rate limited like the other routes of the dag runs namespace and recorded in the same metrics, but none of the
+blueprint's other hooks, such as profiling, apply to it.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 8080
+"""
+import asyncio
+import json
+import math
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from flask import Flask
+from sqlalchemy import and_, or_
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, Rule
+from airflow.models import DagRun
+
+from airflowapi import admission, configuration, metrics
+from airflowapi.blueprints import V1_URL_PREFIX
+from airflowapi.constants import *
+from airflowapi.utilities import airflow_sql_alchemy_session
+from airflowapi.v1.api_blueprint import blueprint
+from airflowapi.v1.dag_runs import DAG_RUN_COLUMNS, DAG_RUN_STATE_KEY, NAMESPACE_NAME, dag_run_serializer
+
+WORKER_THREADS = configuration.getint("asgi_worker_threads", 16)
+WAIT_POLL_INTERVAL = configuration.getfloat("asgi_wait_poll_interval", 2.0)
+WAIT_MAX_TIMEOUT = configuration.getfloat("asgi_wait_max_timeout", 300.0)
+WAIT_DEFAULT_TIMEOUT = 30.0
+SPOOLED_BODY_BYTES = 1024 * 1024
+WATCHED_RUNS_PER_QUERY = 500
+
+WAIT_ROUTE = V1_URL_PREFIX + "/dags/<string:dag_id>/dag-runs/<string:run_id>/wait"
+WAIT_ENDPOINT = "wait_for_dag_run"
+TIMEOUT_KEY = "timeout"
+STATE_KEY = "state"
+TIMED_OUT_HEADER = b"x-wait-timed-out"
+DEFAULT_TARGET_STATES = ("success", "failed")
+DAG_RUN_NOT_FOUND_MESSAGE = "DAG Run not found"
+INVALID_TIMEOUT_MESSAGE = "timeout must be a number of seconds between 0 and {maximum}".format(maximum=WAIT_MAX_TIMEOUT)
+
+DAG_RUN_STATE_INDEX = list(DAG_RUN_COLUMNS).index(DAG_RUN_STATE_KEY)
+
+_END = object()
+
+
+class ClientDisconnected(Exception):
+    """The client went away before sending the whole request body"""
+
+
+def fetch_dag_runs(keys):
+    """Return the rows of the DAG runs identified by (dag_id, run_id), looked up through their unique index"""
+    rows = {}
+    with airflow_sql_alchemy_session() as session:
+        for start in range(0, len(keys), WATCHED_RUNS_PER_QUERY):
+            criteria = [and_(DagRun.dag_id == dag_id, DagRun.run_id == run_id)
+                        for dag_id, run_id in keys[start:start + WATCHED_RUNS_PER_QUERY]]
+            for row in session.query(*DAG_RUN_COLUMNS.values()).filter(or_(*criteria)):
+                rows[(row[0], row[1])] = row
+    return rows
+
+
+class DagRunWatcher(object):
+    """Resolve the waiters of DAG runs once the runs reach one of their target states"""
+
+    def __init__(
+            self,
+            executor,
+            poll_interval=WAIT_POLL_INTERVAL, fetch=fetch_dag_runs, state_index=DAG_RUN_STATE_INDEX
+    ):
+        self.executor = executor
+        self.poll_interval = poll_interval
+        self.fetch = fetch
+        self.state_index = state_index
+        self._waiters = {}
+        self._latest_rows = {}
+        self._poller = None
+
+    async def wait(self, dag_id, run_id, states, timeout):
+        """Return the DAG run's row, or None when it doesn't exist, and whether the timeout elapsed first"""
+        loop = asyncio.get_event_loop()
+        key = (dag_id, run_id)
+        row = (await loop.run_in_executor(self.executor, self.fetch, [key])).get(key)
+        if row is None or row[self.state_index] in states:
+            return row, False
+        waiter = (states, loop.create_future())
+        self._waiters.setdefault(key, []).append(waiter)
+        if self._poller is None or self._poller.done():
+            self._poller = loop.create_task(self._poll())
+        try:
+            done, _ = await asyncio.wait([waiter[1]], timeout=timeout)
+            if done:
+                return waiter[1].result(), False
+            return self._latest_rows.get(key, row), True
+        finally:
+            waiters = self._waiters.get(key, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                self._waiters.pop(key, None)
+                self._latest_rows.pop(key, None)
+
+    def stop(self):
+        if self._poller is not None:
+            self._poller.cancel()
+
+    async def _poll(self):
+        loop = asyncio.get_event_loop()
+        while self._waiters:
+            await asyncio.sleep(self.poll_interval)
+            keys = list(self._waiters)
+            if not keys:
+                break
+            try:
+                rows = await loop.run_in_executor(self.executor, self.fetch, keys)
+            except Exception:
+                # The waiters keep waiting, until their timeout at worst, and the next poll tries again
+                continue
+            for key in keys:
+                row = rows.get(key)
+                if key in self._waiters and row is not None:
+                    self._latest_rows[key] = row
+                for states, future in self._waiters.get(key, []):
+                    if not future.done() and (row is None or row[self.state_index] in states):
+                        future.set_result(row)
+
+
+def _json_response(status, value, headers=()):
+    body = json.dumps(value).encode("utf-8")
+    headers = [
+        (b"content-type", JSON_MIME_TYPE.encode("latin-1")),
+        (b"content-length", str(len(body)).encode("latin-1"))
+    ] + list(headers)
+    return status, headers, body
+
+
+class AsgiApplication(object):
+    """An ASGI 3 application running a WSGI application on a bounded thread pool, plus the natively async routes"""
+
+    def __init__(self, wsgi_app, worker_threads=WORKER_THREADS, watcher=None, wait_rate_limiter=None):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=worker_threads)
+        self.watcher = watcher or DagRunWatcher(self.executor)
+        self.wait_rate_limiter = wait_rate_limiter or admission.rate_limiter_for_namespace(NAMESPACE_NAME)
+        self.native_routes = Map([Rule(WAIT_ROUTE, endpoint=WAIT_ENDPOINT, methods=["GET"])])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            adapter = self.native_routes.bind("", path_info=scope["path"], url_scheme=scope.get("scheme", "http"))
+            try:
+                _, arguments = adapter.match(scope["path"], method=scope["method"])
+            except HTTPException:
+                await self._call_wsgi(scope, receive, send)
+            else:
+                await self._serve_wait(scope, send, arguments)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.watcher.stop()
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _send(self, send, status, headers, body):
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _serve_wait(self, scope, send, arguments):
+        started_at = metrics.start_native_request(scope["method"], WAIT_ROUTE)
+        status, size = metrics.EXCEPTION_STATUS, 0
+        try:
+            status, headers, body = self._rate_limit(scope) or await self._wait_for_dag_run(scope, **arguments)
+            size = len(body)
+        finally:
+            metrics.finish_native_request(scope["method"], WAIT_ROUTE, started_at, status, size)
+        await self._send(send, status, headers, body)
+
+    def _rate_limit(self, scope):
+        """The 429 response of a client that waits too often, like the blueprint's limit on the dag runs namespace"""
+        if self.wait_rate_limiter is None:
+            return None
+        retry_after = self.wait_rate_limiter.acquire(((scope.get("client") or ("", 0))[0], WAIT_ROUTE))
+        if not retry_after:
+            return None
+        return _json_response(
+            TOO_MANY_REQUESTS_RESPONSE_CODE,
+            {"message": admission.RATE_LIMITED_MESSAGE.format(namespace=NAMESPACE_NAME)},
+            [(admission.RETRY_AFTER_HEADER.lower().encode("latin-1"),
+              str(max(1, int(math.ceil(retry_after)))).encode("latin-1"))]
+        )
+
+    async def _wait_for_dag_run(self, scope, dag_id, run_id):
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        try:
+            timeout = float(query.get(TIMEOUT_KEY, [WAIT_DEFAULT_TIMEOUT])[0])
+        except ValueError:
+            timeout = -1
+        if not 0 <= timeout <= WAIT_MAX_TIMEOUT:
+            return _json_response(BAD_REQUEST_RESPONSE_CODE, {"message": INVALID_TIMEOUT_MESSAGE})
+        states = set(query.get(STATE_KEY, DEFAULT_TARGET_STATES))
+        row, timed_out = await self.watcher.wait(dag_id, run_id, states, timeout)
+        if row is None:
+            return _json_response(NOT_FOUND_RESPONSE_CODE, {"message": DAG_RUN_NOT_FOUND_MESSAGE})
+        headers = [(TIMED_OUT_HEADER, b"true")] if timed_out else []
+        return _json_response(GET_RESPONSE_SUCCESS_CODE, dag_run_serializer.to_dict(row), headers)
+
+    async def _read_body(self, receive):
+        """Spool the request body, to disk past SPOOLED_BODY_BYTES, so uploads don't have to fit in memory.
+
+        Raises ClientDisconnected when the client goes away first, so a truncated upload is never handled.
+        """
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOLED_BODY_BYTES)
+        more_body = True
+        try:
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    raise ClientDisconnected()
+                body.write(message.get("body", b""))
+                more_body = message.get("more_body", False)
+        except BaseException:
+            body.close()
+            raise
+        body.seek(0)
+        return body
+
+    def _environ(self, scope, body):
+        server_name, server_port = scope.get("server") or ("localhost", 80)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server_name,
+            "SERVER_PORT": str(server_port),
+            "SERVER_PROTOCOL": "HTTP/{version}".format(version=scope.get("http_version", "1.1")),
+            "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": body,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                environ[name] = value
+            else:
+                key = "HTTP_" + name
+                environ[key] = environ[key] + "," + value if key in environ else value
+        return environ
+
+    def _run_wsgi(self, loop, send, environ):
+        """Handle a request on a worker thread, sending each chunk of the response through the event loop.
+
+        Streamed responses are iterated on the thread that started them, since their database sessions belong to it.
+        """
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+            return lambda data: None
+
+        def send_message(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        iterable = self.wsgi_app(environ, start_response)
+        try:
+            iterator = iter(iterable)
+            chunk = next(iterator, _END)
+            send_message({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+            if chunk is _END:
+                send_message({"type": "http.response.body", "body": b""})
+            while chunk is not _END:
+                next_chunk = next(iterator, _END)
+                send_message({"type": "http.response.body", "body": chunk, "more_body": next_chunk is not _END})
+                chunk = next_chunk
+        finally:
+            if hasattr(iterable, "close"):
+                iterable.close()
+
+    async def _call_wsgi(self, scope, receive, send):
+        loop = asyncio.get_event_loop()
+        try:
+            body = await self._read_body(receive)
+        except ClientDisconnected:
+            # Nobody is left to answer
+            return
+        try:
+            await loop.run_in_executor(self.executor, self._run_wsgi, loop, send, self._environ(scope, body))
+        finally:
+            body.close()
+
+
+def create_application(worker_threads=WORKER_THREADS):
+    """Build the Flask application serving the v1 blueprint and wrap it for an ASGI server"""
+    app = Flask(__name__)
+    app.register_blueprint(blueprint)
+    return AsgiApplication(app.wsgi_app, worker_threads=worker_threads)
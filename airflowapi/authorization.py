@@ -0,0 +1,32 @@
+import hmac
+from functools import wraps
+
+from flask import request
+from flask_restplus import abort
+
+from airflowapi import configuration
+from airflowapi.constants import FORBIDDEN_RESPONSE_CODE
+
+ADMIN_TOKEN_HEADER = "X-Airflow-API-Admin-Token"
+ADMIN_TOKEN = configuration.get("admin_token")
+FORBIDDEN_MESSAGE = "This operation requires the {header} header to match the admin_token configured in the " \
+                    "[{section}] section of airflow.cfg".format(
+                        header=ADMIN_TOKEN_HEADER,
+                        section=configuration.SECTION
+                    )
+
+
+def is_admin_request():
+    """Whether the request carries the configured admin token. Admin operations are disabled without a token"""
+    if not ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get(ADMIN_TOKEN_HEADER, ""), ADMIN_TOKEN)
+
+
+def admin_required(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not is_admin_request():
+            abort(FORBIDDEN_RESPONSE_CODE, message=FORBIDDEN_MESSAGE)
+        return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,149 @@
+"""Run long operations in a background thread of the webserver process and record their progress.
+
+Each job's state is a JSON file under the job directory, rewritten atomically as the job progresses, so that its status
+can be read from any webserver process sharing the directory, not only the one running it. The directory is local to a
+host unless it's on shared storage, so a job started on one webserver can't be followed from another by default.
+
+Jobs live and die with the webserver process running them, which gunicorn recycles. A running job rewrites its file
+every `job_heartbeat_interval` seconds, and a running job whose heartbeat is older than `job_heartbeat_timeout` seconds,
+or whose process on this host is gone, is reported as failed.
+"""
+import os
+import re
+import tempfile
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from dateutil.parser import isoparse
+from airflow.logging_config import log
+from airflow.utils import timezone
+
+from airflowapi import configuration
+from airflowapi.serialization import loads
+from airflowapi.utilities import write_json_atomically
+
+JOB_DIRECTORY = configuration.get("job_directory", os.path.join(tempfile.gettempdir(), "airflow_api_jobs"))
+
+JOB_HEARTBEAT_INTERVAL = configuration.getfloat("job_heartbeat_interval", 10)
+JOB_HEARTBEAT_TIMEOUT = configuration.getfloat("job_heartbeat_timeout", 60)
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+ID_KEY = "id"
+KIND_KEY = "kind"
+STATE_KEY = "state"
+PARAMETERS_KEY = "parameters"
+PROGRESS_KEY = "progress"
+ERROR_KEY = "error"
+HOSTNAME_KEY = "hostname"
+PID_KEY = "pid"
+CREATED_AT_KEY = "created_at"
+UPDATED_AT_KEY = "updated_at"
+HEARTBEAT_AT_KEY = "heartbeat_at"
+FINISHED_AT_KEY = "finished_at"
+
+RUNNING_STATE = "running"
+SUCCESS_STATE = "success"
+FAILED_STATE = "failed"
+
+STOPPED_MESSAGE = "The job stopped without finishing, the webserver process running it was probably restarted"
+
+
+def _job_path(job_id):
+    return os.path.join(JOB_DIRECTORY, "{job_id}.json".format(job_id=job_id))
+
+
+def _now():
+    return timezone.utcnow().isoformat()
+
+
+def _is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _has_stopped(job, now=None):
+    """Whether a job recorded as running can't be running anymore"""
+    now = now or timezone.utcnow()
+    heartbeat_at = isoparse(job.get(HEARTBEAT_AT_KEY) or job[UPDATED_AT_KEY])
+    if now - heartbeat_at > timedelta(seconds=JOB_HEARTBEAT_TIMEOUT):
+        return True
+    return job[HOSTNAME_KEY] == os.uname().nodename and not _is_process_alive(job[PID_KEY])
+
+
+def get_job(job_id):
+    """Return the last recorded state of a job, or None when there is no such job"""
+    if not JOB_ID_PATTERN.match(job_id):
+        return None
+    try:
+        with open(_job_path(job_id), "rb") as job_file:
+            job = loads(job_file.read())
+    except FileNotFoundError:
+        return None
+    if job[STATE_KEY] == RUNNING_STATE and _has_stopped(job):
+        job[STATE_KEY] = FAILED_STATE
+        job[ERROR_KEY] = STOPPED_MESSAGE
+    return job
+
+
+def start_job(kind, parameters, target):
+    """Run `target(report_progress)` in a daemon thread and return the job's initial state.
+
+    `target` calls `report_progress` with a JSON serializable value whenever it wants its progress recorded.
+    """
+    now = _now()
+    job = {
+        ID_KEY: uuid.uuid4().hex,
+        KIND_KEY: kind,
+        STATE_KEY: RUNNING_STATE,
+        PARAMETERS_KEY: parameters,
+        PROGRESS_KEY: None,
+        ERROR_KEY: None,
+        HOSTNAME_KEY: os.uname().nodename,
+        PID_KEY: os.getpid(),
+        CREATED_AT_KEY: now,
+        UPDATED_AT_KEY: now,
+        HEARTBEAT_AT_KEY: now,
+        FINISHED_AT_KEY: None
+    }
+    path = _job_path(job[ID_KEY])
+    write_json_atomically(path, job)
+    # Held while the job's state changes and is written, since the heartbeat writes it from another thread
+    lock = threading.Lock()
+    finished = threading.Event()
+
+    def write(**changes):
+        with lock:
+            job.update(changes)
+            job[HEARTBEAT_AT_KEY] = _now()
+            write_json_atomically(path, job)
+
+    def report_progress(progress):
+        write(**{PROGRESS_KEY: progress, UPDATED_AT_KEY: _now()})
+
+    def heartbeat():
+        while not finished.wait(JOB_HEARTBEAT_INTERVAL):
+            write()
+
+    def run():
+        try:
+            target(report_progress)
+            changes = {STATE_KEY: SUCCESS_STATE}
+        except Exception as e:
+            log.error("Job %s failed\n%s", job[ID_KEY], traceback.format_exc())
+            changes = {STATE_KEY: FAILED_STATE, ERROR_KEY: "{type}: {message}".format(type=type(e).__name__, message=e)}
+        finished.set()
+        now = _now()
+        write(**dict(changes, **{FINISHED_AT_KEY: now, UPDATED_AT_KEY: now}))
+
+    name = "airflow-api-job-{id}".format(id=job[ID_KEY])
+    threading.Thread(target=run, name=name, daemon=True).start()
+    threading.Thread(target=heartbeat, name="{name}-heartbeat".format(name=name), daemon=True).start()
+    return dict(job)
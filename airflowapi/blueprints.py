@@ -0,0 +1,26 @@
+import importlib
+
+from flask import Blueprint
+
+V1_URL_PREFIX = "/api/v1"
+V1_BLUEPRINT_NAME = "v1"
+V1_ROUTES_MODULE = "airflowapi.v1.api_blueprint"
+
+
+class LazyBlueprint(Blueprint):
+    """A Blueprint that only imports the module defining its routes when it gets registered on an app.
+
+    Airflow loads plugins in the scheduler and in every task process, but only the webserver registers their
+    blueprints, so the other processes never pay for importing the resources and the Airflow modules they use.
+    """
+
+    def __init__(self, name, import_name, routes_module, **kwargs):
+        super(LazyBlueprint, self).__init__(name, import_name, **kwargs)
+        self.routes_module = routes_module
+
+    def register(self, app, options, first_registration=False):
+        importlib.import_module(self.routes_module)
+        super(LazyBlueprint, self).register(app, options, first_registration)
+
+
+v1_blueprint = LazyBlueprint(V1_BLUEPRINT_NAME, __name__, V1_ROUTES_MODULE, url_prefix=V1_URL_PREFIX)
@@ -0,0 +1,133 @@
+"""Record the changes made through the API to Variables and to the paused state of DAGs, so clients can catch up on them
+without downloading everything again.
+
+Every change appends an entry to the `airflow_api_change_log` table, created on first use, in the transaction making the
+change. Entries older than `change_log_retention` seconds are deleted by the writers, at most once a minute. Readers
+get the latest entry of each Variable or DAG changed after the last entry they have seen, so a key changed many times
+between two reads is only returned once.
+
+Ids are assigned when an entry is inserted, not when its transaction commits, so a reader may see an entry before an
+older one is committed. The cursor handed to readers therefore never moves past entries newer than
+`change_log_commit_lag` seconds: those are returned straight away, and again by the next read.
+"""
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, select
+from airflow import settings
+from airflow.models import ID_LEN
+from airflow.utils import timezone
+from airflow.utils.sqlalchemy import UtcDateTime
+
+from airflowapi import configuration
+
+VARIABLE_KIND = "variable"
+DAG_KIND = "dag"
+
+UPSERTED = "upserted"
+DELETED = "deleted"
+PAUSED = "paused"
+UNPAUSED = "unpaused"
+
+CHANGE_LOG_RETENTION = configuration.getint("change_log_retention", 7 * 24 * 60 * 60)
+CHANGE_LOG_COMMIT_LAG = configuration.getint("change_log_commit_lag", 60)
+COMPACTION_INTERVAL = 60
+
+metadata = MetaData()
+
+change_log = Table(
+    "airflow_api_change_log",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("kind", String(16), nullable=False),
+    Column("key", String(ID_LEN), nullable=False),
+    Column("action", String(16), nullable=False),
+    Column("changed_at", UtcDateTime, nullable=False, index=True)
+)
+
+_table_lock = threading.Lock()
+_table_created = False
+_last_compaction = [None]
+
+
+def _ensure_table():
+    global _table_created
+    if not _table_created:
+        with _table_lock:
+            if not _table_created:
+                change_log.create(bind=settings.engine, checkfirst=True)
+                _table_created = True
+
+
+def _compact(session, now):
+    if _last_compaction[0] is not None and (now - _last_compaction[0]).total_seconds() < COMPACTION_INTERVAL:
+        return
+    _last_compaction[0] = now
+    session.execute(change_log.delete().where(
+        change_log.c.changed_at < now - timedelta(seconds=CHANGE_LOG_RETENTION)
+    ))
+
+
+def record(session, kind, action, keys):
+    """Append an entry for each key to the session's transaction, which the caller commits along with the change"""
+    keys = list(keys)
+    if not keys:
+        return
+    _ensure_table()
+    now = timezone.utcnow()
+    session.execute(change_log.insert(), [
+        {"kind": kind, "key": key, "action": action, "changed_at": now} for key in keys
+    ])
+    _compact(session, now)
+
+
+def _settled_at(now):
+    return (now or timezone.utcnow()) - timedelta(seconds=CHANGE_LOG_COMMIT_LAG)
+
+
+def latest_id(session, now=None):
+    """The id to start following the changes from, the last entry older than the commit lag.
+
+    Entries still waiting for their transaction to commit aren't visible yet, so newer visible entries don't tell where
+    they are: only settled entries can be handed out.
+    """
+    _ensure_table()
+    return session.execute(
+        select([func.max(change_log.c.id)]).where(change_log.c.changed_at <= _settled_at(now))
+    ).scalar() or 0
+
+
+def read_changes(session, after_id, limit, now=None):
+    """Read up to `limit` entries following `after_id`.
+
+    Returns the latest of those entries for each changed key, in the order they were last changed, the id to read from
+    next and whether there may be more entries to read. The id to read from next is the last entry read that is older
+    than the commit lag, so the entries changed more recently are read again along with any entry committed late.
+    """
+    _ensure_table()
+    settled_at = _settled_at(now)
+    entries = session.execute(
+        select([change_log.c.id, change_log.c.kind, change_log.c.key, change_log.c.action, change_log.c.changed_at])
+        .where(change_log.c.id > after_id)
+        .order_by(change_log.c.id)
+        .limit(limit)
+    ).fetchall()
+    latest = OrderedDict()
+    for entry in entries:
+        latest.pop((entry.kind, entry.key), None)
+        latest[(entry.kind, entry.key)] = entry
+    next_id = after_id
+    for entry in entries:
+        if entry.changed_at > settled_at:
+            break
+        next_id = entry.id
+    # Reading on straight away would only return the same unsettled entries, the client has to come back later
+    has_more = len(entries) == limit and next_id == entries[-1].id
+    return list(latest.values()), next_id, has_more
+
+
+def is_expired(issued_at, now=None):
+    """Whether entries written after a token was issued may already have been compacted"""
+    now = now or timezone.utcnow()
+    return issued_at < now - timedelta(seconds=CHANGE_LOG_RETENTION)
@@ -0,0 +1,123 @@
+import zlib
+
+from flask import request
+
+from airflowapi import configuration
+from airflowapi.constants import JSON_MIME_TYPE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_ENCODING = "gzip"
+BROTLI_ENCODING = "br"
+IDENTITY_ENCODING = "identity"
+
+CONTENT_ENCODING_HEADER = "Content-Encoding"
+CONTENT_LENGTH_HEADER = "Content-Length"
+VARY_HEADER = "Vary"
+ACCEPT_ENCODING_HEADER = "Accept-Encoding"
+
+COMPRESSIBLE_MIME_TYPES = {JSON_MIME_TYPE, "application/x-ndjson", "text/plain", "text/html", "text/css",
+                           "application/javascript"}
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+COMPRESSION_ENABLED = configuration.getboolean("compression_enabled", True)
+COMPRESSION_MIN_SIZE = configuration.getint("compression_min_size", 1024)
+GZIP_LEVEL = configuration.getint("compression_gzip_level", 6)
+BROTLI_QUALITY = configuration.getint("compression_brotli_quality", 4)
+
+
+class GzipCompressor(object):
+
+    def __init__(self, level=GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        """Emit everything compressed so far without ending the stream"""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(object):
+
+    def __init__(self, quality=BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+COMPRESSORS = {GZIP_ENCODING: GzipCompressor}
+if brotli is not None:
+    COMPRESSORS[BROTLI_ENCODING] = BrotliCompressor
+
+
+def negotiate_encoding(accept_encodings):
+    """Pick the supported encoding the client prefers, favouring brotli on ties"""
+    best_encoding, best_quality = None, 0
+    for encoding in (BROTLI_ENCODING, GZIP_ENCODING):
+        if encoding not in COMPRESSORS:
+            continue
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def compress_chunks(chunks, compressor):
+    """Compress an iterable of chunks incrementally, flushing after each one so streams aren't held back"""
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if not chunk:
+            continue
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def _is_compressible(response):
+    return (
+        200 <= response.status_code < 300
+        and response.status_code != 204
+        and request.method != "HEAD"
+        and not response.direct_passthrough
+        and CONTENT_ENCODING_HEADER not in response.headers
+        and response.mimetype in COMPRESSIBLE_MIME_TYPES
+    )
+
+
+def compress_response(response):
+    """after_request hook applying the Accept-Encoding negotiated compression to a response"""
+    if not COMPRESSION_ENABLED or not _is_compressible(response):
+        return response
+    response.vary.add(ACCEPT_ENCODING_HEADER)
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    compressor = COMPRESSORS[encoding]()
+    if response.is_streamed:
+        response.response = compress_chunks(response.response, compressor)
+        response.headers.pop(CONTENT_LENGTH_HEADER, None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compressor.compress(data) + compressor.finish())
+    response.headers[CONTENT_ENCODING_HEADER] = encoding
+    return response
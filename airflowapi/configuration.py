@@ -0,0 +1,28 @@
+import os
+
+from airflow.configuration import conf
+
+SECTION = "airflow_api"
+ENVIRONMENT_VARIABLE_FORMAT = "AIRFLOW__{section}__{key}"
+
+
+def has_option(key):
+    # AirflowConfigParser.has_option logs a warning for every missing option, so look the option up without it
+    environment_variable = ENVIRONMENT_VARIABLE_FORMAT.format(section=SECTION.upper(), key=key.upper())
+    return environment_variable in os.environ or super(type(conf), conf).has_option(SECTION, key)
+
+
+def get(key, default=None):
+    return conf.get(SECTION, key) if has_option(key) else default
+
+
+def getint(key, default=None):
+    return conf.getint(SECTION, key) if has_option(key) else default
+
+
+def getfloat(key, default=None):
+    return conf.getfloat(SECTION, key) if has_option(key) else default
+
+
+def getboolean(key, default=None):
+    return conf.getboolean(SECTION, key) if has_option(key) else default
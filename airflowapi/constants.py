@@ -1,14 +1,30 @@
 GET_RESPONSE_SUCCESS_CODE = 200
 POST_RESPONSE_SUCCESS_CODE = 201
+ACCEPTED_RESPONSE_CODE = 202
+MULTI_STATUS_RESPONSE_CODE = 207
 PUT_RESPONSE_SUCCESS_CODE = 204
 DELETE_RESPONSE_SUCCESS_CODE = 204
 NOT_FOUND_RESPONSE_CODE = 404
 BAD_REQUEST_RESPONSE_CODE = 400
+FORBIDDEN_RESPONSE_CODE = 403
 CONFLICT_RESPONSE_CODE = 409
+GONE_RESPONSE_CODE = 410
+UNPROCESSABLE_ENTITY_RESPONSE_CODE = 422
+TOO_MANY_REQUESTS_RESPONSE_CODE = 429
+NOT_IMPLEMENTED_RESPONSE_CODE = 501
+SERVICE_UNAVAILABLE_RESPONSE_CODE = 503
 
 SUCCESS_DESCRIPTION = "Success"
+ACCEPTED_DESCRIPTION = "Accepted"
+MULTI_STATUS_DESCRIPTION = "Multi-Status"
 NOT_FOUND_DESCRIPTION = "Not Found"
 BAD_REQUEST_DESCRIPTION = "Bad Request"
+FORBIDDEN_DESCRIPTION = "Forbidden"
 CONFLICT_DESCRIPTION = "Conflict"
+GONE_DESCRIPTION = "Gone"
+UNPROCESSABLE_ENTITY_DESCRIPTION = "Unprocessable Entity"
+TOO_MANY_REQUESTS_DESCRIPTION = "Too Many Requests"
+NOT_IMPLEMENTED_DESCRIPTION = "Not Implemented"
+SERVICE_UNAVAILABLE_DESCRIPTION = "Service Unavailable"
 
 JSON_MIME_TYPE = "application/json"
@@ -0,0 +1,102 @@
+"""A process-local index of the DAGs known to the metadata database.
+
+Looking a DAG up is a dictionary lookup. The index checks whether the `dag` table changed with one aggregate query at
+most every `dag_index_poll_interval` seconds and reloads it when a DAG was added, removed, paused or unpaused, or when
+it's older than `dag_index_max_staleness` seconds since the marker can't see every change. Changes made through this
+API update the index straight away.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import case, func
+from airflow.models import DagModel
+
+from airflowapi import configuration
+from airflowapi.utilities import airflow_sql_alchemy_session
+
+POLL_INTERVAL = configuration.getfloat("dag_index_poll_interval", 5.0)
+MAX_STALENESS = configuration.getfloat("dag_index_max_staleness", 60.0)
+
+DagEntry = namedtuple("DagEntry", ["dag_id", "is_paused", "fileloc"])
+
+
+def _change_marker(session):
+    """Aggregates over the dag table that change when a DAG is added, removed, paused or unpaused.
+
+    Besides counting the DAGs and the paused ones, the marker sums the lengths of their ids and keeps the first and last
+    id, so pausing one DAG while unpausing another, or replacing a DAG by another, changes it too unless both ids have
+    the same length and neither is the first or last. Those swaps, and changes such as a DAG moving to another file,
+    are picked up within the max staleness. Columns the scheduler writes on every parse, like last_scheduler_run, are
+    left out since they would reload the index on almost every poll.
+    """
+    id_length = func.length(DagModel.dag_id)
+    return tuple(session.query(
+        func.count(DagModel.dag_id),
+        func.sum(case([(DagModel.is_paused, 1)], else_=0)),
+        func.sum(id_length),
+        func.sum(case([(DagModel.is_paused, id_length)], else_=0)),
+        func.min(DagModel.dag_id),
+        func.max(DagModel.dag_id)
+    ).one())
+
+
+class DagIndex(object):
+
+    def __init__(self, poll_interval=POLL_INTERVAL, max_staleness=MAX_STALENESS, clock=time.monotonic):
+        self.poll_interval = poll_interval
+        self.max_staleness = max_staleness
+        self.clock = clock
+        self._entries = {}
+        self._marker = None
+        self._loaded_at = None
+        self._polled_at = None
+        self._refresh_lock = threading.Lock()
+
+    def _load(self, session, marker):
+        rows = session.query(DagModel.dag_id, DagModel.is_paused, DagModel.fileloc).all()
+        self._entries = {row.dag_id: DagEntry(row.dag_id, row.is_paused, row.fileloc) for row in rows}
+        self._marker = marker
+        self._loaded_at = self._polled_at
+
+    def refresh(self, force=False):
+        """Reload the index when the dag table changed. Only one thread polls at a time, the others keep reading"""
+        now = self.clock()
+        if not force and self._polled_at is not None and now - self._polled_at < self.poll_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            self._polled_at = now
+            with airflow_sql_alchemy_session() as session:
+                marker = _change_marker(session)
+                if force or marker != self._marker or now - self._loaded_at >= self.max_staleness:
+                    self._load(session, marker)
+        finally:
+            self._refresh_lock.release()
+
+    def get(self, dag_id):
+        """Return the DAG's entry, or None when the DAG doesn't exist"""
+        self.refresh()
+        entry = self._entries.get(dag_id)
+        if entry is None:
+            # The DAG may have been added since the last poll
+            with airflow_sql_alchemy_session() as session:
+                row = session.query(DagModel.dag_id, DagModel.is_paused, DagModel.fileloc).filter(
+                    DagModel.dag_id == dag_id
+                ).first()
+            if row is not None:
+                entry = self._entries[dag_id] = DagEntry(row.dag_id, row.is_paused, row.fileloc)
+        return entry
+
+    def set_is_paused(self, dag_id, is_paused):
+        entry = self._entries.get(dag_id)
+        if entry is not None:
+            self._entries[dag_id] = entry._replace(is_paused=is_paused)
+
+    def remove(self, *dag_ids):
+        for dag_id in dag_ids:
+            self._entries.pop(dag_id, None)
+
+
+dag_index = DagIndex()
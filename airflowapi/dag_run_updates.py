@@ -0,0 +1,89 @@
+"""Change the state of many DAG runs with UPDATE statements over batches of them.
+
+DAG runs are updated `batch_size` at a time, in the order of their ids, with a commit after every batch so that no
+statement holds locks on the dag_run and task_instance tables that the scheduler uses for long. Their task instances
+follow the DAG runs like they do when a run is marked from the Airflow UI, so no task is left waiting or running under
+a finished run.
+"""
+from collections import OrderedDict
+
+from sqlalchemy import or_
+
+from airflow.models import DagRun, TaskInstance
+from airflow.utils import timezone
+from airflow.utils.state import State
+
+from airflowapi import configuration
+from airflowapi.purge import rows_of_dag_runs
+
+UPDATE_BATCH_SIZE = configuration.getint("dag_run_update_batch_size", 500)
+
+SETTABLE_STATES = [State.SUCCESS, State.FAILED, State.RUNNING]
+FINISHED_STATES = {State.SUCCESS, State.FAILED}
+# Task instances only run again under a DAG run the scheduler still looks at
+CLEARABLE_STATE = State.RUNNING
+
+
+def _is_in_states(column, states):
+    conditions = [column.in_([state for state in states if state is not None])]
+    if None in states:
+        conditions.append(column.is_(None))
+    return or_(*conditions)
+
+
+def _finish_task_instances(session, dag_runs, state):
+    """Mark the task instances of finished DAG runs: every one of them succeeds with a successful run, while a failed
+    run only fails the ones that haven't finished, running ones being told to stop by their heartbeat"""
+    rows = rows_of_dag_runs(TaskInstance, dag_runs)
+    if state == State.SUCCESS:
+        outdated = or_(TaskInstance.state.is_(None), TaskInstance.state != State.SUCCESS)
+    else:
+        outdated = _is_in_states(TaskInstance.state, State.unfinished())
+    return session.query(TaskInstance).filter(rows, outdated).update(
+        {TaskInstance.state: state},
+        synchronize_session=False
+    )
+
+
+def _clear_task_instances(session, dag_runs):
+    """Reset the task instances of the DAG runs so the scheduler runs them again, asking running ones to shut down
+    first, like clearing them from the Airflow UI"""
+    rows = rows_of_dag_runs(TaskInstance, dag_runs)
+    cleared = session.query(TaskInstance).filter(rows, TaskInstance.state != State.RUNNING).update(
+        {TaskInstance.state: None},
+        synchronize_session=False
+    )
+    cleared += session.query(TaskInstance).filter(rows, TaskInstance.state == State.RUNNING).update(
+        {TaskInstance.state: State.SHUTDOWN},
+        synchronize_session=False
+    )
+    return cleared
+
+
+def update_dag_runs(session, criteria, state, clear_task_instances=False, batch_size=UPDATE_BATCH_SIZE):
+    """Set the state of the DAG runs matching the criteria, returning the number of rows updated per table.
+
+    Task instances can only be cleared when the DAG runs are set to CLEARABLE_STATE.
+    """
+    if clear_task_instances and state != CLEARABLE_STATE:
+        raise ValueError("Task instances can only be cleared under {state} DAG runs".format(state=CLEARABLE_STATE))
+    counts = OrderedDict([(DagRun.__tablename__, 0), (TaskInstance.__tablename__, 0)])
+    end_date = timezone.utcnow() if state in FINISHED_STATES else None
+    last_id = 0
+    while True:
+        dag_runs = session.query(DagRun.id, DagRun.dag_id, DagRun.execution_date) \
+            .filter(DagRun.id > last_id, *criteria) \
+            .order_by(DagRun.id) \
+            .limit(batch_size) \
+            .all()
+        if not dag_runs:
+            return counts
+        last_id = dag_runs[-1][0]
+        counts[DagRun.__tablename__] += session.query(DagRun) \
+            .filter(DagRun.id.in_([dag_run_id for dag_run_id, _, _ in dag_runs])) \
+            .update({DagRun._state: state, DagRun.end_date: end_date}, synchronize_session=False)
+        if clear_task_instances:
+            counts[TaskInstance.__tablename__] += _clear_task_instances(session, dag_runs)
+        elif state in FINISHED_STATES:
+            counts[TaskInstance.__tablename__] += _finish_task_instances(session, dag_runs, state)
+        session.commit()
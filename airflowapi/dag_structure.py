@@ -0,0 +1,170 @@
+"""Describe the tasks and dependencies of DAGs without parsing their files on every request.
+
+The DAGs of a file are parsed once per modification of the file and their structure is written as JSON under the cache
+directory, so every webserver process and restart reuses it until the file changes again. Since a DAG can also change
+with the modules, Variables or configuration its file reads, a structure is parsed again once it's older than
+`dag_structure_max_staleness` seconds.
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from airflow import settings
+
+from airflowapi import configuration
+from airflowapi.parse_stats import StatsDagBag
+from airflowapi.serialization import loads
+from airflowapi.utilities import write_json_atomically
+
+CACHE_FORMAT_VERSION = 2
+CACHE_DIRECTORY = configuration.get(
+    "dag_structure_cache_directory",
+    os.path.join(settings.AIRFLOW_HOME, "airflow_api_cache", "dag_structures")
+)
+MAX_STALENESS = configuration.getfloat("dag_structure_max_staleness", 300.0)
+
+DAG_ID_KEY = "dag_id"
+FILE_LOCATION_KEY = "file_location"
+DESCRIPTION_KEY = "description"
+SCHEDULE_INTERVAL_KEY = "schedule_interval"
+START_DATE_KEY = "start_date"
+END_DATE_KEY = "end_date"
+CATCHUP_KEY = "catchup"
+CONCURRENCY_KEY = "concurrency"
+MAX_ACTIVE_RUNS_KEY = "max_active_runs"
+DEFAULT_ARGS_KEY = "default_args"
+TASKS_KEY = "tasks"
+EDGES_KEY = "edges"
+TASK_ID_KEY = "task_id"
+OPERATOR_KEY = "operator"
+OWNER_KEY = "owner"
+POOL_KEY = "pool"
+QUEUE_KEY = "queue"
+RETRIES_KEY = "retries"
+TRIGGER_RULE_KEY = "trigger_rule"
+UPSTREAM_TASK_ID_KEY = "upstream_task_id"
+DOWNSTREAM_TASK_ID_KEY = "downstream_task_id"
+
+_VERSION_KEY = "version"
+_SIGNATURE_KEY = "signature"
+_PARSED_AT_KEY = "parsed_at"
+_DAGS_KEY = "dags"
+
+_parse_lock = threading.Lock()
+_loaded = {}
+
+
+def to_json_value(value):
+    """Convert a DAG attribute to a JSON value. Timedeltas become seconds and unknown objects their repr"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, dict):
+        return {str(key): to_json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_json_value(item) for item in value]
+    return repr(value)
+
+
+def describe_dag(dag, fileloc):
+    tasks = sorted(dag.tasks, key=lambda task: task.task_id)
+    return {
+        DAG_ID_KEY: dag.dag_id,
+        FILE_LOCATION_KEY: fileloc,
+        DESCRIPTION_KEY: dag.description,
+        SCHEDULE_INTERVAL_KEY: to_json_value(dag.schedule_interval),
+        START_DATE_KEY: to_json_value(dag.start_date),
+        END_DATE_KEY: to_json_value(dag.end_date),
+        CATCHUP_KEY: dag.catchup,
+        CONCURRENCY_KEY: dag.concurrency,
+        MAX_ACTIVE_RUNS_KEY: dag.max_active_runs,
+        DEFAULT_ARGS_KEY: to_json_value(dag.default_args),
+        TASKS_KEY: [{
+            TASK_ID_KEY: task.task_id,
+            OPERATOR_KEY: task.task_type,
+            OWNER_KEY: task.owner,
+            POOL_KEY: task.pool,
+            QUEUE_KEY: task.queue,
+            RETRIES_KEY: task.retries,
+            TRIGGER_RULE_KEY: task.trigger_rule
+        } for task in tasks],
+        EDGES_KEY: [{
+            UPSTREAM_TASK_ID_KEY: task.task_id,
+            DOWNSTREAM_TASK_ID_KEY: downstream_task_id
+        } for task in tasks for downstream_task_id in sorted(task.downstream_task_ids)]
+    }
+
+
+def _file_signature(fileloc):
+    stat = os.stat(fileloc)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _cache_path(fileloc):
+    name = hashlib.sha1(os.path.abspath(fileloc).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIRECTORY, "{name}.json".format(name=name))
+
+
+def _is_fresh(parsed_at, now):
+    return not MAX_STALENESS or now - parsed_at < MAX_STALENESS
+
+
+def _read_cache(path, signature, now):
+    """Return when the cached structures were parsed and the structures, or None when they are outdated"""
+    try:
+        with open(path, "rb") as cache_file:
+            cached = loads(cache_file.read())
+    except (OSError, ValueError):
+        return None
+    if cached.get(_VERSION_KEY) != CACHE_FORMAT_VERSION or cached.get(_SIGNATURE_KEY) != signature:
+        return None
+    if not _is_fresh(cached.get(_PARSED_AT_KEY, 0), now):
+        return None
+    return cached[_PARSED_AT_KEY], cached[_DAGS_KEY]
+
+
+def _write_cache(path, signature, parsed_at, structures):
+    write_json_atomically(path, {
+        _VERSION_KEY: CACHE_FORMAT_VERSION,
+        _SIGNATURE_KEY: signature,
+        _PARSED_AT_KEY: parsed_at,
+        _DAGS_KEY: structures
+    })
+
+
+def _parse(fileloc):
+    dag_bag = StatsDagBag(dag_folder=fileloc, include_examples=False)
+    return {dag_id: describe_dag(dag, fileloc) for dag_id, dag in dag_bag.dags.items()}
+
+
+def file_structures(fileloc):
+    """Return the structure of every DAG defined in a file, keyed by DAG id"""
+    signature = _file_signature(fileloc)
+    now = time.time()
+    loaded = _loaded.get(fileloc)
+    if loaded is not None and loaded[0] == signature and _is_fresh(loaded[1], now):
+        return loaded[2]
+    path = _cache_path(fileloc)
+    cached = _read_cache(path, signature, now)
+    if cached is None:
+        with _parse_lock:
+            cached = _read_cache(path, signature, now)
+            if cached is None:
+                cached = now, _parse(fileloc)
+                _write_cache(path, signature, *cached)
+    parsed_at, structures = cached
+    _loaded[fileloc] = (signature, parsed_at, structures)
+    return structures
+
+
+def get_dag_structure(dag_id, fileloc):
+    """Return the structure of a DAG, or None when its file doesn't exist or doesn't define it anymore"""
+    try:
+        return file_structures(fileloc).get(dag_id)
+    except FileNotFoundError:
+        return None
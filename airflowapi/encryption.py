@@ -0,0 +1,28 @@
+"""Encrypt and decrypt Variable and Connection values in bulk.
+
+Airflow's models look the Fernet key up for every value they read or write. These helpers take the Fernet returned by
+`get_fernet` once, so a bulk path can handle its rows as plain tuples.
+"""
+from airflow.models import get_fernet
+
+try:
+    from cryptography.fernet import InvalidToken
+except ImportError:
+    InvalidToken = ValueError
+
+
+def encrypt(fernet, value):
+    """Return the value to store and whether it's encrypted, as `Variable.set_val` would"""
+    if not value:
+        return None, False
+    return fernet.encrypt(value.encode("utf-8")).decode("utf-8"), fernet.is_encrypted
+
+
+def decrypt(fernet, stored_value, is_encrypted):
+    """Return the plain value, or None when it can't be decrypted with the configured key"""
+    if not stored_value or not is_encrypted:
+        return stored_value
+    try:
+        return fernet.decrypt(stored_value.encode("utf-8")).decode("utf-8")
+    except (InvalidToken, AttributeError):
+        return None
@@ -0,0 +1,146 @@
+"""Probe the services the API depends on for `GET /health?deep=true`.
+
+Each probe reports its status and how long it took. Only the webserver's own dependencies, the database and the DAGs
+folder, fail the check. The scheduler and the connection pool only warn, since a load balancer acting on them would
+take every webserver out when the scheduler is down or under normal load.
+
+The results are cached for `health_check_cache_seconds` so a load balancer checking every instance often doesn't add to
+the load on the metadata database, and concurrent checks that find the cache empty wait for one run of the probes
+instead of each running them.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from airflow import settings
+from airflow.jobs import BaseJob, SchedulerJob
+from airflow.utils import timezone
+
+from airflowapi import configuration
+from airflowapi.caching import TTLCache
+from airflowapi.utilities import airflow_sql_alchemy_session
+
+CACHE_SECONDS = configuration.getfloat("health_check_cache_seconds", 5.0)
+POOL_SATURATION_THRESHOLD = configuration.getfloat("health_check_pool_saturation_threshold", 1.0)
+SCHEDULER_HEARTBEAT_THRESHOLD = configuration.getfloat("health_check_scheduler_heartbeat_threshold", 60.0)
+
+OK_STATUS = "ok"
+WARNING_STATUS = "warning"
+FAILED_STATUS = "failed"
+RESULTS_KEY = "checks"
+
+_results = TTLCache(maxsize=1, ttl=CACHE_SECONDS)
+_probe_lock = threading.Lock()
+_probe_engines = {}
+
+
+class ProbeFailure(Exception):
+    pass
+
+
+class ProbeWarning(Exception):
+    pass
+
+
+def _probe_engine():
+    # Connects outside the pool, so an exhausted pool can't hold the probe lock for pool_timeout seconds
+    url = settings.engine.url
+    if url not in _probe_engines:
+        _probe_engines[url] = create_engine(url, poolclass=NullPool)
+    return _probe_engines[url]
+
+
+def check_database():
+    with _probe_engine().connect() as connection:
+        connection.execute(text("SELECT 1")).scalar()
+    return {}
+
+
+def check_pool():
+    """Report how many pooled connections are checked out, warning once as many as the pool size are"""
+    pool = settings.engine.pool
+    if not hasattr(pool, "checkedout") or not pool.size():
+        return {"pool": type(pool).__name__}
+    details = OrderedDict([
+        ("size", pool.size()),
+        ("checked_out", pool.checkedout()),
+        ("saturation", round(pool.checkedout() / pool.size(), 3))
+    ])
+    if details["saturation"] >= POOL_SATURATION_THRESHOLD:
+        raise ProbeWarning("The connection pool is saturated", details)
+    return details
+
+
+def check_dags_folder():
+    if not os.access(settings.DAGS_FOLDER, os.R_OK | os.X_OK):
+        raise ProbeFailure("The DAGs folder isn't readable", {"path": settings.DAGS_FOLDER})
+    return OrderedDict([("path", settings.DAGS_FOLDER), ("entries", len(os.listdir(settings.DAGS_FOLDER)))])
+
+
+def check_scheduler():
+    """Report the age of the latest scheduler heartbeat, served by the job table's job_type_heart index"""
+    with airflow_sql_alchemy_session() as session:
+        latest_heartbeat = session.query(BaseJob.latest_heartbeat) \
+            .filter(BaseJob.job_type == SchedulerJob.__name__) \
+            .order_by(BaseJob.latest_heartbeat.desc()) \
+            .limit(1) \
+            .scalar()
+    if latest_heartbeat is None:
+        raise ProbeWarning("No scheduler heartbeat was recorded", {})
+    details = {"heartbeat_age_seconds": round((timezone.utcnow() - latest_heartbeat).total_seconds(), 3)}
+    if details["heartbeat_age_seconds"] > SCHEDULER_HEARTBEAT_THRESHOLD:
+        raise ProbeWarning("The scheduler heartbeat is older than {} seconds".format(SCHEDULER_HEARTBEAT_THRESHOLD),
+                           details)
+    return details
+
+
+# The pool is probed first so its usage isn't skewed by the database probe
+PROBES = [
+    ("pool", check_pool),
+    ("database", check_database),
+    ("dags_folder", check_dags_folder),
+    ("scheduler", check_scheduler),
+]
+
+
+def run_probe(probe):
+    started = time.perf_counter()
+    try:
+        result = OrderedDict([("status", OK_STATUS)])
+        result.update(probe())
+    except ProbeWarning as warning:
+        message, details = warning.args
+        result = OrderedDict([("status", WARNING_STATUS), ("warning", message)])
+        result.update(details)
+    except ProbeFailure as failure:
+        message, details = failure.args
+        result = OrderedDict([("status", FAILED_STATUS), ("error", message)])
+        result.update(details)
+    except Exception as error:
+        result = OrderedDict([("status", FAILED_STATUS), ("error", "{}: {}".format(type(error).__name__, error))])
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def run_probes(probes=PROBES):
+    return OrderedDict((name, run_probe(probe)) for name, probe in probes)
+
+
+def deep_health():
+    """Return the cached probe results, running the probes when they've expired"""
+    results = _results.get(RESULTS_KEY)
+    if results is None:
+        with _probe_lock:
+            results = _results.get(RESULTS_KEY)
+            if results is None:
+                results = run_probes()
+                _results.set(RESULTS_KEY, results)
+    return results
+
+
+def is_healthy(results):
+    """Whether no probe failed. Warnings leave the webserver healthy"""
+    return all(result["status"] != FAILED_STATUS for result in results.values())
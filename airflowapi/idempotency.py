@@ -0,0 +1,274 @@
+"""Replay the response of a POST request when it is retried with the same Idempotency-Key header.
+
+The first request with a key claims it by inserting a row into the `airflow_api_idempotency_key` table, which is shared
+by every webserver, and stores its response there once it's handled. Retries of a finished request get the stored
+response, served from an in-process LRU cache after the first lookup. Retries of a request still being handled get a 409
+and reusing a key for a different request gets a 422. The body is part of what makes two requests the same: uploads
+that their handler streams are hashed while they're spooled, to disk past SPOOLED_BODY_BYTES, and the handler reads the
+spooled copy.
+"""
+import hashlib
+import json
+import tempfile
+import threading
+from datetime import timedelta
+
+from flask import g, request, Response
+from werkzeug.wsgi import get_input_stream
+from sqlalchemy import Column, Integer, LargeBinary, MetaData, String, Table, Text, and_
+from sqlalchemy.exc import IntegrityError
+from airflow import settings
+from airflow.utils import timezone
+from airflow.utils.sqlalchemy import UtcDateTime
+
+from airflowapi import configuration
+from airflowapi.caching import TTLCache
+from airflowapi.constants import *
+from airflowapi.utilities import airflow_sql_alchemy_session
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENT_METHODS = {"POST"}
+MAX_KEY_LENGTH = 255
+REQUEST_STATE_KEY = "_airflow_api_idempotency"
+SPOOLED_BODY_STATE_KEY = "_airflow_api_idempotency_body"
+# The Content-Type is hashed without its parameters, since multipart boundaries change with every attempt
+FINGERPRINT_HEADERS = ["Content-Encoding"]
+SPOOLED_BODY_BYTES = 1024 * 1024
+READ_SIZE = 64 * 1024
+BOUNDARY_MARKER = b"\0boundary\0"
+
+IDEMPOTENCY_KEY_TTL = configuration.getint("idempotency_key_ttl", 24 * 60 * 60)
+IDEMPOTENCY_CLAIM_TIMEOUT = configuration.getint("idempotency_claim_timeout", 5 * 60)
+IDEMPOTENCY_CACHE_SIZE = configuration.getint("idempotency_cache_size", 1024)
+PURGE_INTERVAL = 60
+
+INVALID_KEY_MESSAGE = "The {header} header must be at most {length} characters".format(
+    header=IDEMPOTENCY_KEY_HEADER,
+    length=MAX_KEY_LENGTH
+)
+KEY_IN_USE_MESSAGE = "A request with this {header} is still being handled".format(header=IDEMPOTENCY_KEY_HEADER)
+KEY_REUSED_MESSAGE = "This {header} was already used for a different request".format(header=IDEMPOTENCY_KEY_HEADER)
+
+metadata = MetaData()
+
+idempotency_keys = Table(
+    "airflow_api_idempotency_key",
+    metadata,
+    Column("idempotency_key", String(MAX_KEY_LENGTH), primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("created_at", UtcDateTime, nullable=False, index=True),
+    Column("status_code", Integer),
+    Column("mimetype", String(255)),
+    Column("headers", Text),
+    Column("body", LargeBinary)
+)
+
+_responses = TTLCache(IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_KEY_TTL)
+_table_lock = threading.Lock()
+_table_created = False
+_last_purge = [None]
+
+
+class StoredResponse(object):
+
+    def __init__(self, fingerprint, status_code, mimetype, headers, body):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.mimetype = mimetype
+        self.headers = headers
+        self.body = body
+
+    def to_response(self):
+        headers = dict(self.headers)
+        headers[REPLAYED_HEADER] = "true"
+        return Response(self.body, status=self.status_code, mimetype=self.mimetype, headers=headers)
+
+
+def _ensure_table():
+    global _table_created
+    if not _table_created:
+        with _table_lock:
+            if not _table_created:
+                idempotency_keys.create(bind=settings.engine, checkfirst=True)
+                _table_created = True
+
+
+def _hash_without_boundary(digest, chunks, boundary):
+    """Hash chunks of a body with every occurrence of the boundary replaced by BOUNDARY_MARKER"""
+    pending = b""
+    for chunk in chunks:
+        parts = (pending + chunk).split(boundary) if boundary else [pending + chunk]
+        for part in parts[:-1]:
+            digest.update(part)
+            digest.update(BOUNDARY_MARKER)
+        # A boundary split across chunks can only start within the last len(boundary) - 1 bytes
+        keep = max(len(boundary) - 1, 0)
+        pending = parts[-1][max(len(parts[-1]) - keep, 0):] if keep else b""
+        digest.update(parts[-1][:len(parts[-1]) - len(pending)])
+    digest.update(pending)
+
+
+def _spool_body(digest):
+    """Hash the body while copying it to a spooled file, which the handler then reads in place of the request's input"""
+    boundary = request.mimetype_params.get("boundary", "").encode("latin-1")
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOLED_BODY_BYTES)
+    setattr(g, SPOOLED_BODY_STATE_KEY, body)
+    # before_request hooks run before anything reads the body, so the input stream hasn't been wrapped yet
+    stream = get_input_stream(request.environ)
+
+    def chunks():
+        for chunk in iter(lambda: stream.read(READ_SIZE), b""):
+            body.write(chunk)
+            yield chunk
+
+    _hash_without_boundary(digest, chunks(), boundary)
+    body.seek(0)
+    request.environ["wsgi.input"] = body
+
+
+def request_fingerprint():
+    """Hash everything that makes a retry the same request as the original one"""
+    digest = hashlib.sha256()
+    for part in [request.method, request.path, request.query_string.decode("utf-8"), request.mimetype] + \
+            [request.headers.get(header, "") for header in FINGERPRINT_HEADERS]:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    if request.mimetype == JSON_MIME_TYPE:
+        digest.update(request.get_data(cache=True))
+    else:
+        # Uploads such as DAG files and variable imports are streamed by their handler, so they aren't read in memory
+        _spool_body(digest)
+    return digest.hexdigest()
+
+
+def _rejection(status, message):
+    return Response(json.dumps({"message": message}), status=status, mimetype=JSON_MIME_TYPE)
+
+
+def _stored_response(row):
+    return StoredResponse(row.fingerprint, row.status_code, row.mimetype, json.loads(row.headers or "{}"), row.body)
+
+
+def _purge_expired(session, now):
+    if _last_purge[0] is not None and (now - _last_purge[0]).total_seconds() < PURGE_INTERVAL:
+        return
+    _last_purge[0] = now
+    session.execute(idempotency_keys.delete().where(
+        idempotency_keys.c.created_at < now - timedelta(seconds=IDEMPOTENCY_KEY_TTL)
+    ))
+    session.commit()
+
+
+def _claim(session, key, fingerprint, now):
+    """Insert the key's row, returning None when this request now owns the key or the existing row otherwise"""
+    try:
+        session.execute(idempotency_keys.insert().values(
+            idempotency_key=key,
+            fingerprint=fingerprint,
+            created_at=now
+        ))
+        session.commit()
+        return None
+    except IntegrityError:
+        session.rollback()
+    return session.execute(
+        idempotency_keys.select().where(idempotency_keys.c.idempotency_key == key)
+    ).first()
+
+
+def _is_abandoned(row, now):
+    age = (now - row.created_at).total_seconds()
+    if row.status_code is None:
+        return age > IDEMPOTENCY_CLAIM_TIMEOUT
+    return age > IDEMPOTENCY_KEY_TTL
+
+
+def claim_request():
+    """before_request hook replaying stored responses and claiming the keys of new requests"""
+    key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+    if not key or request.method not in IDEMPOTENT_METHODS:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        return _rejection(BAD_REQUEST_RESPONSE_CODE, INVALID_KEY_MESSAGE)
+    fingerprint = request_fingerprint()
+
+    stored = _responses.get(key)
+    if stored is None:
+        _ensure_table()
+        now = timezone.utcnow()
+        with airflow_sql_alchemy_session() as session:
+            _purge_expired(session, now)
+            row = _claim(session, key, fingerprint, now)
+            if row is not None and _is_abandoned(row, now):
+                # The request that claimed the key died or its response expired, so the key is free again
+                session.execute(idempotency_keys.delete().where(idempotency_keys.c.idempotency_key == key))
+                session.commit()
+                row = _claim(session, key, fingerprint, now)
+        if row is None:
+            setattr(g, REQUEST_STATE_KEY, (key, fingerprint))
+            return None
+        if row.fingerprint != fingerprint:
+            return _rejection(UNPROCESSABLE_ENTITY_RESPONSE_CODE, KEY_REUSED_MESSAGE)
+        if row.status_code is None:
+            return _rejection(CONFLICT_RESPONSE_CODE, KEY_IN_USE_MESSAGE)
+        stored = _stored_response(row)
+        _responses.set(key, stored)
+
+    if stored.fingerprint != fingerprint:
+        return _rejection(UNPROCESSABLE_ENTITY_RESPONSE_CODE, KEY_REUSED_MESSAGE)
+    return stored.to_response()
+
+
+def _release(key):
+    with airflow_sql_alchemy_session() as session:
+        session.execute(idempotency_keys.delete().where(and_(
+            idempotency_keys.c.idempotency_key == key,
+            idempotency_keys.c.status_code.is_(None)
+        )))
+        session.commit()
+
+
+def _is_retryable(response):
+    return response.status_code >= 500 or response.status_code == TOO_MANY_REQUESTS_RESPONSE_CODE
+
+
+def store_response(response):
+    """after_request hook saving the response of a request that claimed a key.
+
+    Responses asking the client to retry aren't stored, the claim is released so the retry is handled again. Neither are
+    streamed responses, which can't be read without consuming them.
+    """
+    state = getattr(g, REQUEST_STATE_KEY, None)
+    if state is None:
+        return response
+    setattr(g, REQUEST_STATE_KEY, None)
+    key, fingerprint = state
+    if _is_retryable(response) or response.is_streamed:
+        _release(key)
+        return response
+    body = response.get_data()
+    headers = {name: value for name, value in response.headers.items()
+               if name.lower() not in ("content-type", "content-length")}
+    with airflow_sql_alchemy_session() as session:
+        session.execute(idempotency_keys.update().where(idempotency_keys.c.idempotency_key == key).values(
+            status_code=response.status_code,
+            mimetype=response.mimetype,
+            headers=json.dumps(headers),
+            body=body
+        ))
+        session.commit()
+    _responses.set(key, StoredResponse(fingerprint, response.status_code, response.mimetype, headers, body))
+    return response
+
+
+def release_request(exception=None):
+    """teardown_request hook freeing the key of a request that failed before producing a response"""
+    body = getattr(g, SPOOLED_BODY_STATE_KEY, None)
+    if body is not None:
+        setattr(g, SPOOLED_BODY_STATE_KEY, None)
+        body.close()
+    state = getattr(g, REQUEST_STATE_KEY, None)
+    if state is not None:
+        setattr(g, REQUEST_STATE_KEY, None)
+        _release(state[0])
@@ -0,0 +1,94 @@
+"""Explain which of a table's indexes can serve a query, without touching the database.
+
+The report is built from the indexes and constraints SQLAlchemy knows the table has, so it doesn't need a migration or
+a database specific EXPLAIN. It flags queries whose filters can't use any index and would scan the whole table.
+"""
+from sqlalchemy import UniqueConstraint
+
+PRIMARY_KEY_NAME = "primary key"
+UNIQUE_NAME_FORMAT = "unique ({columns})"
+
+FULL_SCAN_WARNING = "No index starts with a filtered column, every row of {table} is read"
+UNFILTERED_WARNING = "No filter is applied, every row of {table} is read"
+RESIDUAL_FILTER_WARNING = "Filtering on {column} isn't served by {index}, matching rows are checked one by one"
+UNSORTED_WARNING = "Sorting by {columns} isn't served by an index, every matching row is sorted before the first " \
+                   "page is returned"
+
+
+def table_indexes(table):
+    """List the name and columns of every index of the table, including those backing its constraints"""
+    primary_key = [column.name for column in table.primary_key.columns]
+    indexes = [(table.primary_key.name or PRIMARY_KEY_NAME, primary_key)] if primary_key else []
+    unique_constraints = []
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            columns = [column.name for column in constraint.columns]
+            name = constraint.name or UNIQUE_NAME_FORMAT.format(columns=", ".join(columns))
+            unique_constraints.append((name, columns))
+    indexes.extend(sorted(unique_constraints))
+    indexes.extend(sorted((index.name, [column.name for column in index.columns]) for index in table.indexes))
+    return indexes
+
+
+def matched_prefix(index_columns, equality_columns, range_columns):
+    """The leading index columns a query can seek on: equality filters, then at most one range filter"""
+    matched = []
+    for column in index_columns:
+        if column in equality_columns:
+            matched.append(column)
+        else:
+            if column in range_columns:
+                matched.append(column)
+            break
+    return matched
+
+
+def serves_sort(index_columns, equality_columns, sort_columns):
+    remaining = list(index_columns)
+    while remaining and remaining[0] in equality_columns and remaining[0] not in sort_columns:
+        remaining.pop(0)
+    return bool(sort_columns) and remaining[:len(sort_columns)] == list(sort_columns)
+
+
+def index_report(table, equality_columns=(), range_columns=(), sort_columns=()):
+    """Report the index best suited to the filters of a query and whether its sort can be read off an index.
+
+    `equality_columns` are filtered with = or IN, `range_columns` with comparisons or a LIKE prefix.
+    """
+    equality_columns, range_columns = list(equality_columns), list(range_columns)
+    filtered_columns = equality_columns + [column for column in range_columns if column not in equality_columns]
+    indexes = []
+    for name, columns in table_indexes(table):
+        indexes.append({
+            "name": name,
+            "columns": columns,
+            "matched_columns": matched_prefix(columns, equality_columns, range_columns),
+            "serves_sort": serves_sort(columns, equality_columns, sort_columns)
+        })
+    best = max(indexes, key=lambda index: len(index["matched_columns"]), default=None)
+    if best is not None and not best["matched_columns"]:
+        best = None
+
+    warnings = []
+    if not filtered_columns:
+        warnings.append(UNFILTERED_WARNING.format(table=table.name))
+    elif best is None:
+        warnings.append(FULL_SCAN_WARNING.format(table=table.name))
+    else:
+        for column in filtered_columns:
+            if column not in best["matched_columns"]:
+                warnings.append(RESIDUAL_FILTER_WARNING.format(column=column, index=best["name"]))
+    sorted_by_index = any(index["serves_sort"] for index in indexes)
+    if sort_columns and not sorted_by_index:
+        warnings.append(UNSORTED_WARNING.format(columns=", ".join(sort_columns)))
+
+    return {
+        "table": table.name,
+        "filters": filtered_columns,
+        "sort": list(sort_columns),
+        "index": best["name"] if best is not None else None,
+        "full_scan": best is None,
+        "sorted_by_index": sorted_by_index,
+        "indexes": indexes,
+        "warnings": warnings
+    }
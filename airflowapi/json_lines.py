@@ -0,0 +1,84 @@
+"""Read and write JSON Lines streams a bounded chunk at a time."""
+import json
+import zlib
+
+from airflowapi.compression import GZIP_WBITS
+from airflowapi.serialization import loads
+
+READ_SIZE = 64 * 1024
+LINE_SEPARATOR = b"\n"
+
+
+class InvalidLineError(ValueError):
+
+    def __init__(self, line_number, reason):
+        super(InvalidLineError, self).__init__("Line {line_number} {reason}".format(
+            line_number=line_number,
+            reason=reason
+        ))
+        self.line_number = line_number
+
+
+class InvalidGzipError(ValueError):
+
+    def __init__(self, reason):
+        super(InvalidGzipError, self).__init__("The gzipped data {reason}".format(reason=reason))
+
+
+def read_chunks(stream, read_size=READ_SIZE):
+    return iter(lambda: stream.read(read_size), b"")
+
+
+def gunzip_chunks(chunks, read_size=READ_SIZE):
+    """Decompress gzipped chunks, never inflating more than `read_size` bytes at once.
+
+    Raises InvalidGzipError when the data is corrupt or ends before the end of the gzip stream.
+    """
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    try:
+        for chunk in chunks:
+            data = decompressor.decompress(chunk, read_size)
+            while data:
+                yield data
+                data = decompressor.decompress(decompressor.unconsumed_tail, read_size)
+        data = decompressor.flush()
+    except zlib.error as error:
+        raise InvalidGzipError("is corrupt: {error}".format(error=error))
+    if data:
+        yield data
+    if not decompressor.eof:
+        raise InvalidGzipError("is truncated")
+
+
+def iter_lines(chunks, max_line_bytes):
+    """Split chunks of bytes into lines, refusing lines longer than `max_line_bytes`"""
+    pending = b""
+    line_number = 0
+    for chunk in chunks:
+        lines = (pending + chunk).split(LINE_SEPARATOR)
+        pending = lines.pop()
+        for line in lines:
+            line_number += 1
+            yield line_number, line
+        if len(pending) > max_line_bytes:
+            raise InvalidLineError(line_number + 1, "is longer than {max} bytes".format(max=max_line_bytes))
+    if pending:
+        yield line_number + 1, pending
+
+
+def iter_objects(chunks, max_line_bytes):
+    """Decode each non blank line as a JSON object, yielding it with its line number"""
+    for line_number, line in iter_lines(chunks, max_line_bytes):
+        if not line.strip():
+            continue
+        try:
+            value = loads(line)
+        except ValueError:
+            raise InvalidLineError(line_number, "isn't valid JSON")
+        if not isinstance(value, dict):
+            raise InvalidLineError(line_number, "isn't a JSON object")
+        yield line_number, value
+
+
+def dumps_line(value):
+    return json.dumps(value, separators=(",", ":")) + "\n"
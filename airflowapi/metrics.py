@@ -0,0 +1,155 @@
+import os
+import time
+
+from flask import g, request
+
+from airflowapi.query_tracking import start_tracking, current_query_log
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+METRICS_PREFIX = "airflow_api"
+MULTIPROCESS_DIRECTORY_VARIABLES = ["PROMETHEUS_MULTIPROC_DIR", "prometheus_multiproc_dir"]
+REQUEST_STATE_KEY = "_airflow_api_metrics"
+UNMATCHED_ENDPOINT = "unmatched"
+EXCEPTION_STATUS = 500
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUEST_LABELS = ["method", "endpoint"]
+
+
+class _RequestState(object):
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started_at = time.perf_counter()
+        self.recorded = False
+
+
+def _metric_name(name):
+    return "{prefix}_{name}".format(prefix=METRICS_PREFIX, name=name)
+
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = prometheus_client.Histogram(
+        _metric_name("request_duration_seconds"),
+        "Time spent handling requests",
+        REQUEST_LABELS,
+        buckets=LATENCY_BUCKETS
+    )
+    RESPONSES = prometheus_client.Counter(
+        _metric_name("responses_total"),
+        "Responses sent by status code",
+        REQUEST_LABELS + ["status"]
+    )
+    REQUESTS_IN_PROGRESS = prometheus_client.Gauge(
+        _metric_name("requests_in_progress"),
+        "Requests currently being handled",
+        REQUEST_LABELS,
+        multiprocess_mode="livesum"
+    )
+    RESPONSE_SIZE = prometheus_client.Histogram(
+        _metric_name("response_size_bytes"),
+        "Size of the response bodies sent, after compression. Streamed responses are not counted",
+        REQUEST_LABELS,
+        buckets=SIZE_BUCKETS
+    )
+    DB_QUERIES = prometheus_client.Counter(
+        _metric_name("db_queries_total"),
+        "SQL statements run against the metadata database",
+        REQUEST_LABELS
+    )
+    DB_QUERY_TIME = prometheus_client.Histogram(
+        _metric_name("request_db_duration_seconds"),
+        "Time spent running SQL statements per request",
+        REQUEST_LABELS,
+        buckets=LATENCY_BUCKETS
+    )
+
+
+def metrics_enabled():
+    return prometheus_client is not None
+
+
+def _multiprocess_directory():
+    for variable in MULTIPROCESS_DIRECTORY_VARIABLES:
+        if os.environ.get(variable):
+            return os.environ[variable]
+    return None
+
+
+def _endpoint():
+    return request.url_rule.rule if request.url_rule is not None else UNMATCHED_ENDPOINT
+
+
+def start_request():
+    """before_request hook starting the measurements of a request"""
+    if not metrics_enabled():
+        return
+    state = _RequestState(_endpoint())
+    setattr(g, REQUEST_STATE_KEY, state)
+    start_tracking()
+    REQUESTS_IN_PROGRESS.labels(request.method, state.endpoint).inc()
+
+
+def _record(state, status, response=None):
+    state.recorded = True
+    labels = (request.method, state.endpoint)
+    REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - state.started_at)
+    RESPONSES.labels(*(labels + (str(status),))).inc()
+    if response is not None and not response.is_streamed and response.content_length is not None:
+        RESPONSE_SIZE.labels(*labels).observe(response.content_length)
+    query_log = current_query_log()
+    if query_log is not None:
+        DB_QUERIES.labels(*labels).inc(query_log.count)
+        DB_QUERY_TIME.labels(*labels).observe(query_log.total_seconds)
+
+
+def record_response(response):
+    """after_request hook recording the outcome of a request"""
+    state = getattr(g, REQUEST_STATE_KEY, None)
+    if state is not None:
+        _record(state, response.status_code, response)
+    return response
+
+
+def finish_request(exception=None):
+    """teardown_request hook, also recording requests that failed before producing a response"""
+    state = getattr(g, REQUEST_STATE_KEY, None)
+    if state is None:
+        return
+    if not state.recorded:
+        _record(state, EXCEPTION_STATUS)
+    REQUESTS_IN_PROGRESS.labels(request.method, state.endpoint).dec()
+
+
+def start_native_request(method, endpoint):
+    """Start measuring a request served outside of Flask, returning when it started"""
+    if metrics_enabled():
+        REQUESTS_IN_PROGRESS.labels(method, endpoint).inc()
+    return time.perf_counter()
+
+
+def finish_native_request(method, endpoint, started_at, status, size):
+    """Record the outcome of a request served outside of Flask"""
+    if not metrics_enabled():
+        return
+    REQUEST_LATENCY.labels(method, endpoint).observe(time.perf_counter() - started_at)
+    RESPONSES.labels(method, endpoint, str(status)).inc()
+    RESPONSE_SIZE.labels(method, endpoint).observe(size)
+    REQUESTS_IN_PROGRESS.labels(method, endpoint).dec()
+
+
+def generate_metrics():
+    """Render the metrics in the Prometheus text format, aggregated across processes when running multiprocess"""
+    if _multiprocess_directory() is not None:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry)
@@ -0,0 +1,115 @@
+"""Keep how long each DAG file took to parse, how many DAGs it defines and its import error, from every parse this API
+makes, so slow or broken files can be found without parsing the DAGs folder again.
+
+The statistics of every file are kept in a single JSON file, `parse_stats_path`, as one array per file. It is rewritten
+atomically after each parse, dropping the files that don't exist anymore, and read back only when it changed. Writers
+hold an exclusive lock on `parse_stats_path`.lock while they merge their statistics, so the webserver's processes don't
+overwrite each other's.
+"""
+import fcntl
+import heapq
+import os
+import threading
+import time
+
+from airflow import settings
+from airflow.models import DagBag
+
+from airflowapi import configuration
+from airflowapi.serialization import loads
+from airflowapi.utilities import write_json_atomically
+
+STORE_FORMAT_VERSION = 1
+STORE_PATH = configuration.get(
+    "parse_stats_path",
+    os.path.join(settings.AIRFLOW_HOME, "airflow_api_cache", "parse_stats.json")
+)
+
+LOCK_SUFFIX = ".lock"
+
+_VERSION_KEY = "version"
+_FILES_KEY = "files"
+
+# Positions of the values in the array stored for each file
+DURATION = 0
+DAG_COUNT = 1
+IMPORT_ERROR = 2
+PARSED_AT = 3
+
+_store_lock = threading.Lock()
+_loaded = [None, {}]
+
+
+class StatsDagBag(DagBag):
+    """A DagBag recording the parse statistics of the files it processes once it's done collecting them"""
+
+    def __init__(self, *args, **kwargs):
+        self.file_stats = {}
+        super(StatsDagBag, self).__init__(*args, **kwargs)
+        record(self.file_stats)
+
+    def process_file(self, filepath, *args, **kwargs):
+        started = time.perf_counter()
+        found_dags = super(StatsDagBag, self).process_file(filepath, *args, **kwargs)
+        self.file_stats[filepath] = [
+            round(time.perf_counter() - started, 6),
+            len(found_dags),
+            self.import_errors.get(filepath),
+            round(time.time(), 3)
+        ]
+        return found_dags
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def load(path=None):
+    """Return the stored statistics keyed by file, read from disk only when the store changed since the last read"""
+    path = path or STORE_PATH
+    try:
+        signature = _signature(path)
+    except FileNotFoundError:
+        return {}
+    if _loaded[0] == signature:
+        return _loaded[1]
+    files = _read(path)
+    if files is None:
+        return {}
+    _loaded[0], _loaded[1] = signature, files
+    return files
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as store_file:
+            stored = loads(store_file.read())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        return None
+    return stored.get(_FILES_KEY, {}) if stored.get(_VERSION_KEY) == STORE_FORMAT_VERSION else {}
+
+
+def record(file_stats, path=None):
+    """Merge the statistics of freshly parsed files into the store"""
+    path = path or STORE_PATH
+    if not file_stats:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _store_lock, open(path + LOCK_SUFFIX, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            # Read straight from disk, another process may have written the store within the same mtime tick
+            files = _read(path) or {}
+            files.update(file_stats)
+            files = {fileloc: stats for fileloc, stats in files.items() if os.path.exists(fileloc)}
+            write_json_atomically(path, {_VERSION_KEY: STORE_FORMAT_VERSION, _FILES_KEY: files})
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def slowest(limit, path=None):
+    """Return (file, statistics) pairs of the `limit` files that took the longest to parse, slowest first"""
+    return heapq.nlargest(limit, load(path).items(), key=lambda item: item[1][DURATION])
@@ -0,0 +1,139 @@
+import cProfile
+import io
+import os
+import re
+import tempfile
+import time
+import uuid
+
+from flask import g, request, Response
+from airflow.logging_config import log
+
+from airflowapi import configuration
+from airflowapi.authorization import is_admin_request
+from airflowapi.query_tracking import start_tracking
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    SamplingProfiler = None
+
+PROFILE_PARAMETER = "_profile"
+PROFILE_HEADER = "X-Airflow-API-Profile"
+PROFILE_ARTIFACT_HEADER = "X-Airflow-API-Profile-Artifact"
+PROFILE_QUERIES_HEADER = "X-Airflow-API-Profile-Queries"
+PROFILER_KEY = "_airflow_api_profiler"
+
+RETURN_ARTIFACT_VALUE = "return"
+ENABLED_VALUES = {"1", "true", "yes", RETURN_ARTIFACT_VALUE}
+ARTIFACT_MIME_TYPE = "application/octet-stream"
+
+PROFILE_DIRECTORY = configuration.get(
+    "profile_directory",
+    os.path.join(tempfile.gettempdir(), "airflow_api_profiles")
+)
+
+
+class _CProfileProfiler(object):
+    extension = "pstats"
+
+    def __init__(self):
+        self._profiler = cProfile.Profile()
+
+    def start(self):
+        self._profiler.enable()
+
+    def stop(self):
+        self._profiler.disable()
+
+    def write(self, path):
+        self._profiler.dump_stats(path)
+
+
+class _SamplingProfiler(object):
+    extension = "speedscope.json"
+
+    def __init__(self):
+        self._profiler = SamplingProfiler()
+
+    def start(self):
+        self._profiler.start()
+
+    def stop(self):
+        self._profiler.stop()
+
+    def write(self, path):
+        with io.open(path, "w", encoding="utf-8") as artifact:
+            artifact.write(self._profiler.output(renderer=SpeedscopeRenderer()))
+
+
+def _profile_mode():
+    value = request.args.get(PROFILE_PARAMETER) or request.headers.get(PROFILE_HEADER)
+    if value is None or value.lower() not in ENABLED_VALUES:
+        return None
+    return value.lower()
+
+
+def _artifact_path(extension):
+    endpoint = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-")
+    # The unique suffix keeps concurrent profiles of one endpoint from overwriting each other
+    name = "{timestamp}-{pid}-{endpoint}-{unique}.{extension}".format(
+        timestamp=time.strftime("%Y%m%dT%H%M%S"),
+        pid=os.getpid(),
+        endpoint=endpoint,
+        unique=uuid.uuid4().hex[:12],
+        extension=extension
+    )
+    return os.path.join(PROFILE_DIRECTORY, name)
+
+
+def start_profiling():
+    """before_request hook profiling the request when an admin asks for it"""
+    mode = _profile_mode()
+    if mode is None or not is_admin_request():
+        return
+    profiler = _SamplingProfiler() if SamplingProfiler is not None else _CProfileProfiler()
+    setattr(g, PROFILER_KEY, (profiler, mode, start_tracking(record_statements=True)))
+    profiler.start()
+
+
+def _log_queries(query_log):
+    log.info("%s %s ran %d SQL statements in %.2fms", request.method, request.path, query_log.count,
+             query_log.total_seconds * 1000)
+    for index, (statement, parameters, seconds) in enumerate(query_log.statements):
+        log.info("SQL statement %d took %.2fms: %s %s", index, seconds * 1000, statement, parameters)
+
+
+def finish_profiling(response):
+    """after_request hook storing the profile of the request, or returning it instead of the response"""
+    profiled = getattr(g, PROFILER_KEY, None)
+    if profiled is None:
+        return response
+    profiler, mode, query_log = profiled
+    setattr(g, PROFILER_KEY, None)
+    profiler.stop()
+    os.makedirs(PROFILE_DIRECTORY, exist_ok=True)
+    path = _artifact_path(profiler.extension)
+    profiler.write(path)
+    _log_queries(query_log)
+    log.info("Stored the profile of %s %s at %s", request.method, request.path, path)
+    if mode == RETURN_ARTIFACT_VALUE:
+        with open(path, "rb") as artifact:
+            response = Response(
+                artifact.read(),
+                status=response.status_code,
+                mimetype=ARTIFACT_MIME_TYPE,
+                headers={"Content-Disposition": "attachment; filename={}".format(os.path.basename(path))}
+            )
+    response.headers[PROFILE_ARTIFACT_HEADER] = os.path.basename(path)
+    response.headers[PROFILE_QUERIES_HEADER] = str(query_log.count)
+    return response
+
+
+def abandon_profiling(exception=None):
+    """teardown_request hook making sure a request that failed doesn't leave its profiler running"""
+    profiled = getattr(g, PROFILER_KEY, None)
+    if profiled is not None:
+        setattr(g, PROFILER_KEY, None)
+        profiled[0].stop()
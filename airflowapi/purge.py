@@ -0,0 +1,179 @@
+"""Delete the metadata rows of DAGs in small transactions.
+
+Rows are removed in batches of at most `batch_size` values of each table's batch column, with a commit after every
+batch, so that no statement holds locks on the metadata tables that the scheduler and the other endpoints use for long.
+"""
+import os
+import time
+from collections import OrderedDict
+
+from sqlalchemy import and_, func, or_
+from airflow import models, settings
+from airflow.models import DagModel, DagRun, DagStat, Log, SlaMiss, TaskFail, TaskInstance, XCom
+from airflow.logging_config import log
+from airflow.utils.state import State
+
+from airflowapi import configuration
+
+PURGE_BATCH_SIZE = configuration.getint("purge_batch_size", 1000)
+PURGE_SLEEP_SECONDS = configuration.getfloat("purge_sleep_seconds", 0.0)
+DAG_ID_CHUNK_SIZE = 100
+
+OUTSIDE_DAGS_FOLDER_REASON = "The file is outside the DAGs folder"
+SHARED_FILE_REASON = "The file also defines DAGs that weren't selected: {dag_ids}"
+
+# Tables are purged in this order, rows referencing others first and the DAG itself last. A table with a surrogate key
+# is batched by it, the others by execution date so a batch removes the rows of a bounded number of runs
+PURGED_TABLES = [
+    (TaskInstance, TaskInstance.execution_date),
+    (XCom, XCom.id),
+    (Log, Log.id),
+    (SlaMiss, SlaMiss.execution_date),
+    (TaskFail, TaskFail.id),
+    (DagRun, DagRun.id),
+    (DagStat, DagStat.state),
+    (DagModel, DagModel.dag_id)
+]
+# Rows belonging to a DAG run, by the DAG id and execution date they share with it
+DAG_RUN_ROWS = [TaskInstance, XCom]
+# Batch columns whose values repeat across DAGs, so their batches are only bounded when taken one DAG at a time
+PER_DAG_BATCH_COLUMNS = {TaskInstance.execution_date, SlaMiss.execution_date}
+
+# Only in Airflow releases that reschedule sensors
+if hasattr(models, "TaskReschedule"):
+    PURGED_TABLES.insert(1, (models.TaskReschedule, models.TaskReschedule.id))
+    DAG_RUN_ROWS.insert(1, models.TaskReschedule)
+
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def delete_in_batches(session, model, batch_column, criteria, batch_size=PURGE_BATCH_SIZE, sleep_seconds=0):
+    """Delete the rows of `model` matching `criteria` one batch at a time, committing each batch"""
+    deleted = 0
+    while True:
+        batch = [row[0] for row in session.query(batch_column).filter(*criteria).distinct().limit(batch_size)]
+        if not batch:
+            return deleted
+        deleted += session.query(model).filter(batch_column.in_(batch), *criteria).delete(synchronize_session=False)
+        session.commit()
+        log.info("Deleted %s rows from %s so far", deleted, model.__tablename__)
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
+
+
+def purge_dag_rows(session, dag_ids, batch_size=PURGE_BATCH_SIZE):
+    """Delete every metadata row of the DAGs, returning the number of rows removed per table"""
+    counts = OrderedDict((model.__tablename__, 0) for model, _ in PURGED_TABLES)
+    for model, batch_column in PURGED_TABLES:
+        chunk_size = 1 if batch_column in PER_DAG_BATCH_COLUMNS else DAG_ID_CHUNK_SIZE
+        for chunk in _chunks(list(dag_ids), chunk_size):
+            counts[model.__tablename__] += delete_in_batches(
+                session,
+                model,
+                batch_column,
+                [model.dag_id.in_(chunk)],
+                batch_size
+            )
+    log.info("Purged the rows of %s DAGs: %s", len(dag_ids), dict(counts))
+    return counts
+
+
+def _is_in_folder(path, folder):
+    path, folder = os.path.realpath(path), os.path.realpath(folder)
+    return os.path.commonpath([path, folder]) == folder
+
+
+def remove_dag_files(session, dags, dags_folder=None):
+    """Unlink the files defining DAGs given as (dag_id, fileloc) pairs.
+
+    Only files in the DAGs folder whose DAGs were all given are removed. Returns the removed files, and the skipped
+    ones mapped to the reason they were kept.
+    """
+    dags_folder = dags_folder or settings.DAGS_FOLDER
+    selected = set(dag_id for dag_id, _ in dags)
+    filelocs = sorted(set(fileloc for _, fileloc in dags if fileloc))
+    unselected = OrderedDict()
+    for chunk in _chunks(filelocs, DAG_ID_CHUNK_SIZE):
+        for dag_id, fileloc in session.query(DagModel.dag_id, DagModel.fileloc).filter(DagModel.fileloc.in_(chunk)):
+            if dag_id not in selected:
+                unselected.setdefault(fileloc, []).append(dag_id)
+    removed, skipped = [], OrderedDict()
+    for fileloc in filelocs:
+        if not _is_in_folder(fileloc, dags_folder):
+            skipped[fileloc] = OUTSIDE_DAGS_FOLDER_REASON
+        elif fileloc in unselected:
+            skipped[fileloc] = SHARED_FILE_REASON.format(dag_ids=", ".join(sorted(unselected[fileloc])))
+        else:
+            try:
+                os.unlink(fileloc)
+                removed.append(fileloc)
+            except FileNotFoundError:
+                pass
+    return removed, skipped
+
+
+def _expired_dag_runs(cutoff, dag_id=None):
+    """Criteria of the DAG runs older than the cutoff. Running DAG runs are left to the scheduler"""
+    criteria = [DagRun.execution_date < cutoff, or_(DagRun._state.is_(None), DagRun._state != State.RUNNING)]
+    if dag_id is not None:
+        criteria.append(DagRun.dag_id == dag_id)
+    return criteria
+
+
+def rows_of_dag_runs(model, dag_runs):
+    """Criteria of the rows of `model` belonging to DAG runs given as (id, dag_id, execution_date) tuples"""
+    execution_dates = OrderedDict()
+    for _, dag_id, execution_date in dag_runs:
+        execution_dates.setdefault(dag_id, []).append(execution_date)
+    return or_(*[
+        and_(model.dag_id == dag_id, model.execution_date.in_(dates)) for dag_id, dates in execution_dates.items()
+    ])
+
+
+def _dag_run_counts():
+    return OrderedDict((model.__tablename__, 0) for model in [DagRun] + DAG_RUN_ROWS)
+
+
+def count_dag_runs_before(session, cutoff, dag_id=None):
+    """Count the rows that purging the DAG runs older than the cutoff would delete"""
+    criteria = _expired_dag_runs(cutoff, dag_id)
+    counts = _dag_run_counts()
+    counts[DagRun.__tablename__] = session.query(func.count(DagRun.id)).filter(*criteria).scalar()
+    for model in DAG_RUN_ROWS:
+        counts[model.__tablename__] = session.query(func.count()).select_from(model).join(
+            DagRun,
+            and_(model.dag_id == DagRun.dag_id, model.execution_date == DagRun.execution_date)
+        ).filter(*criteria).scalar()
+    return counts
+
+
+def purge_dag_runs_before(session, cutoff, dag_id=None, batch_size=PURGE_BATCH_SIZE, sleep_seconds=0,
+                          report_progress=None):
+    """Delete the DAG runs older than the cutoff with their task instances and XComs, `batch_size` runs at a time"""
+    criteria = _expired_dag_runs(cutoff, dag_id)
+    counts = _dag_run_counts()
+    while True:
+        dag_runs = session.query(DagRun.id, DagRun.dag_id, DagRun.execution_date).filter(*criteria).order_by(
+            DagRun.id
+        ).limit(batch_size).all()
+        if not dag_runs:
+            break
+        for model in DAG_RUN_ROWS:
+            counts[model.__tablename__] += session.query(model).filter(
+                rows_of_dag_runs(model, dag_runs)
+            ).delete(synchronize_session=False)
+        counts[DagRun.__tablename__] += session.query(DagRun).filter(
+            DagRun.id.in_([dag_run_id for dag_run_id, _, _ in dag_runs])
+        ).delete(synchronize_session=False)
+        session.commit()
+        log.info("Purged DAG runs before %s: %s", cutoff, dict(counts))
+        if report_progress is not None:
+            report_progress(counts)
+        if len(dag_runs) < batch_size:
+            break
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
+    return counts
@@ -0,0 +1,64 @@
+import time
+
+from flask import g, has_app_context
+from sqlalchemy import event
+
+QUERY_LOG_KEY = "_airflow_api_query_log"
+QUERY_START_TIMES_KEY = "_airflow_api_query_start_times"
+
+_tracked_engines = set()
+
+
+class QueryLog(object):
+    """The SQL statements run while handling a single request"""
+
+    def __init__(self, record_statements=False):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.record_statements = record_statements
+        self.statements = []
+
+    def add(self, statement, parameters, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        if self.record_statements:
+            self.statements.append((statement, parameters, seconds))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(QUERY_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get(QUERY_START_TIMES_KEY)
+    if not start_times:
+        return
+    seconds = time.perf_counter() - start_times.pop()
+    query_log = current_query_log()
+    if query_log is not None:
+        query_log.add(statement, parameters, seconds)
+
+
+def install(engine):
+    """Listen to the statements run through an engine, only once per engine"""
+    if id(engine) in _tracked_engines:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _tracked_engines.add(id(engine))
+
+
+def start_tracking(record_statements=False):
+    """Attribute the statements run from now on in the current app context to the current request"""
+    query_log = getattr(g, QUERY_LOG_KEY, None)
+    if query_log is None:
+        query_log = QueryLog(record_statements)
+        setattr(g, QUERY_LOG_KEY, query_log)
+    query_log.record_statements = query_log.record_statements or record_statements
+    return query_log
+
+
+def current_query_log():
+    if not has_app_context():
+        return None
+    return getattr(g, QUERY_LOG_KEY, None)
@@ -0,0 +1,101 @@
+import json
+from datetime import date
+
+from flask_restplus import fields
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_SEPARATORS = (",", ":")
+ARRAY_START = "["
+ARRAY_SEPARATOR = ","
+ARRAY_END = "]"
+DEFAULT_CHUNK_SIZE = 1000
+
+_serializers = {}
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _is_date_field(field):
+    field_class = field if isinstance(field, type) else type(field)
+    return issubclass(field_class, (fields.DateTime, fields.Date))
+
+
+def _compile_row_to_dict(keys, date_keys, offset, convert_dates):
+    """Generate a function building the response object of a row without looping over the fields per row"""
+    items = []
+    for index, key in enumerate(keys):
+        value = "row[{index}]".format(index=index + offset)
+        if convert_dates and key in date_keys:
+            value = "_isoformat({value})".format(value=value)
+        items.append("{key!r}: {value}".format(key=key, value=value))
+    source = "lambda row: {{{items}}}".format(items=", ".join(items))
+    return eval(compile(source, "<row serializer>", "eval"), {"_isoformat": _isoformat})
+
+
+class RowSerializer(object):
+    """Encodes row tuples, whose values are in the same order as `keys`, to JSON following an api.model"""
+
+    def __init__(self, model, keys=None, offset=0):
+        self.keys = list(keys) if keys is not None else list(model.keys())
+        date_keys = {key for key in self.keys if _is_date_field(model[key])}
+        self.to_dict = _compile_row_to_dict(self.keys, date_keys, offset, convert_dates=True)
+        self._to_native_dict = _compile_row_to_dict(self.keys, date_keys, offset, convert_dates=False)
+
+    def _dumps(self, objects, native_objects):
+        if orjson is not None:
+            try:
+                return orjson.dumps(native_objects())
+            except orjson.JSONEncodeError:
+                # orjson doesn't know every tzinfo implementation, let isoformat handle those
+                pass
+        return json.dumps(objects(), separators=JSON_SEPARATORS)
+
+    def dumps(self, rows):
+        rows = rows if isinstance(rows, list) else list(rows)
+        return self._dumps(
+            lambda: [self.to_dict(row) for row in rows],
+            lambda: [self._to_native_dict(row) for row in rows]
+        )
+
+    def dumps_one(self, row):
+        return self._dumps(lambda: self.to_dict(row), lambda: self._to_native_dict(row))
+
+    def iter_dumps(self, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Encode rows as a JSON array incrementally, for use as the body of a streamed response"""
+        yield ARRAY_START
+        chunk = []
+        first = True
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield self._encode_chunk(chunk, first)
+                chunk = []
+                first = False
+        if chunk:
+            yield self._encode_chunk(chunk, first)
+        yield ARRAY_END
+
+    def _encode_chunk(self, chunk, first):
+        encoded = self.dumps(chunk)
+        if isinstance(encoded, bytes):
+            encoded = encoded.decode("utf-8")
+        return ("" if first else ARRAY_SEPARATOR) + encoded[1:-1]
+
+
+def get_serializer(model, keys=None, offset=0):
+    """Return the compiled serializer for a model, building it on first use"""
+    cache_key = (model.name, tuple(keys) if keys is not None else None, offset)
+    serializer = _serializers.get(cache_key)
+    if serializer is None:
+        serializer = _serializers[cache_key] = RowSerializer(model, keys, offset)
+    return serializer
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
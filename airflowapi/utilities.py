@@ -1,6 +1,10 @@
 import contextlib
+import json
+import os
+import tempfile
 from airflow import settings
-from airflow.models import DagModel
+
+LIKE_ESCAPE = "\\"
 
 
 @contextlib.contextmanager
@@ -13,7 +17,31 @@ def airflow_sql_alchemy_session():
 
 
 def check_for_dag_id(dag_id):
-    with airflow_sql_alchemy_session() as session:
-        return session.query(DagModel).filter(
-            DagModel.dag_id == dag_id
-        ).first()
+    """Return the DAG's dag_id, is_paused and fileloc, or None when the DAG doesn't exist"""
+    # Imported here since the index queries through airflow_sql_alchemy_session
+    from airflowapi.dag_index import dag_index
+    return dag_index.get(dag_id)
+
+
+def escape_like(value):
+    """Escape the LIKE wildcards in a value, to be used with `escape=LIKE_ESCAPE`"""
+    return value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+
+def like_pattern_from_glob(pattern):
+    """Translate a glob using * and ? to a LIKE pattern, to be used with `escape=LIKE_ESCAPE`"""
+    return escape_like(pattern).replace("*", "%").replace("?", "_")
+
+
+def write_json_atomically(path, value):
+    """Write a JSON file so that readers see either its previous or its new content, never a partial write"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w") as json_file:
+            json.dump(value, json_file, separators=(",", ":"))
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
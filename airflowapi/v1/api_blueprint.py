@@ -1,19 +1,26 @@
 
-from flask import Blueprint
 from airflowapi.version import version
 from flask_restplus import Api
+from airflow import settings
 from airflow.www.app import csrf
+from airflowapi import admission, idempotency, metrics, profiling, query_tracking
+from airflowapi.compression import compress_response
+from airflowapi.blueprints import v1_blueprint as blueprint, V1_URL_PREFIX as URL_PREFIX, \
+    V1_BLUEPRINT_NAME as BLUEPRINT_NAME
 
-URL_PREFIX = "/api/v1"
-BLUEPRINT_NAME = "v1"
 DOCUMENTATION_ROUTE = "/doc"
 HEALTH_ROUTE = "/health"
 VARIABLES_RESOURCE_ROUTE = '/variables'
 DAGS_RESOURCE_ROUTE = "/dags"
 DAG_RUNS_RESOURCE_ROUTE = "/dag-runs"
 DAG_FILES_RESOURCE_ROUTE = "/files"
+TASK_INSTANCES_RESOURCE_ROUTE = "/task-instances"
+METRICS_ROUTE = "/metrics"
+MAINTENANCE_RESOURCE_ROUTE = "/maintenance"
+POOLS_RESOURCE_ROUTE = "/pools"
+CONNECTIONS_RESOURCE_ROUTE = "/connections"
+CHANGES_RESOURCE_ROUTE = "/changes"
 
-blueprint = Blueprint(BLUEPRINT_NAME, __name__, url_prefix=URL_PREFIX)
 csrf.exempt(blueprint)
 
 
@@ -23,6 +30,25 @@ def record_params(setup_state):
     app.config["ERROR_404_HELP"] = False
 
 
+@blueprint.record_once
+def track_queries(setup_state):
+    query_tracking.install(settings.engine)
+
+
+blueprint.before_request(metrics.start_request)
+blueprint.before_request(profiling.start_profiling)
+blueprint.teardown_request(metrics.finish_request)
+blueprint.teardown_request(profiling.abandon_profiling)
+blueprint.teardown_request(idempotency.release_request)
+
+# after_request hooks run in the reverse order they are registered. Metrics are registered first so they record the
+# response that is actually sent, compression next so it runs once the other hooks have seen the uncompressed response,
+# which is what idempotency keys store, and profiling last so it stops as soon as the handler returns
+blueprint.after_request(metrics.record_response)
+blueprint.after_request(compress_response)
+blueprint.after_request(idempotency.store_response)
+blueprint.after_request(profiling.finish_profiling)
+
 api = Api(
     blueprint,
     title='Airflow API',
@@ -32,13 +58,38 @@ api = Api(
 )
 
 from airflowapi.v1.health import Health
+from airflowapi.v1.metrics import Metrics
 from airflowapi.v1.variables import variables
 from airflowapi.v1.dags import dags
 from airflowapi.v1.dag_files import dag_files
 from airflowapi.v1.dag_runs import dag_runs
+from airflowapi.v1.task_instances import task_instances
+from airflowapi.v1.maintenance import maintenance
+from airflowapi.v1.pools import pools
+from airflowapi.v1.connections import connections
+from airflowapi.v1.changes import changes
 
 api.add_resource(Health, HEALTH_ROUTE)
+api.add_resource(Metrics, METRICS_ROUTE)
 api.add_namespace(variables, VARIABLES_RESOURCE_ROUTE)
 api.add_namespace(dags, DAGS_RESOURCE_ROUTE)
 api.add_namespace(dag_files, DAG_FILES_RESOURCE_ROUTE)
 api.add_namespace(dag_runs, DAG_RUNS_RESOURCE_ROUTE)
+api.add_namespace(task_instances, TASK_INSTANCES_RESOURCE_ROUTE)
+api.add_namespace(maintenance, MAINTENANCE_RESOURCE_ROUTE)
+api.add_namespace(pools, POOLS_RESOURCE_ROUTE)
+api.add_namespace(connections, CONNECTIONS_RESOURCE_ROUTE)
+api.add_namespace(changes, CHANGES_RESOURCE_ROUTE)
+
+blueprint.before_request(admission.rate_limit_namespaces(URL_PREFIX, {
+    VARIABLES_RESOURCE_ROUTE: variables.name,
+    DAGS_RESOURCE_ROUTE: dags.name,
+    DAG_FILES_RESOURCE_ROUTE: dag_files.name,
+    DAG_RUNS_RESOURCE_ROUTE: dag_runs.name,
+    TASK_INSTANCES_RESOURCE_ROUTE: task_instances.name,
+    POOLS_RESOURCE_ROUTE: pools.name,
+    CONNECTIONS_RESOURCE_ROUTE: connections.name,
+    CHANGES_RESOURCE_ROUTE: changes.name
+}))
+# Registered after rate limiting so rejected requests never claim an idempotency key
+blueprint.before_request(idempotency.claim_request)
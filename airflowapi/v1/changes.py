@@ -0,0 +1,108 @@
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import Response
+from flask_restplus import Resource, fields, Namespace, abort
+from flask_restplus.reqparse import RequestParser
+from airflow.utils import timezone
+
+from airflowapi.v1.api_blueprint import api
+from airflowapi.constants import *
+from airflowapi.utilities import airflow_sql_alchemy_session
+from airflowapi.serialization import get_serializer
+from airflowapi.v1.url_parameter import APIParam, add_argument
+from airflowapi.v1.pagination import decode_cursor, encode_cursor, limit_param, INVALID_CURSOR_MESSAGE
+from airflowapi import change_log
+
+NAMESPACE_NAME = "changes"
+NAMESPACE_PATH = "/"
+
+SINCE_KEY = "since"
+CHANGES_KEY = "changes"
+NEXT_KEY = "next"
+HAS_MORE_KEY = "has_more"
+KIND_KEY = "kind"
+KEY_KEY = "key"
+ACTION_KEY = "action"
+CHANGED_AT_KEY = "changed_at"
+
+EXPIRED_TOKEN_MESSAGE = "The {since} token is too old, some changes since it were discarded. Read everything again " \
+                        "and continue from a new token".format(since=SINCE_KEY)
+
+changes = Namespace(
+    NAMESPACE_NAME,
+    description="Space for following the changes made to Variables and to the paused state of DAGs",
+    path=NAMESPACE_PATH
+)
+
+change_model = api.model('Airflow Change', OrderedDict([
+    (KIND_KEY, fields.String(description="{variable} or {dag}".format(
+        variable=change_log.VARIABLE_KIND,
+        dag=change_log.DAG_KIND
+    ))),
+    (KEY_KEY, fields.String(description="The name of the Variable or the id of the DAG")),
+    (ACTION_KEY, fields.String(description="{upserted}, {deleted}, {paused} or {unpaused}".format(
+        upserted=change_log.UPSERTED,
+        deleted=change_log.DELETED,
+        paused=change_log.PAUSED,
+        unpaused=change_log.UNPAUSED
+    ))),
+    (CHANGED_AT_KEY, fields.DateTime)
+]))
+
+change_feed_model = api.model('Airflow Change Feed', OrderedDict([
+    (CHANGES_KEY, fields.List(fields.Nested(change_model), description="The last change of each key, oldest first")),
+    (NEXT_KEY, fields.String(description="The {since} token of the next request".format(since=SINCE_KEY))),
+    (HAS_MORE_KEY, fields.Boolean(description="Whether more changes can be read straight away"))
+]))
+
+change_serializer = get_serializer(change_model, offset=1)
+
+since_param = APIParam(
+    name=SINCE_KEY,
+    data_type=str,
+    required=False,
+    default=None,
+    param_help="The {next} token of a previous response. Without it no changes are returned, only the token to follow "
+               "the changes made from now on".format(next=NEXT_KEY)
+)
+
+
+class Changes(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, since_param)
+    add_argument(get_parser, limit_param)
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, change_feed_model)
+    @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
+    @api.response(GONE_RESPONSE_CODE, GONE_DESCRIPTION)
+    @api.expect(get_parser, validate=True)
+    def get(self):
+        """Get the Variables upserted or deleted and the DAGs paused, unpaused or deleted since a token"""
+        args = self.get_parser.parse_args()
+        now = timezone.utcnow()
+        with airflow_sql_alchemy_session() as session:
+            if args.get(since_param.name) is None:
+                entries, last_id, has_more = [], change_log.latest_id(session, now), False
+            else:
+                after_id, issued_at = decode_cursor(args.get(since_param.name), 2)
+                if not isinstance(after_id, int) or not isinstance(issued_at, datetime):
+                    abort(BAD_REQUEST_RESPONSE_CODE, message=INVALID_CURSOR_MESSAGE)
+                if change_log.is_expired(issued_at, now):
+                    abort(GONE_RESPONSE_CODE, message=EXPIRED_TOKEN_MESSAGE)
+                entries, last_id, has_more = change_log.read_changes(
+                    session, after_id, args.get(limit_param.name), now
+                )
+        return Response(
+            json.dumps(OrderedDict([
+                (CHANGES_KEY, [change_serializer.to_dict(entry) for entry in entries]),
+                (NEXT_KEY, encode_cursor([last_id, now])),
+                (HAS_MORE_KEY, has_more)
+            ])),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+
+changes.add_resource(Changes, '')
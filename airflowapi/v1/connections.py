@@ -0,0 +1,251 @@
+from collections import OrderedDict
+
+from flask import Response
+from flask_restplus import Resource, fields, Namespace, abort
+from flask_restplus.reqparse import RequestParser
+from airflow.models import Connection
+
+from airflowapi import configuration, encryption
+from airflowapi.v1.api_blueprint import api
+from airflowapi.constants import *
+from airflowapi.caching import TTLCache
+from airflowapi.v1.url_parameter import APIParam, add_argument
+from airflowapi.utilities import airflow_sql_alchemy_session, escape_like, LIKE_ESCAPE
+from airflowapi.serialization import get_serializer
+
+NAMESPACE_NAME = "connections"
+NAMESPACE_PATH = "/"
+
+CONN_ID_KEY = "conn_id"
+CONN_TYPE_KEY = "conn_type"
+HOST_KEY = "host"
+SCHEMA_KEY = "schema"
+LOGIN_KEY = "login"
+PASSWORD_KEY = "password"
+PORT_KEY = "port"
+EXTRA_KEY = "extra"
+PREFIX_KEY = "prefix"
+
+MASKED_PASSWORD = "***"
+NOT_FOUND_MESSAGE = "Connection not found"
+NO_CONNECTIONS_MESSAGE = "No Connections were supplied to Create/Update"
+
+CACHE_TTL = configuration.getfloat("connection_cache_ttl", 30.0)
+CACHE_SIZE = configuration.getint("connection_cache_size", 2048)
+
+connections = Namespace(
+    NAMESPACE_NAME,
+    description="Space for interacting with Airflow Connections",
+    path=NAMESPACE_PATH
+)
+
+airflow_connection_model = api.model('Airflow Connection', OrderedDict([
+    (CONN_ID_KEY, fields.String),
+    (CONN_TYPE_KEY, fields.String),
+    (HOST_KEY, fields.String),
+    (SCHEMA_KEY, fields.String),
+    (LOGIN_KEY, fields.String),
+    (PASSWORD_KEY, fields.String(
+        description="{masked} when the Connection has a password".format(masked=MASKED_PASSWORD)
+    )),
+    (PORT_KEY, fields.Integer),
+    (EXTRA_KEY, fields.String)
+]))
+
+single_airflow_connection_body_model = api.model('Airflow Connection Body', OrderedDict([
+    (CONN_TYPE_KEY, fields.String(required=True)),
+    (HOST_KEY, fields.String),
+    (SCHEMA_KEY, fields.String),
+    (LOGIN_KEY, fields.String),
+    (PASSWORD_KEY, fields.String),
+    (PORT_KEY, fields.Integer),
+    (EXTRA_KEY, fields.String)
+]))
+
+multi_airflow_connection_body_model = api.inherit(
+    'Airflow Multiple Connection Body',
+    single_airflow_connection_body_model,
+    {CONN_ID_KEY: fields.String(required=True)}
+)
+
+connection_serializer = get_serializer(airflow_connection_model)
+
+prefix_param = APIParam(
+    name=PREFIX_KEY,
+    data_type=str,
+    required=False,
+    default=None,
+    param_help="Only return the Connections whose conn_id starts with this prefix"
+)
+
+CONNECTION_COLUMNS = [
+    Connection.conn_id,
+    Connection.conn_type,
+    Connection.host,
+    Connection.schema,
+    Connection.login,
+    Connection._password,
+    Connection.port,
+    Connection._extra,
+    Connection.is_extra_encrypted
+]
+
+# Decrypted rows of each conn_id looked up on its own. Changes made through this API only invalidate them in the process
+# that made them, every other process sees changes once its rows expire
+_connections = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+# Decrypted extras keyed by their encrypted value, so listings only skip the decryption and never serve stale rows
+_decrypted_extras = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+_NOT_CACHED = object()
+
+
+def _to_response_row(row, extra):
+    """Mask the password of a row selected with CONNECTION_COLUMNS, whose extra was decrypted"""
+    conn_id, conn_type, host, schema, login, password, port, _, _ = row
+    return conn_id, conn_type, host, schema, login, MASKED_PASSWORD if password else None, port, extra
+
+
+def query_connections(session, prefix=None):
+    """Return the response rows of the Connections, only decrypting the extras that weren't decrypted before"""
+    query = session.query(*CONNECTION_COLUMNS).order_by(Connection.conn_id, Connection.id)
+    if prefix:
+        query = query.filter(Connection.conn_id.like(escape_like(prefix) + "%", escape=LIKE_ESCAPE))
+    fernet = None
+    rows = []
+    for row in query:
+        extra, is_extra_encrypted = row[-2:]
+        decrypted = _decrypted_extras.get(extra, _NOT_CACHED) if extra and is_extra_encrypted else extra
+        if decrypted is _NOT_CACHED:
+            fernet = fernet or encryption.get_fernet()
+            decrypted = encryption.decrypt(fernet, extra, is_extra_encrypted)
+            _decrypted_extras.set(extra, decrypted)
+        rows.append(_to_response_row(row, decrypted))
+    return rows
+
+
+def get_connection(conn_id):
+    cached = _connections.get(conn_id)
+    if cached is None:
+        with airflow_sql_alchemy_session() as session:
+            rows = session.query(*CONNECTION_COLUMNS) \
+                .filter(Connection.conn_id == conn_id) \
+                .order_by(Connection.id) \
+                .all()
+        if not rows:
+            return None
+        fernet = encryption.get_fernet()
+        cached = [_to_response_row(row, encryption.decrypt(fernet, row[-2], row[-1])) for row in rows]
+        _connections.set(conn_id, cached)
+    return cached[0]
+
+
+def _table_row(fernet, conn_id, definition):
+    password, is_encrypted = encryption.encrypt(fernet, definition.get(PASSWORD_KEY))
+    extra, is_extra_encrypted = encryption.encrypt(fernet, definition.get(EXTRA_KEY))
+    return {
+        "conn_id": conn_id,
+        "conn_type": definition[CONN_TYPE_KEY],
+        "host": definition.get(HOST_KEY),
+        "schema": definition.get(SCHEMA_KEY),
+        "login": definition.get(LOGIN_KEY),
+        "password": password,
+        "port": definition.get(PORT_KEY),
+        "extra": extra,
+        "is_encrypted": is_encrypted,
+        "is_extra_encrypted": is_extra_encrypted
+    }
+
+
+def upsert_connections(session, definitions):
+    """Replace the rows of each conn_id with a single one built from its definition, encrypting with one Fernet"""
+    fernet = encryption.get_fernet()
+    table = Connection.__table__
+    try:
+        session.execute(table.delete().where(table.c.conn_id.in_(list(definitions))))
+        session.execute(table.insert(), [
+            _table_row(fernet, conn_id, definition) for conn_id, definition in definitions.items()
+        ])
+        session.commit()
+    finally:
+        for conn_id in definitions:
+            _connections.pop(conn_id)
+
+
+class SingleConnection(Resource):
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, airflow_connection_model)
+    @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
+    def get(self, conn_id):
+        """Retrieve a single Connection from Airflow, with its password masked"""
+        row = get_connection(conn_id)
+        if row is None:
+            abort(NOT_FOUND_RESPONSE_CODE, message=NOT_FOUND_MESSAGE)
+        return Response(
+            response=connection_serializer.dumps_one(row),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+    @api.response(POST_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, airflow_connection_model)
+    @api.expect(single_airflow_connection_body_model, validate=True)
+    @api.doc(params={'payload': 'The Request Payload'})
+    def post(self, conn_id):
+        """Create/Update a single Connection in Airflow"""
+        with airflow_sql_alchemy_session() as session:
+            upsert_connections(session, {conn_id: api.payload})
+        return Response(
+            response=connection_serializer.dumps_one(get_connection(conn_id)),
+            status=POST_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+    @api.response(DELETE_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION)
+    @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
+    def delete(self, conn_id):
+        """Delete a single Connection in Airflow"""
+        with airflow_sql_alchemy_session() as session:
+            deleted = session.query(Connection).filter(Connection.conn_id == conn_id).delete()
+            session.commit()
+        _connections.pop(conn_id)
+        if deleted == 0:
+            abort(NOT_FOUND_RESPONSE_CODE, message=NOT_FOUND_MESSAGE)
+        return Response(status=DELETE_RESPONSE_SUCCESS_CODE)
+
+
+class MultiConnection(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, prefix_param)
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [airflow_connection_model])
+    @api.expect(get_parser, validate=True)
+    def get(self):
+        """Get all Connections in Airflow, with their passwords masked"""
+        args = self.get_parser.parse_args()
+        with airflow_sql_alchemy_session() as session:
+            rows = query_connections(session, args.get(prefix_param.name))
+        return Response(
+            response=connection_serializer.dumps(rows),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+    @api.response(POST_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [airflow_connection_model])
+    @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
+    @api.expect([multi_airflow_connection_body_model], validate=True)
+    @api.doc(params={'payload': 'The Request Payload'})
+    def post(self):
+        """Create/Update multiple Connections in Airflow in one transaction"""
+        if len(api.payload) == 0:
+            abort(BAD_REQUEST_RESPONSE_CODE, message=NO_CONNECTIONS_MESSAGE)
+        # The last definition of a Connection supplied more than once wins
+        definitions = OrderedDict((connection[CONN_ID_KEY], connection) for connection in api.payload)
+        with airflow_sql_alchemy_session() as session:
+            upsert_connections(session, definitions)
+        return Response(
+            response=connection_serializer.dumps([get_connection(conn_id) for conn_id in definitions]),
+            status=POST_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+
+connections.add_resource(SingleConnection, '/<string:conn_id>')
+connections.add_resource(MultiConnection, '')
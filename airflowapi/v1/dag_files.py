@@ -1,22 +1,49 @@
 import os
 import json
+import contextlib
+import shutil
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
 
-from flask import Response
+from flask import Response, request
 from flask_restplus import Namespace, Resource, fields, abort
 from flask_restplus.reqparse import RequestParser
 from werkzeug.datastructures import FileStorage
+from werkzeug.formparser import FormDataParser
 from airflow import settings
 
 from airflowapi.v1.api_blueprint import api
 from airflowapi.constants import *
-from airflowapi.v1.url_parameter import APIParam
+from airflowapi.v1.url_parameter import APIParam, add_argument
+from airflowapi.v1.pagination import limit_param
+from airflowapi.serialization import get_serializer
+from airflowapi import parse_stats
 
 NAMESPACE_NAME = "files"
 NAMESPACE_PATH = ""
 
 FILE_KEY = "file"
+DURATION_KEY = "duration_seconds"
+DAG_COUNT_KEY = "dag_count"
+IMPORT_ERROR_KEY = "import_error"
+LAST_PARSED_KEY = "last_parsed"
+PARSE_STATS_ROUTE = "/_parse-stats"
+STATUS_KEY = "status"
+MESSAGE_KEY = "message"
 ALLOWED_EXTENSIONS = ["py"]
 NOT_FOUND_MESSAGE = "File not found in airflow server"
+NOT_PROVIDED_MESSAGE = "File Was Not Provided"
+ALREADY_EXISTS_MESSAGE = "File Already Exists"
+IMPROPER_EXTENSION_MESSAGE = "File has an improper extension. Allowed Extensions are {allowed_extensions}".format(
+    allowed_extensions=ALLOWED_EXTENSIONS
+)
+DIRECTORY_MESSAGE = "File names can't contain a directory"
+NOT_PERMITTED_MESSAGE = "The Airflow server isn't allowed to delete the file"
+
+# Uploads are streamed to files with these names in the DAGs folder, which the scheduler doesn't parse
+UPLOAD_PREFIX = ".airflow_api_upload_"
+UPLOAD_SUFFIX = ".tmp"
 
 dag_files = Namespace(
     NAMESPACE_NAME,
@@ -28,11 +55,29 @@ dag_file_model = api.model('Airflow DAG File', {
     FILE_KEY: fields.String
 })
 
+parse_stats_model = api.model('Airflow DAG File Parse Stats', OrderedDict([
+    (FILE_KEY, fields.String),
+    (DURATION_KEY, fields.Float(description="How long the last parse of the file took")),
+    (DAG_COUNT_KEY, fields.Integer(description="The number of DAGs the file defined when it was last parsed")),
+    (IMPORT_ERROR_KEY, fields.String(description="The error raised when the file was last parsed, if any")),
+    (LAST_PARSED_KEY, fields.DateTime)
+]))
+
+parse_stats_serializer = get_serializer(parse_stats_model)
+
+MULTI_STATUS_FILES_DESCRIPTION = "{description}. Returned when several files are supplied, with the {status} and " \
+                                 "{message} of each file keyed by its name".format(
+                                     description=MULTI_STATUS_DESCRIPTION,
+                                     status=STATUS_KEY,
+                                     message=MESSAGE_KEY
+                                 )
+
 file_parameter = APIParam(
     name=FILE_KEY,
     data_type=str,
+    action="append",
     required=True,
-    param_help="The filename to act upon in the Airflow DAG Files"
+    param_help="The filename to act upon in the Airflow DAG Files. May be supplied multiple times"
 )
 
 
@@ -40,25 +85,122 @@ def check_for_allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def allowed_file(filename):
+def validate_file_for_upload(filename):
+    """Return why a file name can't be uploaded to, or deleted from, the DAGs folder, or None when it can"""
+    if filename == '':
+        return NOT_PROVIDED_MESSAGE
+    if os.path.basename(filename) != filename:
+        return DIRECTORY_MESSAGE
     if not check_for_allowed_file(filename):
-        abort(
-            BAD_REQUEST_RESPONSE_CODE,
-            message="File has an improper extension. Allowed Extensions are {allowed_extensions}".format(
-                allowed_extensions=ALLOWED_EXTENSIONS
-            )
-        )
+        return IMPROPER_EXTENSION_MESSAGE
+    return None
+
+
+def _upload_stream_factory(*args, **kwargs):
+    """Write each uploaded file straight to the DAGs folder, so storing it is a link or a rename rather than a copy"""
+    name = "{prefix}{name}{suffix}".format(prefix=UPLOAD_PREFIX, name=uuid.uuid4().hex, suffix=UPLOAD_SUFFIX)
+    return open(os.path.join(settings.DAGS_FOLDER, name), "xb+")
 
 
-def check_for_file(dag_file_path):
-    if not os.path.isfile(dag_file_path):
-        abort(NOT_FOUND_RESPONSE_CODE, message=NOT_FOUND_MESSAGE)
+@contextlib.contextmanager
+def uploaded_files():
+    """Parse the multipart request body, streaming every file to disk, and yield the uploaded DAG files.
 
+    The temporary files left in the DAGs folder are removed once done.
+    """
+    parser = FormDataParser(stream_factory=_upload_stream_factory)
+    _, _, files = parser.parse(request.stream, request.mimetype, request.content_length, request.mimetype_params)
+    try:
+        yield files.getlist(FILE_KEY)
+    finally:
+        for _, file in files.items(multi=True):
+            file.stream.close()
+            try:
+                os.unlink(file.stream.name)
+            except FileNotFoundError:
+                pass
 
-def validate_file_for_upload(file):
-    if file.filename == '':
-        abort(BAD_REQUEST_RESPONSE_CODE, message="File Was Not Provided")
-    allowed_file(file.filename)
+
+def _create_file(source_path, dag_file_path):
+    """Create a DAG file with the content of the uploaded file, failing with FileExistsError when it already exists"""
+    try:
+        # Unlike checking first and saving, linking never overwrites a file created in the meantime
+        os.link(source_path, dag_file_path)
+    except FileExistsError:
+        raise
+    except OSError:
+        # Filesystems without hard links, such as gcsfuse and some NFS or SMB mounts, get an exclusively created copy
+        with open(source_path, "rb") as source, open(dag_file_path, "xb") as destination:
+            try:
+                shutil.copyfileobj(source, destination)
+            except BaseException:
+                os.unlink(dag_file_path)
+                raise
+
+
+def _store_file(file, replace):
+    """Move an uploaded file into the DAGs folder, returning the status code and the error message of the file"""
+    error = validate_file_for_upload(file.filename or '')
+    if error is not None:
+        return BAD_REQUEST_RESPONSE_CODE, error
+    dag_file_path = os.path.join(settings.DAGS_FOLDER, file.filename)
+    file.stream.flush()
+    if replace:
+        if not os.path.isfile(dag_file_path):
+            return NOT_FOUND_RESPONSE_CODE, NOT_FOUND_MESSAGE
+        os.replace(file.stream.name, dag_file_path)
+        return PUT_RESPONSE_SUCCESS_CODE, None
+    try:
+        _create_file(file.stream.name, dag_file_path)
+    except FileExistsError:
+        return CONFLICT_RESPONSE_CODE, ALREADY_EXISTS_MESSAGE
+    return POST_RESPONSE_SUCCESS_CODE, None
+
+
+def _delete_file(filename):
+    error = validate_file_for_upload(filename)
+    if error is not None:
+        return BAD_REQUEST_RESPONSE_CODE, error
+    dag_file_path = os.path.join(settings.DAGS_FOLDER, filename)
+    try:
+        os.unlink(dag_file_path)
+    except FileNotFoundError:
+        return NOT_FOUND_RESPONSE_CODE, NOT_FOUND_MESSAGE
+    except (IsADirectoryError, PermissionError):
+        # Some systems refuse to unlink a directory with a PermissionError
+        if os.path.isdir(dag_file_path):
+            return NOT_FOUND_RESPONSE_CODE, NOT_FOUND_MESSAGE
+        return FORBIDDEN_RESPONSE_CODE, NOT_PERMITTED_MESSAGE
+    return DELETE_RESPONSE_SUCCESS_CODE, None
+
+
+def _results_response(results, success_code):
+    """Respond as for a single file when only one was supplied, or with the result of every file otherwise"""
+    if len(results) == 1:
+        status, message = next(iter(results.values()))
+        if message is not None:
+            abort(status, message=message)
+        return Response(status=success_code)
+    return Response(
+        json.dumps(OrderedDict(
+            (filename, OrderedDict([(STATUS_KEY, status), (MESSAGE_KEY, message)]))
+            for filename, (status, message) in results.items()
+        )),
+        status=MULTI_STATUS_RESPONSE_CODE,
+        mimetype=JSON_MIME_TYPE
+    )
+
+
+def _upload(replace, success_code):
+    with uploaded_files() as files:
+        if not files:
+            abort(BAD_REQUEST_RESPONSE_CODE, message=NOT_PROVIDED_MESSAGE)
+        results = OrderedDict()
+        for file in files:
+            # A file supplied more than once is only stored once
+            if file.filename not in results:
+                results[file.filename] = _store_file(file, replace)
+    return _results_response(results, success_code)
 
 
 class DagFiles(Resource):
@@ -73,65 +215,82 @@ class DagFiles(Resource):
             mimetype=JSON_MIME_TYPE
         )
 
+    # Only documents the upload, the body is parsed by uploaded_files
     post_parser = RequestParser(bundle_errors=True)
-    post_parser.add_argument(FILE_KEY, location='files', type=FileStorage, required=True)
+    post_parser.add_argument(
+        FILE_KEY,
+        location='files',
+        type=FileStorage,
+        action='append',
+        required=True,
+        help="A DAG File. May be supplied multiple times"
+    )
 
     @api.response(POST_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION)
+    @api.response(MULTI_STATUS_RESPONSE_CODE, MULTI_STATUS_FILES_DESCRIPTION)
     @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
     @api.response(CONFLICT_RESPONSE_CODE, CONFLICT_DESCRIPTION)
-    @api.expect(post_parser, validate=True)
+    @api.expect(post_parser)
     def post(self):
-        """Upload a DAG File to Airflow"""
-        args = self.post_parser.parse_args()
-        file = args.get(FILE_KEY)
-        dag_file_path = os.path.join(settings.DAGS_FOLDER, file.filename)
-
-        validate_file_for_upload(file)
-        if os.path.isfile(dag_file_path):
-            abort(CONFLICT_RESPONSE_CODE, message="File Already Exists")
-
-        file.save(dag_file_path)
-        return Response(status=POST_RESPONSE_SUCCESS_CODE)
+        """Upload DAG Files to Airflow. With several files, the result of each is returned"""
+        return _upload(replace=False, success_code=POST_RESPONSE_SUCCESS_CODE)
 
     @api.response(PUT_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION)
+    @api.response(MULTI_STATUS_RESPONSE_CODE, MULTI_STATUS_FILES_DESCRIPTION)
     @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
     @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
-    @api.expect(post_parser, validate=True)
+    @api.expect(post_parser)
     def put(self):
-        """Update an existing DAG File to Airflow"""
-        args = self.post_parser.parse_args()
-        file = args.get(FILE_KEY)
-        dag_file_path = os.path.join(settings.DAGS_FOLDER, file.filename)
-
-        validate_file_for_upload(file)
-        check_for_file(dag_file_path)
-
-        file.save(dag_file_path)
-        return Response(status=PUT_RESPONSE_SUCCESS_CODE)
+        """Update existing DAG Files in Airflow. With several files, the result of each is returned"""
+        return _upload(replace=True, success_code=PUT_RESPONSE_SUCCESS_CODE)
 
     delete_parser = RequestParser(bundle_errors=True)
     delete_parser.add_argument(
         file_parameter.name,
         type=file_parameter.data_type,
+        action=file_parameter.action,
         required=file_parameter.required,
         help=file_parameter.param_help
     )
 
     @api.response(DELETE_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION)
+    @api.response(MULTI_STATUS_RESPONSE_CODE, MULTI_STATUS_FILES_DESCRIPTION)
     @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
+    @api.response(FORBIDDEN_RESPONSE_CODE, FORBIDDEN_DESCRIPTION)
     @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
     @api.expect(delete_parser, validate=True)
     def delete(self):
-        """Delete a DAG File from Airflow"""
+        """Delete DAG Files from Airflow. With several files, the result of each is returned"""
         args = self.delete_parser.parse_args()
-        filename = args.get(FILE_KEY)
-        filepath = os.path.join(settings.DAGS_FOLDER, filename)
+        results = OrderedDict()
+        for filename in args.get(FILE_KEY):
+            if filename not in results:
+                results[filename] = _delete_file(filename)
+        return _results_response(results, DELETE_RESPONSE_SUCCESS_CODE)
+
 
-        allowed_file(filename)
-        check_for_file(filepath)
+class DagFileParseStats(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, limit_param)
 
-        os.unlink(filepath)
-        return Response(status=DELETE_RESPONSE_SUCCESS_CODE)
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [parse_stats_model])
+    @api.expect(get_parser, validate=True)
+    def get(self):
+        """Get the DAG Files that took the longest to parse, slowest first, from the parses this API made"""
+        args = self.get_parser.parse_args()
+        rows = [(
+            fileloc,
+            stats[parse_stats.DURATION],
+            stats[parse_stats.DAG_COUNT],
+            stats[parse_stats.IMPORT_ERROR],
+            datetime.fromtimestamp(stats[parse_stats.PARSED_AT], timezone.utc)
+        ) for fileloc, stats in parse_stats.slowest(args.get(limit_param.name))]
+        return Response(
+            parse_stats_serializer.dumps(rows),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
 
 
 dag_files.add_resource(DagFiles, '')
+dag_files.add_resource(DagFileParseStats, PARSE_STATS_ROUTE)
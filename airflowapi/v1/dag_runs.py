@@ -4,7 +4,8 @@ from datetime import timezone
 
 from collections import OrderedDict
 from flask import Response
-from flask_restplus import Resource, fields, Namespace, abort
+from flask_restplus import Resource, fields, Namespace, abort, inputs
+from flask_restplus.reqparse import RequestParser
 from airflow.models import DagRun
 from airflow.api.common.experimental.trigger_dag import trigger_dag
 from airflow.exceptions import DagRunAlreadyExists
@@ -12,7 +13,15 @@ from airflow.utils.timezone import is_localized
 
 from airflowapi.v1.api_blueprint import api
 from airflowapi.constants import *
-from airflowapi.utilities import airflow_sql_alchemy_session, check_for_dag_id
+from airflowapi.utilities import airflow_sql_alchemy_session, check_for_dag_id, escape_like, LIKE_ESCAPE
+from airflowapi.serialization import get_serializer
+from airflowapi.index_advisor import index_report
+from airflowapi.validation import validate_payload
+from airflowapi.admission import heavy_request
+from airflowapi.dag_run_updates import update_dag_runs, CLEARABLE_STATE, SETTABLE_STATES
+from airflowapi.v1.url_parameter import APIParam, add_argument
+from airflowapi.v1.pagination import add_pagination_arguments, parse_fields, paginate, limit_param, \
+    cursor_param, fields_param, NEXT_CURSOR_HEADER
 from airflow.logging_config import log
 
 NAMESPACE_NAME = "dag runs"
@@ -40,6 +49,17 @@ dag_run_model = api.model('Airflow DAG Run', {
     DAG_RUN_END_DATE_KEY: fields.DateTime
 })
 
+DAG_RUN_COLUMNS = OrderedDict([
+    (DAG_ID_KEY, DagRun.dag_id),
+    (DAG_RUN_ID_KEY, DagRun.run_id),
+    (DAG_RUN_EXECUTION_DATE_KEY, DagRun.execution_date),
+    (DAG_RUN_STATE_KEY, DagRun._state),
+    (DAG_RUN_START_DATE_KEY, DagRun.start_date),
+    (DAG_RUN_END_DATE_KEY, DagRun.end_date)
+])
+
+dag_run_serializer = get_serializer(dag_run_model, DAG_RUN_COLUMNS.keys())
+
 
 DAG_NOT_FOUND_MESSAGE = "DAG not found"
 DAG_RUN_NOT_FOUND_MESSAGE = "DAG Run not found"
@@ -51,19 +71,223 @@ single_dag_run_body_model = api.model('Airflow Variable Body', OrderedDict([
     (DAG_ID_KEY, fields.String(required=True))
 ]))
 
+CLEAR_TASK_INSTANCES_KEY = "clear_task_instances"
+DAG_RUN_IDS_KEY = "dag_run_ids"
+FILTER_KEY = "filter"
+ROWS_KEY = "rows"
+MISSING_DAG_RUN_SELECTION_MESSAGE = "Either {filter} or {dag_run_ids} must select the DAG Runs to update".format(
+    filter=FILTER_KEY,
+    dag_run_ids=DAG_RUN_IDS_KEY
+)
+RUN_IDS_WITHOUT_DAG_ID_MESSAGE = "{dag_run_ids} need a {filter}.{dag_id}, run ids repeat across DAGs".format(
+    dag_run_ids=DAG_RUN_IDS_KEY,
+    filter=FILTER_KEY,
+    dag_id=DAG_ID_KEY
+)
+CLEAR_REQUIRES_RUNNING_MESSAGE = "{clear} needs the {state} to be {running} for the task instances to run again".format(
+    clear=CLEAR_TASK_INSTANCES_KEY,
+    state=DAG_RUN_STATE_KEY,
+    running=CLEARABLE_STATE
+)
+
 EXECUTION_DATE_BEFORE = "executionDateBefore"
 EXECUTION_DATE_AFTER = "executionDateAfter"
+START_DATE_BEFORE = "startDateBefore"
+START_DATE_AFTER = "startDateAfter"
+END_DATE_BEFORE = "endDateBefore"
+END_DATE_AFTER = "endDateAfter"
+RUN_ID_PREFIX = "runIdPrefix"
+SORT_KEY = "sort"
+INDEX_REPORT_KEY = "indexReport"
+
+dag_runs_filter_model = api.model('Airflow DAG Runs Filter', OrderedDict([
+    (DAG_ID_KEY, fields.List(fields.String, description="Only update the DAG Runs of these DAGs")),
+    (DAG_RUN_STATE_KEY, fields.List(fields.String, description="Only update the DAG Runs in these states")),
+    (EXECUTION_DATE_AFTER, fields.DateTime(description="Only update the DAG Runs executed after this datetime")),
+    (EXECUTION_DATE_BEFORE, fields.DateTime(description="Only update the DAG Runs executed before this datetime"))
+]))
+
+dag_runs_update_body_model = api.model('Airflow DAG Runs Update Body', OrderedDict([
+    (DAG_RUN_STATE_KEY, fields.String(required=True, enum=SETTABLE_STATES)),
+    (CLEAR_TASK_INSTANCES_KEY, fields.Boolean(
+        default=False,
+        description="Reset the state of the DAG Runs' task instances so they run again, only when the {state} is "
+                    "{running}".format(state=DAG_RUN_STATE_KEY, running=CLEARABLE_STATE)
+    )),
+    (DAG_RUN_IDS_KEY, fields.List(
+        fields.String,
+        description="The run ids of the DAG Runs to update. Run ids are only unique within a DAG, so they need a "
+                    "{dag_id} filter".format(dag_id=DAG_ID_KEY)
+    )),
+    (FILTER_KEY, fields.Nested(dag_runs_filter_model))
+]))
+
+dag_runs_update_model = api.model('Airflow DAG Runs Update', OrderedDict([
+    (DAG_RUN_STATE_KEY, fields.String),
+    (ROWS_KEY, fields.Raw(description="The number of rows updated in each table"))
+]))
+
+DESCENDING_PREFIX = "-"
+DEFAULT_SORT = "id"
+
+# Every sort ends with a unique column so pages can be cut between rows sharing the same sort value. Sorting by DAG id
+# follows the unique (dag_id, execution_date) constraint
+SORT_KEY_COLUMNS = OrderedDict([
+    ("id", [DagRun.id]),
+    (DAG_RUN_EXECUTION_DATE_KEY, [DagRun.execution_date, DagRun.id]),
+    (DAG_ID_KEY, [DagRun.dag_id, DagRun.execution_date])
+])
+SORT_CHOICES = [prefix + key for key in SORT_KEY_COLUMNS for prefix in ("", DESCENDING_PREFIX)]
+
+dag_id_param = APIParam(
+    name=DAG_ID_KEY,
+    data_type=str,
+    action="append",
+    required=False,
+    default=None,
+    param_help="A DAG id to filter the DAG Runs by. May be supplied multiple times"
+)
+
+state_param = APIParam(
+    name=DAG_RUN_STATE_KEY,
+    data_type=str,
+    action="append",
+    required=False,
+    default=None,
+    param_help="A state to filter the DAG Runs by. May be supplied multiple times"
+)
+
+run_id_prefix_param = APIParam(
+    name=RUN_ID_PREFIX,
+    data_type=str,
+    required=False,
+    default=None,
+    param_help="Only return the DAG Runs whose run id starts with this prefix"
+)
+
+sort_param = APIParam(
+    name=SORT_KEY,
+    data_type=str,
+    choices=SORT_CHOICES,
+    required=False,
+    default=DEFAULT_SORT,
+    param_help="The field to sort the DAG Runs by, prefixed with '{descending}' to sort in descending order".format(
+        descending=DESCENDING_PREFIX
+    )
+)
+
+index_report_param = APIParam(
+    name=INDEX_REPORT_KEY,
+    data_type=inputs.boolean,
+    required=False,
+    default=False,
+    param_help="Instead of the DAG Runs, return which index of the dag_run table the search can use and warn about "
+               "filters that would read the whole table"
+)
+
+
+def _date_range_params(name_before, name_after, field):
+    return [
+        APIParam(
+            name=name_before,
+            data_type=inputs.datetime_from_iso8601,
+            required=False,
+            default=None,
+            param_help="Only return the DAG Runs whose {field} is prior to this datetime".format(field=field)
+        ),
+        APIParam(
+            name=name_after,
+            data_type=inputs.datetime_from_iso8601,
+            required=False,
+            default=None,
+            param_help="Only return the DAG Runs whose {field} is after this datetime".format(field=field)
+        )
+    ]
+
+
+DATE_RANGE_PARAMS = [
+    (DagRun.execution_date, _date_range_params(EXECUTION_DATE_BEFORE, EXECUTION_DATE_AFTER, "execution date")),
+    (DagRun.start_date, _date_range_params(START_DATE_BEFORE, START_DATE_AFTER, "start date")),
+    (DagRun.end_date, _date_range_params(END_DATE_BEFORE, END_DATE_AFTER, "end date"))
+]
+
+
+def _dag_run_to_row(dag_run):
+    return (
+        dag_run.dag_id,
+        dag_run.run_id,
+        dag_run.execution_date,
+        dag_run.state,
+        dag_run.start_date,
+        dag_run.end_date
+    )
 
 
 def _process_dag_run_to_response_object(dag_run):
-    return {
-        DAG_ID_KEY: dag_run.dag_id,
-        DAG_RUN_ID_KEY: dag_run.run_id,
-        DAG_RUN_EXECUTION_DATE_KEY: dag_run.execution_date.isoformat(),
-        DAG_RUN_STATE_KEY: dag_run.state,
-        DAG_RUN_START_DATE_KEY: dag_run.start_date.isoformat(),
-        DAG_RUN_END_DATE_KEY: dag_run.end_date.isoformat() if dag_run.end_date else None
-    }
+    return dag_run_serializer.to_dict(_dag_run_to_row(dag_run))
+
+
+def _search_criteria(args):
+    """Build the filters of a DAG Run search along with the columns they compare by equality and by range"""
+    criteria, equality_columns, range_columns = [], [], []
+    if args.get(dag_id_param.name):
+        criteria.append(DagRun.dag_id.in_(args.get(dag_id_param.name)))
+        equality_columns.append(DagRun.dag_id)
+    if args.get(state_param.name):
+        criteria.append(DagRun._state.in_(args.get(state_param.name)))
+        equality_columns.append(DagRun._state)
+    if args.get(run_id_prefix_param.name):
+        criteria.append(DagRun.run_id.like(escape_like(args.get(run_id_prefix_param.name)) + "%", escape=LIKE_ESCAPE))
+        range_columns.append(DagRun.run_id)
+    for column, (before, after) in DATE_RANGE_PARAMS:
+        if args.get(before.name):
+            criteria.append(column < args.get(before.name))
+        if args.get(after.name):
+            criteria.append(column > args.get(after.name))
+        if args.get(before.name) or args.get(after.name):
+            range_columns.append(column)
+    return criteria, equality_columns, range_columns
+
+
+def _parse_datetime(value):
+    try:
+        parsed = isoparse(value)
+    except ValueError:
+        abort(BAD_REQUEST_RESPONSE_CODE, message="Couldn't parse datetime: {value}".format(value=value))
+    return parsed if is_localized(parsed) else parsed.replace(tzinfo=timezone.utc)
+
+
+def _update_criteria(payload):
+    """Build the filters selecting the DAG Runs to update from the body of a PATCH request"""
+    criteria = []
+    run_filter = payload.get(FILTER_KEY) or {}
+    if payload.get(DAG_RUN_IDS_KEY) is not None:
+        if not run_filter.get(DAG_ID_KEY):
+            abort(BAD_REQUEST_RESPONSE_CODE, message=RUN_IDS_WITHOUT_DAG_ID_MESSAGE)
+        criteria.append(DagRun.run_id.in_(payload[DAG_RUN_IDS_KEY]))
+    if run_filter.get(DAG_ID_KEY):
+        criteria.append(DagRun.dag_id.in_(run_filter[DAG_ID_KEY]))
+    if run_filter.get(DAG_RUN_STATE_KEY):
+        criteria.append(DagRun._state.in_(run_filter[DAG_RUN_STATE_KEY]))
+    if run_filter.get(EXECUTION_DATE_AFTER):
+        criteria.append(DagRun.execution_date > _parse_datetime(run_filter[EXECUTION_DATE_AFTER]))
+    if run_filter.get(EXECUTION_DATE_BEFORE):
+        criteria.append(DagRun.execution_date < _parse_datetime(run_filter[EXECUTION_DATE_BEFORE]))
+    return criteria
+
+
+def _add_date_range_arguments(parser):
+    for _, date_range_params in DATE_RANGE_PARAMS:
+        for date_param in date_range_params:
+            add_argument(parser, date_param)
+
+
+def _column_names(columns):
+    return [column.property.columns[0].name for column in columns]
+
+
+def get_dag_run(session, dag_id, run_id):
+    return session.query(DagRun).filter(DagRun.dag_id == dag_id, DagRun.run_id == run_id).first()
 
 
 class GetDagRun(Resource):
@@ -77,21 +301,69 @@ class GetDagRun(Resource):
             dr = session.query(DagRun).filter(DagRun.run_id == dag_run_id).first()
         if dr is None:
             abort(NOT_FOUND_RESPONSE_CODE, message=DAG_RUN_NOT_FOUND_MESSAGE)
-        response_data = _process_dag_run_to_response_object(dr)
         return Response(
-            json.dumps(response_data),
+            dag_run_serializer.dumps_one(_dag_run_to_row(dr)),
             status=GET_RESPONSE_SUCCESS_CODE,
             mimetype=JSON_MIME_TYPE
         )
 
 
 class PostDagRun(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, dag_id_param)
+    add_argument(get_parser, state_param)
+    add_argument(get_parser, run_id_prefix_param)
+    _add_date_range_arguments(get_parser)
+    add_argument(get_parser, sort_param)
+    add_argument(get_parser, index_report_param)
+    add_pagination_arguments(get_parser)
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [dag_run_model])
+    @api.expect(get_parser, validate=True)
+    def get(self):
+        """Search the DAG Runs of every DAG in Airflow"""
+        args = self.get_parser.parse_args()
+        criteria, equality_columns, range_columns = _search_criteria(args)
+        sort = args.get(sort_param.name)
+        descending = sort.startswith(DESCENDING_PREFIX)
+        key_columns = SORT_KEY_COLUMNS[sort.lstrip(DESCENDING_PREFIX)]
+        if args.get(index_report_param.name):
+            return Response(
+                json.dumps(index_report(
+                    DagRun.__table__,
+                    _column_names(equality_columns),
+                    _column_names(range_columns),
+                    _column_names(key_columns)
+                )),
+                status=GET_RESPONSE_SUCCESS_CODE,
+                mimetype=JSON_MIME_TYPE
+            )
+
+        selected_fields = parse_fields(args.get(fields_param.name), DAG_RUN_COLUMNS)
+        with airflow_sql_alchemy_session() as session:
+            query = session.query(*(key_columns + [DAG_RUN_COLUMNS[key] for key in selected_fields])).filter(*criteria)
+            rows, next_cursor = paginate(
+                query,
+                key_columns,
+                args.get(cursor_param.name),
+                args.get(limit_param.name),
+                descending
+            )
+        serializer = get_serializer(dag_run_model, selected_fields, offset=len(key_columns))
+        return Response(
+            serializer.dumps(rows),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE,
+            headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        )
+
     @api.response(POST_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, dag_run_model)
     @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
     @api.response(CONFLICT_RESPONSE_CODE, CONFLICT_DESCRIPTION)
     @api.response(BAD_REQUEST_DESCRIPTION, BAD_REQUEST_DESCRIPTION)
-    @api.expect(single_dag_run_body_model, validate=True)
+    @api.expect(single_dag_run_body_model, validate=False)
     @api.doc(params={'payload': 'The Request Payload'})
+    @validate_payload(single_dag_run_body_model, format_checker=api.format_checker)
     def post(self):
         """Create a DAG Run from Airflow"""
         try:
@@ -114,15 +386,41 @@ class PostDagRun(Resource):
                 dag_id=dag_id,
                 execution_date=execution_date
             )
-            response_data = _process_dag_run_to_response_object(dr)
             return Response(
-                json.dumps(response_data),
+                dag_run_serializer.dumps_one(_dag_run_to_row(dr)),
                 status=POST_RESPONSE_SUCCESS_CODE,
                 mimetype=JSON_MIME_TYPE
             )
         except DagRunAlreadyExists:
             abort(CONFLICT_RESPONSE_CODE, DAG_RUN_CONFLICT_MESSAGE)
 
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, dag_runs_update_model)
+    @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
+    @api.response(SERVICE_UNAVAILABLE_RESPONSE_CODE, SERVICE_UNAVAILABLE_DESCRIPTION)
+    @api.expect(dag_runs_update_body_model, validate=True)
+    @api.doc(params={'payload': 'The Request Payload'})
+    @heavy_request
+    def patch(self):
+        """Set the state of many DAG Runs in Airflow, and of their task instances, optionally clearing them instead.
+
+        The DAG Runs are updated in batches of dag_run_update_batch_size, each committed on its own. Task instances
+        succeed along with their DAG Run, or fail when it fails unless they had already finished.
+        """
+        criteria = _update_criteria(api.payload)
+        if not criteria:
+            abort(BAD_REQUEST_RESPONSE_CODE, message=MISSING_DAG_RUN_SELECTION_MESSAGE)
+        state = api.payload[DAG_RUN_STATE_KEY]
+        clear_task_instances = api.payload.get(CLEAR_TASK_INSTANCES_KEY, False)
+        if clear_task_instances and state != CLEARABLE_STATE:
+            abort(BAD_REQUEST_RESPONSE_CODE, message=CLEAR_REQUIRES_RUNNING_MESSAGE)
+        with airflow_sql_alchemy_session() as session:
+            rows = update_dag_runs(session, criteria, state, clear_task_instances)
+        return Response(
+            json.dumps(OrderedDict([(DAG_RUN_STATE_KEY, state), (ROWS_KEY, rows)])),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
 
 dag_runs.add_resource(PostDagRun, '')
 dag_runs.add_resource(GetDagRun, '/<string:dag_run_id>')
@@ -3,18 +3,25 @@ import os
 
 from airflowapi.v1.dag_runs import EXECUTION_DATE_BEFORE, EXECUTION_DATE_AFTER
 
-from airflowapi.v1.url_parameter import APIParam
+from airflowapi.v1.url_parameter import APIParam, add_argument
 from flask import Response
 from flask_restplus import Resource, fields, Namespace, abort, inputs
 from flask_restplus.reqparse import RequestParser
-from airflow.models import DagModel, DagBag, DagRun
+from airflow.models import DagModel, DagRun
 from airflow.bin.cli import process_subdir
 from airflow.exceptions import AirflowException
 
 from airflowapi.v1.api_blueprint import api
 from airflowapi.constants import *
-from airflowapi.utilities import airflow_sql_alchemy_session, check_for_dag_id
-from airflowapi.v1.dag_runs import dag_run_model, _process_dag_run_to_response_object
+from airflowapi.utilities import airflow_sql_alchemy_session, check_for_dag_id, like_pattern_from_glob, LIKE_ESCAPE
+from airflowapi.v1.dag_runs import dag_run_model, dag_run_serializer, DAG_RUN_COLUMNS
+from airflowapi.serialization import get_serializer
+from airflowapi.admission import heavy_request
+from airflowapi import change_log, dag_structure, purge
+from airflowapi.parse_stats import StatsDagBag
+from airflowapi.dag_index import dag_index
+from airflowapi.v1.task_instances import DagRunTaskInstances
+from airflowapi.v1.xcoms import DagRunXComs, DagRunXComValue
 
 from airflow.logging_config import log
 
@@ -31,11 +38,23 @@ NAMESPACE_PATH = "/"
 PAUSE_ROUTE = "/pause"
 UNPAUSE_ROUTE = "/unpause"
 DAG_RUNS_ROUTE = "/dag-runs"
+TASK_INSTANCES_ROUTE = "/tasks"
+STRUCTURE_ROUTE = "/structure"
+XCOMS_ROUTE = "/xcoms"
 
 DAG_ID_KEY = "dag_id"
 IS_PAUSED_KEY = "is_paused"
 FILE_LOCATION_KEY = "file_location"
+PATTERN_KEY = "pattern"
+DAG_IDS_KEY = "dag_ids"
+FILES_KEY = "files"
+SKIPPED_FILES_KEY = "skipped_files"
+ROWS_KEY = "rows"
 NOT_FOUND_MESSAGE = "DAG not found"
+MISSING_DAG_SELECTION_MESSAGE = "Supply the DAGs to delete with {dag_id} or {pattern}".format(
+    dag_id=DAG_ID_KEY,
+    pattern=PATTERN_KEY
+)
 
 SUBDIR_VALUE = "DAGS_FOLDER"
 ALLOWED_EXTENSIONS = ["py"]
@@ -46,6 +65,48 @@ dag_model = api.model('Airflow DAG', {
     FILE_LOCATION_KEY: fields.String
 })
 
+dag_task_model = api.model('Airflow DAG Task', {
+    dag_structure.TASK_ID_KEY: fields.String,
+    dag_structure.OPERATOR_KEY: fields.String,
+    dag_structure.OWNER_KEY: fields.String,
+    dag_structure.POOL_KEY: fields.String,
+    dag_structure.QUEUE_KEY: fields.String,
+    dag_structure.RETRIES_KEY: fields.Integer,
+    dag_structure.TRIGGER_RULE_KEY: fields.String
+})
+
+dag_edge_model = api.model('Airflow DAG Edge', {
+    dag_structure.UPSTREAM_TASK_ID_KEY: fields.String,
+    dag_structure.DOWNSTREAM_TASK_ID_KEY: fields.String
+})
+
+dag_structure_model = api.model('Airflow DAG Structure', {
+    dag_structure.DAG_ID_KEY: fields.String,
+    dag_structure.FILE_LOCATION_KEY: fields.String,
+    dag_structure.DESCRIPTION_KEY: fields.String,
+    dag_structure.SCHEDULE_INTERVAL_KEY: fields.Raw(
+        description="A cron expression or preset, or a number of seconds"
+    ),
+    dag_structure.START_DATE_KEY: fields.DateTime,
+    dag_structure.END_DATE_KEY: fields.DateTime,
+    dag_structure.CATCHUP_KEY: fields.Boolean,
+    dag_structure.CONCURRENCY_KEY: fields.Integer,
+    dag_structure.MAX_ACTIVE_RUNS_KEY: fields.Integer,
+    dag_structure.DEFAULT_ARGS_KEY: fields.Raw,
+    dag_structure.TASKS_KEY: fields.List(fields.Nested(dag_task_model)),
+    dag_structure.EDGES_KEY: fields.List(fields.Nested(dag_edge_model))
+})
+
+dag_purge_model = api.model('Airflow DAG Purge', {
+    DAG_IDS_KEY: fields.List(fields.String),
+    FILES_KEY: fields.List(fields.String),
+    SKIPPED_FILES_KEY: fields.Raw(description="The files that were kept, outside the DAGs folder or defining other "
+                                              "DAGs, with the reason"),
+    ROWS_KEY: fields.Raw(description="The number of rows deleted from each metadata table")
+})
+
+dag_serializer = get_serializer(dag_model, [DAG_ID_KEY, IS_PAUSED_KEY, FILE_LOCATION_KEY])
+
 dags = Namespace(
     NAMESPACE_NAME,
     description="Space for interacting with Airflow DAG's",
@@ -68,9 +129,30 @@ execution_date_after = APIParam(
     param_help="A field to specify a datetime that will be used to filter the DAG runs returned based on their execution date being after to the datetime"
 )
 
+dag_ids_param = APIParam(
+    name=DAG_ID_KEY,
+    data_type=str,
+    action="append",
+    required=False,
+    default=None,
+    param_help="The id of a DAG to delete. May be supplied multiple times"
+)
+
+pattern_param = APIParam(
+    name=PATTERN_KEY,
+    data_type=str,
+    required=False,
+    default=None,
+    param_help="Delete the DAGs whose id matches this pattern, where * matches any characters and ? a single one"
+)
+
+
+def _dag_to_row(dag):
+    return dag.dag_id, dag.is_paused, dag.fileloc
+
 
 def _process_dag_to_response(dag):
-    return {DAG_ID_KEY: dag.dag_id, IS_PAUSED_KEY: dag.is_paused, FILE_LOCATION_KEY: dag.fileloc}
+    return dag_serializer.to_dict(_dag_to_row(dag))
 
 
 class SingleDag(Resource):
@@ -83,7 +165,7 @@ class SingleDag(Resource):
         if dag is None:
             abort(NOT_FOUND_RESPONSE_CODE, message=NOT_FOUND_MESSAGE)
         return Response(
-            response=json.dumps(_process_dag_to_response(dag)),
+            response=dag_serializer.dumps_one(_dag_to_row(dag)),
             status=GET_RESPONSE_SUCCESS_CODE,
             mimetype=JSON_MIME_TYPE
         )
@@ -101,21 +183,78 @@ class SingleDag(Resource):
             except FileNotFoundError:
                 pass
             session.query(DagModel).filter(DagModel.dag_id == dag.dag_id).delete()
+            change_log.record(session, change_log.DAG_KIND, change_log.DELETED, [dag.dag_id])
             session.commit()
+        dag_index.remove(dag.dag_id)
         return Response(status=DELETE_RESPONSE_SUCCESS_CODE)
 
 
 class MultiDag(Resource):
+    delete_parser = RequestParser(bundle_errors=True)
+    add_argument(delete_parser, dag_ids_param)
+    add_argument(delete_parser, pattern_param)
 
     @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [dag_model])
+    @api.response(SERVICE_UNAVAILABLE_RESPONSE_CODE, SERVICE_UNAVAILABLE_DESCRIPTION)
+    @heavy_request
     def get(self):
         """Get all DAGs' statuses in Airflow"""
-        dag_bag = DagBag(process_subdir(SUBDIR_VALUE))
+        dag_bag = StatsDagBag(process_subdir(SUBDIR_VALUE))
         log.warning(SUBDIR_VALUE)
         log.warning(dag_bag)
-        response_data = [_process_dag_to_response(dag) for dag in dag_bag.dags.values()]
         return Response(
-            json.dumps(response_data),
+            dag_serializer.dumps([_dag_to_row(dag) for dag in dag_bag.dags.values()]),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, dag_purge_model)
+    @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
+    @api.response(SERVICE_UNAVAILABLE_RESPONSE_CODE, SERVICE_UNAVAILABLE_DESCRIPTION)
+    @api.expect(delete_parser, validate=True)
+    @heavy_request
+    def delete(self):
+        """Delete DAGs from Airflow with every metadata row they left behind, and the files defining only them"""
+        args = self.delete_parser.parse_args()
+        if not args.get(dag_ids_param.name) and not args.get(pattern_param.name):
+            abort(BAD_REQUEST_RESPONSE_CODE, message=MISSING_DAG_SELECTION_MESSAGE)
+        with airflow_sql_alchemy_session() as session:
+            query = session.query(DagModel.dag_id, DagModel.fileloc)
+            if args.get(dag_ids_param.name):
+                query = query.filter(DagModel.dag_id.in_(args.get(dag_ids_param.name)))
+            if args.get(pattern_param.name):
+                query = query.filter(
+                    DagModel.dag_id.like(like_pattern_from_glob(args.get(pattern_param.name)), escape=LIKE_ESCAPE)
+                )
+            matched = query.order_by(DagModel.dag_id).all()
+            dag_ids = [dag_id for dag_id, _ in matched]
+            # The files go first so the scheduler can't bring the DAGs back while their rows are deleted
+            files, skipped_files = purge.remove_dag_files(session, matched)
+            rows = purge.purge_dag_rows(session, dag_ids)
+            change_log.record(session, change_log.DAG_KIND, change_log.DELETED, dag_ids)
+            session.commit()
+        dag_index.remove(*dag_ids)
+        return Response(
+            json.dumps({DAG_IDS_KEY: dag_ids, FILES_KEY: files, SKIPPED_FILES_KEY: skipped_files, ROWS_KEY: rows}),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+
+class DagStructure(Resource):
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, dag_structure_model)
+    @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
+    def get(self, dag_id):
+        """Get the tasks and dependencies of a DAG in Airflow"""
+        dag = check_for_dag_id(dag_id)
+        if dag is None or not dag.fileloc:
+            abort(NOT_FOUND_RESPONSE_CODE, message=NOT_FOUND_MESSAGE)
+        structure = dag_structure.get_dag_structure(dag_id, dag.fileloc)
+        if structure is None:
+            abort(NOT_FOUND_RESPONSE_CODE, message=NOT_FOUND_MESSAGE)
+        return Response(
+            json.dumps(structure),
             status=GET_RESPONSE_SUCCESS_CODE,
             mimetype=JSON_MIME_TYPE
         )
@@ -127,7 +266,10 @@ def set_is_paused(is_paused, dag_id):
             DagModel.dag_id == dag_id
         ).first()
         dm.is_paused = is_paused
+        action = change_log.PAUSED if is_paused else change_log.UNPAUSED
+        change_log.record(session, change_log.DAG_KIND, action, [dag_id])
         session.commit()
+    dag_index.set_is_paused(dag_id, is_paused)
 
 
 class PauseDag(Resource):
@@ -185,15 +327,14 @@ class DagRuns(Resource):
         if check_for_dag_id(dag_id) is None:
             abort(NOT_FOUND_RESPONSE_CODE, message=NOT_FOUND_MESSAGE)
         with airflow_sql_alchemy_session() as session:
-            query = session.query(DagRun).filter(DagRun.dag_id == dag_id)
+            query = session.query(*DAG_RUN_COLUMNS.values()).filter(DagRun.dag_id == dag_id)
             if args.get(execution_date_before.name):
                 query = query.filter(DagRun.execution_date < args.get(execution_date_before.name))
             if args.get(execution_date_after.name):
                 query = query.filter(DagRun.execution_date > args.get(execution_date_after.name))
             drs = query.all()
-        response_data = [_process_dag_run_to_response_object(dag_run) for dag_run in drs]
         return Response(
-            json.dumps(response_data),
+            dag_run_serializer.dumps(drs),
             status=GET_RESPONSE_SUCCESS_CODE,
             mimetype=JSON_MIME_TYPE
         )
@@ -201,6 +342,28 @@ class DagRuns(Resource):
 
 dags.add_resource(SingleDag, '/<string:dag_id>')
 dags.add_resource(DagRuns, '/<string:dag_id>{dag_runs_route}'.format(dag_runs_route=DAG_RUNS_ROUTE))
+dags.add_resource(
+    DagRunTaskInstances,
+    '/<string:dag_id>{dag_runs_route}/<string:run_id>{task_instances_route}'.format(
+        dag_runs_route=DAG_RUNS_ROUTE,
+        task_instances_route=TASK_INSTANCES_ROUTE
+    )
+)
+dags.add_resource(
+    DagRunXComs,
+    '/<string:dag_id>{dag_runs_route}/<string:run_id>{xcoms_route}'.format(
+        dag_runs_route=DAG_RUNS_ROUTE,
+        xcoms_route=XCOMS_ROUTE
+    )
+)
+dags.add_resource(
+    DagRunXComValue,
+    '/<string:dag_id>{dag_runs_route}/<string:run_id>{xcoms_route}/<string:task_id>/<string:key>'.format(
+        dag_runs_route=DAG_RUNS_ROUTE,
+        xcoms_route=XCOMS_ROUTE
+    )
+)
+dags.add_resource(DagStructure, '/<string:dag_id>{structure_route}'.format(structure_route=STRUCTURE_ROUTE))
 dags.add_resource(MultiDag, '')
 dags.add_resource(UnpauseDag, '/<string:dag_id>{unpause_route}'.format(unpause_route=UNPAUSE_ROUTE))
 dags.add_resource(PauseDag, '/<string:dag_id>{pause_route}'.format(pause_route=PAUSE_ROUTE))
@@ -1,20 +1,46 @@
-from flask_restplus import Resource, fields
+from flask_restplus import Resource, fields, inputs
+from flask_restplus.reqparse import RequestParser
 from airflowapi.v1.api_blueprint import api
+from airflowapi.v1.url_parameter import APIParam, add_argument
+from airflowapi.constants import *
 from airflowapi.version import version
+from airflowapi import health_checks
 
 health = api.model('Health', {
     'version': fields.String,
-    'health': fields.String
+    'health': fields.String,
+    'checks': fields.Raw
 })
 
+deep_param = APIParam(
+    name="deep",
+    data_type=inputs.boolean,
+    required=False,
+    default=False,
+    param_help="Probe the metadata database, its connection pool, the DAGs folder and the scheduler heartbeat. "
+               "Results are cached for a few seconds. Default to false"
+)
+
 
 class Health(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, deep_param)
 
-    @api.response(200, "Success", health)
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, health)
+    @api.response(SERVICE_UNAVAILABLE_RESPONSE_CODE, SERVICE_UNAVAILABLE_DESCRIPTION, health)
+    @api.expect(get_parser, validate=True)
     def get(self):
         """Retrieve version and health of API"""
+        args = self.get_parser.parse_args()
         response = {
             "version": version,
             "health": "ok"
         }
+        if not args.get(deep_param.name):
+            return response
+        checks = health_checks.deep_health()
+        response["checks"] = checks
+        if not health_checks.is_healthy(checks):
+            response["health"] = "unhealthy"
+            return response, SERVICE_UNAVAILABLE_RESPONSE_CODE
         return response
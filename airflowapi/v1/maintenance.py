@@ -0,0 +1,153 @@
+import json
+from collections import OrderedDict
+from datetime import timezone
+
+from dateutil.parser import isoparse
+from flask import Response, url_for
+from flask_restplus import Resource, fields, Namespace, abort
+from airflow.utils.timezone import is_localized
+
+from airflowapi.v1.api_blueprint import api
+from airflowapi.constants import *
+from airflowapi.authorization import admin_required
+from airflowapi.utilities import airflow_sql_alchemy_session
+from airflowapi import background_jobs, purge
+
+NAMESPACE_NAME = "maintenance"
+NAMESPACE_PATH = "/"
+
+PURGE_ROUTE = "/purge"
+PURGE_JOB_KIND = "purge_dag_runs"
+
+CUTOFF_KEY = "cutoff"
+DAG_ID_KEY = "dag_id"
+DRY_RUN_KEY = "dry_run"
+BATCH_SIZE_KEY = "batch_size"
+SLEEP_SECONDS_KEY = "sleep_seconds"
+ROWS_KEY = "rows"
+
+MAX_BATCH_SIZE = 10000
+LOCATION_HEADER = "Location"
+JOB_NOT_FOUND_MESSAGE = "Job not found"
+
+maintenance = Namespace(
+    NAMESPACE_NAME,
+    description="Space for maintaining the Airflow metadata database. Requires the admin token",
+    path=NAMESPACE_PATH
+)
+
+purge_body_model = api.model('Airflow Purge Body', OrderedDict([
+    (CUTOFF_KEY, fields.DateTime(
+        required=True,
+        description="DAG runs whose execution date is before this are deleted"
+    )),
+    (DAG_ID_KEY, fields.String(description="Only purge the DAG runs of this DAG. Defaults to every DAG")),
+    (DRY_RUN_KEY, fields.Boolean(default=False, description="Only count the rows that would be deleted")),
+    (BATCH_SIZE_KEY, fields.Integer(
+        min=1,
+        max=MAX_BATCH_SIZE,
+        description="DAG runs deleted per transaction. Defaults to purge_batch_size"
+    )),
+    (SLEEP_SECONDS_KEY, fields.Float(
+        min=0,
+        description="Seconds to wait between transactions. Defaults to purge_sleep_seconds"
+    ))
+]))
+
+purge_count_model = api.model('Airflow Purge Count', OrderedDict([
+    (CUTOFF_KEY, fields.DateTime),
+    (DAG_ID_KEY, fields.String),
+    (DRY_RUN_KEY, fields.Boolean),
+    (ROWS_KEY, fields.Raw(description="The number of rows that would be deleted from each table"))
+]))
+
+job_model = api.model('Airflow Background Job', OrderedDict([
+    (background_jobs.ID_KEY, fields.String),
+    (background_jobs.KIND_KEY, fields.String),
+    (background_jobs.STATE_KEY, fields.String(enum=[
+        background_jobs.RUNNING_STATE,
+        background_jobs.SUCCESS_STATE,
+        background_jobs.FAILED_STATE
+    ])),
+    (background_jobs.PARAMETERS_KEY, fields.Raw),
+    (background_jobs.PROGRESS_KEY, fields.Raw(description="The number of rows deleted so far from each table")),
+    (background_jobs.ERROR_KEY, fields.String),
+    (background_jobs.HOSTNAME_KEY, fields.String),
+    (background_jobs.PID_KEY, fields.Integer),
+    (background_jobs.CREATED_AT_KEY, fields.DateTime),
+    (background_jobs.UPDATED_AT_KEY, fields.DateTime),
+    (background_jobs.HEARTBEAT_AT_KEY, fields.DateTime(description="When the process running the job last wrote it")),
+    (background_jobs.FINISHED_AT_KEY, fields.DateTime)
+]))
+
+
+def _parse_cutoff(value):
+    try:
+        cutoff = isoparse(value)
+    except ValueError:
+        abort(BAD_REQUEST_RESPONSE_CODE, message="Couldn't parse cutoff: {cutoff}".format(cutoff=value))
+    return cutoff if is_localized(cutoff) else cutoff.replace(tzinfo=timezone.utc)
+
+
+def _job_response(job, status, headers=None):
+    return Response(json.dumps(job), status=status, mimetype=JSON_MIME_TYPE, headers=headers)
+
+
+class Purge(Resource):
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, purge_count_model)
+    @api.response(ACCEPTED_RESPONSE_CODE, ACCEPTED_DESCRIPTION, job_model)
+    @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
+    @api.response(FORBIDDEN_RESPONSE_CODE, FORBIDDEN_DESCRIPTION)
+    @api.expect(purge_body_model, validate=True)
+    @api.doc(params={'payload': 'The Request Payload'})
+    @admin_required
+    def post(self):
+        """Delete the DAG runs older than a cutoff, with their task instances and XComs, in a background job"""
+        cutoff = _parse_cutoff(api.payload[CUTOFF_KEY])
+        dag_id = api.payload.get(DAG_ID_KEY)
+        if api.payload.get(DRY_RUN_KEY):
+            with airflow_sql_alchemy_session() as session:
+                rows = purge.count_dag_runs_before(session, cutoff, dag_id)
+            return Response(
+                json.dumps({CUTOFF_KEY: cutoff.isoformat(), DAG_ID_KEY: dag_id, DRY_RUN_KEY: True, ROWS_KEY: rows}),
+                status=GET_RESPONSE_SUCCESS_CODE,
+                mimetype=JSON_MIME_TYPE
+            )
+
+        batch_size = api.payload.get(BATCH_SIZE_KEY) or purge.PURGE_BATCH_SIZE
+        sleep_seconds = api.payload.get(SLEEP_SECONDS_KEY)
+        if sleep_seconds is None:
+            sleep_seconds = purge.PURGE_SLEEP_SECONDS
+
+        def run(report_progress):
+            with airflow_sql_alchemy_session() as session:
+                purge.purge_dag_runs_before(session, cutoff, dag_id, batch_size, sleep_seconds, report_progress)
+
+        job = background_jobs.start_job(PURGE_JOB_KIND, {
+            CUTOFF_KEY: cutoff.isoformat(),
+            DAG_ID_KEY: dag_id,
+            BATCH_SIZE_KEY: batch_size,
+            SLEEP_SECONDS_KEY: sleep_seconds
+        }, run)
+        return _job_response(job, ACCEPTED_RESPONSE_CODE, {
+            LOCATION_HEADER: url_for(api.endpoint("maintenance_purge_job"), job_id=job[background_jobs.ID_KEY])
+        })
+
+
+class PurgeJob(Resource):
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, job_model)
+    @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
+    @api.response(FORBIDDEN_RESPONSE_CODE, FORBIDDEN_DESCRIPTION)
+    @admin_required
+    def get(self, job_id):
+        """Get the progress of a purge job"""
+        job = background_jobs.get_job(job_id)
+        if job is None or job[background_jobs.KIND_KEY] != PURGE_JOB_KIND:
+            abort(NOT_FOUND_RESPONSE_CODE, message=JOB_NOT_FOUND_MESSAGE)
+        return _job_response(job, GET_RESPONSE_SUCCESS_CODE)
+
+
+maintenance.add_resource(Purge, PURGE_ROUTE)
+maintenance.add_resource(PurgeJob, '{purge_route}/<string:job_id>'.format(purge_route=PURGE_ROUTE))
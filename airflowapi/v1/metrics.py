@@ -0,0 +1,24 @@
+from flask import Response
+from flask_restplus import Resource, abort
+
+from airflowapi.v1.api_blueprint import api
+from airflowapi.constants import *
+from airflowapi.metrics import metrics_enabled, generate_metrics
+
+PROMETHEUS_MIME_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+NOT_INSTALLED_MESSAGE = "Metrics require the prometheus_client package to be installed"
+
+
+class Metrics(Resource):
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION)
+    @api.response(NOT_IMPLEMENTED_RESPONSE_CODE, NOT_IMPLEMENTED_DESCRIPTION)
+    def get(self):
+        """Retrieve the API's request and database metrics in the Prometheus text format"""
+        if not metrics_enabled():
+            abort(NOT_IMPLEMENTED_RESPONSE_CODE, message=NOT_INSTALLED_MESSAGE)
+        return Response(
+            generate_metrics(),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            content_type=PROMETHEUS_MIME_TYPE
+        )
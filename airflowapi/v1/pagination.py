@@ -0,0 +1,131 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from dateutil.parser import isoparse
+from flask_restplus import abort, inputs
+from sqlalchemy import and_, or_
+
+from airflowapi.constants import BAD_REQUEST_RESPONSE_CODE
+from airflowapi.v1.url_parameter import APIParam
+
+LIMIT_KEY = "limit"
+CURSOR_KEY = "cursor"
+FIELDS_KEY = "fields"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 10000
+
+FIELDS_SEPARATOR = ","
+DATETIME_TAG = "dt"
+INVALID_CURSOR_MESSAGE = "Invalid cursor"
+
+limit_param = APIParam(
+    name=LIMIT_KEY,
+    data_type=inputs.int_range(1, MAX_PAGE_LIMIT),
+    required=False,
+    default=DEFAULT_PAGE_LIMIT,
+    param_help="The maximum number of items to return. Defaults to {default} and can be at most {maximum}".format(
+        default=DEFAULT_PAGE_LIMIT,
+        maximum=MAX_PAGE_LIMIT
+    )
+)
+
+cursor_param = APIParam(
+    name=CURSOR_KEY,
+    data_type=str,
+    required=False,
+    default=None,
+    param_help="The cursor returned in the {header} header of a previous response, used to fetch the next page".format(
+        header=NEXT_CURSOR_HEADER
+    )
+)
+
+fields_param = APIParam(
+    name=FIELDS_KEY,
+    data_type=str,
+    required=False,
+    default=None,
+    param_help="A comma separated list of fields to return for each item. Defaults to all fields"
+)
+
+
+def add_pagination_arguments(parser):
+    for param in (limit_param, cursor_param, fields_param):
+        parser.add_argument(
+            param.name,
+            type=param.data_type,
+            required=param.required,
+            default=param.default,
+            help=param.param_help
+        )
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {DATETIME_TAG: value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return isoparse(value[DATETIME_TAG])
+    return value
+
+
+def encode_cursor(values):
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, expected_length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        if not isinstance(values, list) or len(values) != expected_length:
+            raise ValueError(cursor)
+        return [_decode_value(value) for value in values]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        abort(BAD_REQUEST_RESPONSE_CODE, message=INVALID_CURSOR_MESSAGE)
+
+
+def keyset_filter(columns, values, descending=False):
+    """Build the WHERE clause selecting rows that sort after `values` when ordered by `columns`"""
+    clauses = []
+    for index, column in enumerate(columns):
+        equal_prefix = [columns[i] == values[i] for i in range(index)]
+        after = column < values[index] if descending else column > values[index]
+        clauses.append(and_(*(equal_prefix + [after])))
+    return or_(*clauses)
+
+
+def parse_fields(raw_fields, available_fields):
+    if not raw_fields:
+        return list(available_fields)
+    requested = [field.strip() for field in raw_fields.split(FIELDS_SEPARATOR) if field.strip()]
+    unknown = [field for field in requested if field not in available_fields]
+    if unknown or not requested:
+        abort(
+            BAD_REQUEST_RESPONSE_CODE,
+            message="Unknown fields {unknown}. Available fields are {available}".format(
+                unknown=unknown,
+                available=list(available_fields)
+            )
+        )
+    return [field for field in available_fields if field in requested]
+
+
+def paginate(query, key_columns, cursor, limit, descending=False):
+    """Apply keyset pagination to a query whose first selected columns are `key_columns`.
+
+    Returns the rows of the page and the cursor of the next page, or None when there are no more rows.
+    """
+    if cursor:
+        query = query.filter(keyset_filter(key_columns, decode_cursor(cursor, len(key_columns)), descending))
+    order = [column.desc() for column in key_columns] if descending else key_columns
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1][:len(key_columns)])
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+
+from flask import Response
+from flask_restplus import Resource, fields, Namespace, abort
+from flask_restplus.reqparse import RequestParser
+from airflow.models import Pool, TaskInstance
+from airflow.utils.state import State
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from airflowapi.v1.api_blueprint import api
+from airflowapi.constants import *
+from airflowapi.utilities import airflow_sql_alchemy_session
+from airflowapi.serialization import get_serializer
+from airflowapi.v1.url_parameter import APIParam, add_argument
+
+NAMESPACE_NAME = "pools"
+NAMESPACE_PATH = "/"
+
+POOL_KEY = "pool"
+SLOTS_KEY = "slots"
+DESCRIPTION_KEY = "description"
+RUNNING_SLOTS_KEY = "running_slots"
+QUEUED_SLOTS_KEY = "queued_slots"
+OPEN_SLOTS_KEY = "open_slots"
+
+NO_POOLS_MESSAGE = "No Pools were supplied to Create/Update"
+CONCURRENT_CREATE_MESSAGE = "Some of the Pools were created by another request at the same time, retry"
+
+pools = Namespace(
+    NAMESPACE_NAME,
+    description="Space for interacting with Airflow Pools",
+    path=NAMESPACE_PATH
+)
+
+pool_model = api.model('Airflow Pool', OrderedDict([
+    (POOL_KEY, fields.String),
+    (SLOTS_KEY, fields.Integer),
+    (DESCRIPTION_KEY, fields.String),
+    (RUNNING_SLOTS_KEY, fields.Integer(description="Slots taken by running Task Instances")),
+    (QUEUED_SLOTS_KEY, fields.Integer(description="Slots taken by queued Task Instances")),
+    (OPEN_SLOTS_KEY, fields.Integer(description="Slots left, which is negative when the Pool is oversubscribed"))
+]))
+
+pool_body_model = api.model('Airflow Pool Body', OrderedDict([
+    (POOL_KEY, fields.String(required=True)),
+    (SLOTS_KEY, fields.Integer(required=True, min=0)),
+    (DESCRIPTION_KEY, fields.String),
+]))
+
+pool_serializer = get_serializer(pool_model)
+
+pool_param = APIParam(
+    name=POOL_KEY,
+    data_type=str,
+    action="append",
+    required=False,
+    default=None,
+    param_help="The name of a Pool to return. May be supplied multiple times, defaults to every Pool"
+)
+
+
+def _slot_usage(session, pool_names=None):
+    """Count the running and queued Task Instances of every Pool with a single query grouped by the ti_pool index"""
+    query = session.query(TaskInstance.pool, TaskInstance.state, func.count()) \
+        .filter(TaskInstance.state.in_([State.RUNNING, State.QUEUED]))
+    if pool_names:
+        query = query.filter(TaskInstance.pool.in_(pool_names))
+    else:
+        query = query.filter(TaskInstance.pool.isnot(None))
+    usage = {}
+    for pool_name, state, count in query.group_by(TaskInstance.pool, TaskInstance.state):
+        usage[(pool_name, state)] = count
+    return usage
+
+
+def query_pools(session, pool_names=None):
+    query = session.query(Pool.pool, Pool.slots, Pool.description).order_by(Pool.pool)
+    if pool_names:
+        query = query.filter(Pool.pool.in_(pool_names))
+    usage = _slot_usage(session, pool_names)
+    rows = []
+    for pool_name, slots, description in query:
+        running = usage.get((pool_name, State.RUNNING), 0)
+        queued = usage.get((pool_name, State.QUEUED), 0)
+        rows.append((pool_name, slots, description, running, queued, (slots or 0) - running - queued))
+    return rows
+
+
+def upsert_pools(session, definitions):
+    """Create or update the Pools of a {name: definition} mapping in one transaction"""
+    existing = {pool.pool: pool for pool in session.query(Pool).filter(Pool.pool.in_(list(definitions)))}
+    for pool_name, definition in definitions.items():
+        pool = existing.get(pool_name)
+        if pool is None:
+            pool = Pool(pool=pool_name)
+            session.add(pool)
+        pool.slots = definition[SLOTS_KEY]
+        pool.description = definition.get(DESCRIPTION_KEY, pool.description)
+    session.commit()
+
+
+class MultiPool(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, pool_param)
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [pool_model])
+    @api.expect(get_parser, validate=True)
+    def get(self):
+        """Get the Pools in Airflow with their slot usage"""
+        args = self.get_parser.parse_args()
+        with airflow_sql_alchemy_session() as session:
+            rows = query_pools(session, args.get(pool_param.name))
+        return Response(
+            pool_serializer.dumps(rows),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+    @api.response(POST_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [pool_model])
+    @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
+    @api.response(CONFLICT_RESPONSE_CODE, CONFLICT_DESCRIPTION)
+    @api.expect([pool_body_model], validate=True)
+    @api.doc(params={'payload': 'The Request Payload'})
+    def post(self):
+        """Create/Update multiple Pools in Airflow in one transaction"""
+        if len(api.payload) == 0:
+            abort(BAD_REQUEST_RESPONSE_CODE, message=NO_POOLS_MESSAGE)
+        # The last definition of a Pool supplied more than once wins
+        definitions = OrderedDict((pool[POOL_KEY], pool) for pool in api.payload)
+        with airflow_sql_alchemy_session() as session:
+            try:
+                upsert_pools(session, definitions)
+            except IntegrityError:
+                # Another request created some of the Pools since they were looked up, they're updated instead
+                session.rollback()
+                try:
+                    upsert_pools(session, definitions)
+                except IntegrityError:
+                    session.rollback()
+                    abort(CONFLICT_RESPONSE_CODE, message=CONCURRENT_CREATE_MESSAGE)
+            rows = query_pools(session, list(definitions))
+        return Response(
+            pool_serializer.dumps(rows),
+            status=POST_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+
+pools.add_resource(MultiPool, '')
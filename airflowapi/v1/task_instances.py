@@ -0,0 +1,187 @@
+from collections import OrderedDict
+
+from flask import Response
+from flask_restplus import Resource, fields, Namespace, abort, inputs
+from flask_restplus.reqparse import RequestParser
+from airflow.models import TaskInstance
+from sqlalchemy import or_
+
+from airflowapi.v1.api_blueprint import api
+from airflowapi.constants import *
+from airflowapi.utilities import airflow_sql_alchemy_session, check_for_dag_id
+from airflowapi.serialization import get_serializer
+from airflowapi.v1.url_parameter import APIParam, add_argument
+from airflowapi.v1.dag_runs import EXECUTION_DATE_BEFORE, EXECUTION_DATE_AFTER, get_dag_run
+from airflowapi.v1.pagination import add_pagination_arguments, parse_fields, paginate, limit_param, \
+    cursor_param, fields_param, NEXT_CURSOR_HEADER
+
+NAMESPACE_NAME = "task instances"
+NAMESPACE_PATH = "/"
+
+DAG_ID_KEY = "dag_id"
+TASK_ID_KEY = "task_id"
+EXECUTION_DATE_KEY = "execution_date"
+STATE_KEY = "state"
+START_DATE_KEY = "start_date"
+END_DATE_KEY = "end_date"
+DURATION_KEY = "duration"
+OPERATOR_KEY = "operator"
+HOSTNAME_KEY = "hostname"
+POOL_KEY = "pool"
+QUEUE_KEY = "queue"
+
+NO_STATE_VALUE = "none"
+
+DAG_NOT_FOUND_MESSAGE = "DAG not found"
+DAG_RUN_NOT_FOUND_MESSAGE = "DAG Run not found"
+
+task_instances = Namespace(
+    NAMESPACE_NAME,
+    description="Space for interacting with Airflow Task Instances",
+    path=NAMESPACE_PATH
+)
+
+task_instance_model = api.model('Airflow Task Instance', OrderedDict([
+    (DAG_ID_KEY, fields.String),
+    (TASK_ID_KEY, fields.String),
+    (EXECUTION_DATE_KEY, fields.DateTime),
+    (STATE_KEY, fields.String),
+    (START_DATE_KEY, fields.DateTime),
+    (END_DATE_KEY, fields.DateTime),
+    (DURATION_KEY, fields.Float),
+    (OPERATOR_KEY, fields.String),
+    (HOSTNAME_KEY, fields.String),
+    (POOL_KEY, fields.String),
+    (QUEUE_KEY, fields.String)
+]))
+
+TASK_INSTANCE_COLUMNS = OrderedDict([
+    (DAG_ID_KEY, TaskInstance.dag_id),
+    (TASK_ID_KEY, TaskInstance.task_id),
+    (EXECUTION_DATE_KEY, TaskInstance.execution_date),
+    (STATE_KEY, TaskInstance.state),
+    (START_DATE_KEY, TaskInstance.start_date),
+    (END_DATE_KEY, TaskInstance.end_date),
+    (DURATION_KEY, TaskInstance.duration),
+    (OPERATOR_KEY, TaskInstance.operator),
+    (HOSTNAME_KEY, TaskInstance.hostname),
+    (POOL_KEY, TaskInstance.pool),
+    (QUEUE_KEY, TaskInstance.queue)
+])
+
+# Matches the leading columns of the ti_state_lkp index so pages can be read straight off it
+KEYSET_COLUMNS = [TaskInstance.dag_id, TaskInstance.task_id, TaskInstance.execution_date]
+
+dag_id_param = APIParam(
+    name=DAG_ID_KEY,
+    data_type=str,
+    action="append",
+    required=False,
+    default=None,
+    param_help="A DAG id to filter the Task Instances by. May be supplied multiple times"
+)
+
+state_param = APIParam(
+    name=STATE_KEY,
+    data_type=str,
+    action="append",
+    required=False,
+    default=None,
+    param_help="A state to filter the Task Instances by, '{none}' matches Task Instances without a state. "
+               "May be supplied multiple times".format(none=NO_STATE_VALUE)
+)
+
+execution_date_before = APIParam(
+    name=EXECUTION_DATE_BEFORE,
+    data_type=inputs.datetime_from_iso8601,
+    required=False,
+    default=None,
+    param_help="A field to specify a datetime that will be used to filter the Task Instances returned based on their execution date being prior to the datetime"
+)
+
+execution_date_after = APIParam(
+    name=EXECUTION_DATE_AFTER,
+    data_type=inputs.datetime_from_iso8601,
+    required=False,
+    default=None,
+    param_help="A field to specify a datetime that will be used to filter the Task Instances returned based on their execution date being after to the datetime"
+)
+
+
+def _state_filter(states):
+    states = set(states)
+    criteria = []
+    if NO_STATE_VALUE in states:
+        states.discard(NO_STATE_VALUE)
+        criteria.append(TaskInstance.state.is_(None))
+    if states:
+        criteria.append(TaskInstance.state.in_(states))
+    return or_(*criteria)
+
+
+def _query_task_instances(args, *criteria):
+    selected_fields = parse_fields(args.get(fields_param.name), TASK_INSTANCE_COLUMNS)
+    columns = KEYSET_COLUMNS + [TASK_INSTANCE_COLUMNS[key] for key in selected_fields]
+    with airflow_sql_alchemy_session() as session:
+        query = session.query(*columns).filter(*criteria)
+        if args.get(state_param.name):
+            query = query.filter(_state_filter(args.get(state_param.name)))
+        rows, next_cursor = paginate(query, KEYSET_COLUMNS, args.get(cursor_param.name), args.get(limit_param.name))
+    serializer = get_serializer(task_instance_model, selected_fields, offset=len(KEYSET_COLUMNS))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(
+        serializer.dumps(rows),
+        status=GET_RESPONSE_SUCCESS_CODE,
+        mimetype=JSON_MIME_TYPE,
+        headers=headers
+    )
+
+
+class DagRunTaskInstances(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, state_param)
+    add_pagination_arguments(get_parser)
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [task_instance_model])
+    @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
+    @api.expect(get_parser, validate=True)
+    def get(self, dag_id, run_id):
+        """Get the Task Instances of a DAG Run in Airflow"""
+        args = self.get_parser.parse_args()
+        if check_for_dag_id(dag_id) is None:
+            abort(NOT_FOUND_RESPONSE_CODE, message=DAG_NOT_FOUND_MESSAGE)
+        with airflow_sql_alchemy_session() as session:
+            dr = get_dag_run(session, dag_id, run_id)
+        if dr is None:
+            abort(NOT_FOUND_RESPONSE_CODE, message=DAG_RUN_NOT_FOUND_MESSAGE)
+        return _query_task_instances(
+            args,
+            TaskInstance.dag_id == dag_id,
+            TaskInstance.execution_date == dr.execution_date
+        )
+
+
+class MultiTaskInstance(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, dag_id_param)
+    add_argument(get_parser, state_param)
+    add_argument(get_parser, execution_date_before)
+    add_argument(get_parser, execution_date_after)
+    add_pagination_arguments(get_parser)
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [task_instance_model])
+    @api.expect(get_parser, validate=True)
+    def get(self):
+        """Get Task Instances across DAGs in Airflow"""
+        args = self.get_parser.parse_args()
+        criteria = []
+        if args.get(dag_id_param.name):
+            criteria.append(TaskInstance.dag_id.in_(args.get(dag_id_param.name)))
+        if args.get(execution_date_before.name):
+            criteria.append(TaskInstance.execution_date < args.get(execution_date_before.name))
+        if args.get(execution_date_after.name):
+            criteria.append(TaskInstance.execution_date > args.get(execution_date_after.name))
+        return _query_task_instances(args, *criteria)
+
+
+task_instances.add_resource(MultiTaskInstance, '')
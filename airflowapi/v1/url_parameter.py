@@ -15,3 +15,15 @@ class APIParam(object):
         self.default = default
         self.location = location
         self.example = example
+
+
+def add_argument(parser, param):
+    parser.add_argument(
+        param.name,
+        type=param.data_type,
+        choices=param.choices or (),
+        action=param.action or "store",
+        required=param.required,
+        default=param.default,
+        help=param.param_help
+    )
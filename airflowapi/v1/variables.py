@@ -1,15 +1,25 @@
 import json
 from collections import OrderedDict
 
-from flask import Response
+from flask import Response, request
 from flask_restplus import Resource, fields, inputs, Namespace, abort
 from flask_restplus.reqparse import RequestParser
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+from werkzeug.datastructures import FileStorage
 from airflow.models import Variable
 
 from airflowapi.v1.api_blueprint import api
 from airflowapi.constants import *
-from airflowapi.v1.url_parameter import APIParam
+from airflowapi.v1.url_parameter import APIParam, add_argument
 from airflowapi.utilities import airflow_sql_alchemy_session
+from airflowapi.serialization import get_serializer
+from airflowapi.admission import heavy_request
+from airflowapi.validation import validate_payload
+from airflowapi import change_log, configuration, encryption
+from airflowapi.compression import GzipCompressor, compress_chunks, GZIP_ENCODING
+from airflowapi.json_lines import InvalidGzipError, InvalidLineError, dumps_line, gunzip_chunks, iter_objects, \
+    read_chunks
 
 
 NAMESPACE_NAME = "variables"
@@ -19,6 +29,18 @@ NAME_KEY = "name"
 VALUE_KEY = "value"
 DESERIALIZE_JSON_KEY = "deserialize_json"
 NOT_FOUND_MESSAGE = "Variable not found"
+GZIP_KEY = "gzip"
+FILE_KEY = "file"
+IMPORTED_KEY = "imported"
+CREATED_KEY = "created"
+UPDATED_KEY = "updated"
+
+JSON_LINES_MIME_TYPE = "application/x-ndjson"
+GZIP_MIME_TYPE = "application/gzip"
+EXPORT_FILE_NAME = "variables.jsonl"
+EXPORT_BATCH_SIZE = 1000
+IMPORT_CHUNK_SIZE = configuration.getint("variable_import_chunk_size", 500)
+IMPORT_MAX_LINE_BYTES = configuration.getint("variable_import_max_line_bytes", 1024 * 1024)
 
 variables = Namespace(
     NAMESPACE_NAME,
@@ -37,6 +59,8 @@ single_airflow_variable_body_model = api.model('Airflow Variable Body', OrderedD
     (DESERIALIZE_JSON_KEY, fields.Boolean(required=True, default=False)),
 ]))
 
+variable_serializer = get_serializer(airflow_variable_model, [NAME_KEY, VALUE_KEY, DESERIALIZE_JSON_KEY])
+
 multi_airflow_variable_body_model = api.model('Airflow Multiple Variable Body', OrderedDict([
     (NAME_KEY, fields.String(required=True)),
     (VALUE_KEY, fields.String(required=True)),
@@ -51,6 +75,22 @@ deserialize_json_param = APIParam(
     param_help="A field to indicate that the value in the Variable value should be treated as JSON. Default to false"
 )
 
+gzip_param = APIParam(
+    name=GZIP_KEY,
+    data_type=inputs.boolean,
+    required=False,
+    default=False,
+    param_help="Compress the export with gzip. Default to false"
+)
+
+import_file_param = APIParam(
+    name=FILE_KEY,
+    data_type=FileStorage,
+    location="files",
+    required=False,
+    param_help="A JSON Lines file of variables, optionally gzipped. The file can also be sent as the request body"
+)
+
 
 def set_airflow_variable(var_name, raw_var_value, deserialize_json, session):
     var_value = json.loads(raw_var_value) if deserialize_json else raw_var_value
@@ -60,6 +100,7 @@ def set_airflow_variable(var_name, raw_var_value, deserialize_json, session):
         serialize_json=deserialize_json,
         session=session
     )
+    change_log.record(session, change_log.VARIABLE_KIND, change_log.UPSERTED, [var_name])
     return Variable.get(var_name, deserialize_json=deserialize_json)
 
 
@@ -85,13 +126,8 @@ class SingleVariable(Resource):
         except KeyError:
             abort(NOT_FOUND_RESPONSE_CODE, message=NOT_FOUND_MESSAGE)
 
-        response = {
-            NAME_KEY: var_name,
-            VALUE_KEY: var,
-            DESERIALIZE_JSON_KEY: deserialize_json
-        }
         return Response(
-            response=json.dumps(response),
+            response=variable_serializer.dumps_one((var_name, var, deserialize_json)),
             status=GET_RESPONSE_SUCCESS_CODE,
             mimetype=JSON_MIME_TYPE
         )
@@ -106,13 +142,8 @@ class SingleVariable(Resource):
             raw_var_value = api.payload[VALUE_KEY]
             var = set_airflow_variable(var_name, raw_var_value, deserialize_json, session)
             session.commit()
-        response = {
-            NAME_KEY: var_name,
-            VALUE_KEY: var,
-            DESERIALIZE_JSON_KEY: deserialize_json
-        }
         return Response(
-            response=json.dumps(response),
+            response=variable_serializer.dumps_one((var_name, var, deserialize_json)),
             status=POST_RESPONSE_SUCCESS_CODE,
             mimetype=JSON_MIME_TYPE
         )
@@ -126,6 +157,7 @@ class SingleVariable(Resource):
             if len(query.all()) == 0:
                 abort(NOT_FOUND_RESPONSE_CODE, message=NOT_FOUND_MESSAGE)
             session.query(Variable).filter_by(key=var_name).delete()
+            change_log.record(session, change_log.VARIABLE_KIND, change_log.DELETED, [var_name])
             session.commit()
         return Response(status=DELETE_RESPONSE_SUCCESS_CODE)
 
@@ -147,21 +179,20 @@ class MultiVariable(Resource):
             except Exception:
                 val = var.val
                 deserialize_json = False
-            var_list.append({
-                NAME_KEY: var.key,
-                VALUE_KEY: val,
-                DESERIALIZE_JSON_KEY: deserialize_json
-            })
+            var_list.append((var.key, val, deserialize_json))
         return Response(
-            response=json.dumps(var_list),
+            response=variable_serializer.dumps(var_list),
             status=GET_RESPONSE_SUCCESS_CODE,
             mimetype=JSON_MIME_TYPE
         )
 
     @api.response(POST_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [airflow_variable_model])
     @api.response(POST_RESPONSE_SUCCESS_CODE, BAD_REQUEST_DESCRIPTION)
-    @api.expect([multi_airflow_variable_body_model], validate=True)
+    @api.expect([multi_airflow_variable_body_model], validate=False)
+    @api.response(SERVICE_UNAVAILABLE_RESPONSE_CODE, SERVICE_UNAVAILABLE_DESCRIPTION)
     @api.doc(params={'payload': 'The Request Payload'})
+    @validate_payload(multi_airflow_variable_body_model, collection=True, format_checker=api.format_checker)
+    @heavy_request
     def post(self):
         """Create/Update multiple variables in Airflow"""
         if len(api.payload) == 0:
@@ -172,18 +203,163 @@ class MultiVariable(Resource):
                 var_name = var[NAME_KEY]
                 deserialize_json = var[deserialize_json_param.name]
                 var_value = set_airflow_variable(var_name, var[VALUE_KEY], deserialize_json, session)
-                variables_created.append({
-                    NAME_KEY: var_name,
-                    VALUE_KEY: var_value,
-                    DESERIALIZE_JSON_KEY: deserialize_json
-                })
+                variables_created.append((var_name, var_value, deserialize_json))
             session.commit()
         return Response(
-            response=json.dumps(variables_created),
+            response=variable_serializer.dumps(variables_created),
+            status=POST_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE
+        )
+
+
+def _export_chunks(fernet):
+    """Yield the variables as JSON Lines, EXPORT_BATCH_SIZE lines at a time"""
+    with airflow_sql_alchemy_session() as session:
+        rows = session.query(Variable.key, Variable._val, Variable.is_encrypted) \
+            .order_by(Variable.key) \
+            .execution_options(stream_results=True) \
+            .yield_per(EXPORT_BATCH_SIZE)
+        lines = []
+        for key, stored_value, is_encrypted in rows:
+            lines.append(dumps_line({NAME_KEY: key, VALUE_KEY: encryption.decrypt(fernet, stored_value, is_encrypted)}))
+            if len(lines) == EXPORT_BATCH_SIZE:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+
+
+def _import_chunks():
+    """Read the uploaded file, or the request body, without buffering it and gunzip it when it's compressed"""
+    upload = request.files.get(FILE_KEY)
+    if upload is not None:
+        chunks = read_chunks(upload.stream)
+        gzipped = upload.mimetype == GZIP_MIME_TYPE or (upload.filename or "").endswith(".gz")
+    else:
+        chunks = read_chunks(request.stream)
+        gzipped = request.mimetype == GZIP_MIME_TYPE or request.headers.get("Content-Encoding") == GZIP_ENCODING
+    return gunzip_chunks(chunks) if gzipped else chunks
+
+
+def _variables_from_lines(objects):
+    for line_number, value in objects:
+        name = value.get(NAME_KEY)
+        var_value = value.get(VALUE_KEY)
+        if not isinstance(name, str) or not name:
+            raise InvalidLineError(line_number, "has no variable name")
+        if var_value is not None and not isinstance(var_value, str):
+            var_value = json.dumps(var_value)
+        yield name, var_value
+
+
+def _upsert_variables(session, fernet, chunk):
+    """Insert or update a chunk of variables in one transaction, returning how many were created and updated"""
+    rows = [dict(zip(("b_key", "b_val", "b_is_encrypted"), (name,) + encryption.encrypt(fernet, value)))
+            for name, value in chunk.items()]
+    table = Variable.__table__
+    existing = {key for key, in session.query(Variable.key).filter(Variable.key.in_(list(chunk)))}
+    created = [row for row in rows if row["b_key"] not in existing]
+    updated = [row for row in rows if row["b_key"] in existing]
+    if created:
+        session.execute(table.insert().values(
+            key=bindparam("b_key"), val=bindparam("b_val"), is_encrypted=bindparam("b_is_encrypted")
+        ), created)
+    if updated:
+        session.execute(table.update().where(table.c.key == bindparam("b_key")).values(
+            val=bindparam("b_val"), is_encrypted=bindparam("b_is_encrypted")
+        ), updated)
+    change_log.record(session, change_log.VARIABLE_KIND, change_log.UPSERTED, list(chunk))
+    session.commit()
+    return len(created), len(updated)
+
+
+def import_variables(session, fernet, variables_to_import, counts, chunk_size=IMPORT_CHUNK_SIZE):
+    """Upsert (name, value) pairs chunk by chunk, adding to the counts as each chunk is committed.
+
+    The last value of a name repeated within a chunk wins.
+    """
+
+    def flush(chunk):
+        try:
+            created, updated = _upsert_variables(session, fernet, chunk)
+        except IntegrityError:
+            # Another request created some of the variables since they were looked up
+            session.rollback()
+            created, updated = _upsert_variables(session, fernet, chunk)
+        counts[IMPORTED_KEY] += len(chunk)
+        counts[CREATED_KEY] += created
+        counts[UPDATED_KEY] += updated
+
+    chunk = OrderedDict()
+    for name, value in variables_to_import:
+        chunk[name] = value
+        if len(chunk) == chunk_size:
+            flush(chunk)
+            chunk = OrderedDict()
+    if chunk:
+        flush(chunk)
+
+
+class ExportVariables(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, gzip_param)
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION)
+    @api.response(SERVICE_UNAVAILABLE_RESPONSE_CODE, SERVICE_UNAVAILABLE_DESCRIPTION)
+    @api.expect(get_parser, validate=True)
+    @heavy_request
+    def get(self):
+        """Stream every variable in Airflow as JSON Lines of name and value"""
+        args = self.get_parser.parse_args()
+        chunks = _export_chunks(encryption.get_fernet())
+        file_name = EXPORT_FILE_NAME
+        mimetype = JSON_LINES_MIME_TYPE
+        if args.get(gzip_param.name):
+            chunks = compress_chunks(chunks, GzipCompressor())
+            file_name += ".gz"
+            mimetype = GZIP_MIME_TYPE
+        response = Response(chunks, status=GET_RESPONSE_SUCCESS_CODE, mimetype=mimetype)
+        response.headers["Content-Disposition"] = "attachment; filename={}".format(file_name)
+        return response
+
+
+class ImportVariables(Resource):
+    post_parser = RequestParser(bundle_errors=True)
+    post_parser.add_argument(
+        import_file_param.name,
+        type=import_file_param.data_type,
+        location=import_file_param.location,
+        required=import_file_param.required,
+        help=import_file_param.param_help
+    )
+
+    @api.response(POST_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION)
+    @api.response(BAD_REQUEST_RESPONSE_CODE, BAD_REQUEST_DESCRIPTION)
+    @api.response(SERVICE_UNAVAILABLE_RESPONSE_CODE, SERVICE_UNAVAILABLE_DESCRIPTION)
+    @api.expect(post_parser)
+    @heavy_request
+    def post(self):
+        """Create/Update variables from a JSON Lines file, such as one from the export, one chunk at a time"""
+        fernet = encryption.get_fernet()
+        with airflow_sql_alchemy_session() as session:
+            variables_to_import = _variables_from_lines(iter_objects(_import_chunks(), IMPORT_MAX_LINE_BYTES))
+            counts = OrderedDict([(IMPORTED_KEY, 0), (CREATED_KEY, 0), (UPDATED_KEY, 0)])
+            try:
+                import_variables(session, fernet, variables_to_import, counts)
+            except (InvalidLineError, InvalidGzipError) as error:
+                session.rollback()
+                abort(BAD_REQUEST_RESPONSE_CODE, message="{error}, {imported} variables before it were imported".format(
+                    error=error,
+                    imported=counts[IMPORTED_KEY]
+                ))
+        return Response(
+            response=json.dumps(counts),
             status=POST_RESPONSE_SUCCESS_CODE,
             mimetype=JSON_MIME_TYPE
         )
 
 
+variables.add_resource(ExportVariables, '/_export')
+variables.add_resource(ImportVariables, '/_import')
 variables.add_resource(SingleVariable, '/<string:var_name>')
 variables.add_resource(MultiVariable, '')
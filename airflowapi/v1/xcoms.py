@@ -0,0 +1,200 @@
+import base64
+from collections import OrderedDict
+
+from flask import Response
+from flask_restplus import Resource, fields, abort, inputs
+from flask_restplus.reqparse import RequestParser
+from airflow.models import XCom
+from sqlalchemy import case, func, null
+
+from airflowapi import configuration
+from airflowapi.v1.api_blueprint import api
+from airflowapi.constants import *
+from airflowapi.utilities import airflow_sql_alchemy_session, check_for_dag_id
+from airflowapi.serialization import get_serializer, loads
+from airflowapi.json_lines import dumps_line
+from airflowapi.v1.url_parameter import APIParam, add_argument
+from airflowapi.v1.dag_runs import get_dag_run
+from airflowapi.v1.pagination import paginate, limit_param, cursor_param, NEXT_CURSOR_HEADER
+
+TASK_ID_KEY = "task_id"
+KEY_KEY = "key"
+SIZE_KEY = "size"
+TIMESTAMP_KEY = "timestamp"
+ENCODING_KEY = "encoding"
+VALUE_KEY = "value"
+INCLUDE_VALUES_KEY = "includeValues"
+MAX_VALUE_BYTES_KEY = "maxValueBytes"
+
+JSON_ENCODING = "json"
+PICKLE_ENCODING = "pickle"
+PICKLE_PROTOCOL_MARKER = b"\x80"
+
+JSON_LINES_MIME_TYPE = "application/x-ndjson"
+OCTET_STREAM_MIME_TYPE = "application/octet-stream"
+ENCODING_HEADER = "X-XCom-Encoding"
+CONTENT_LENGTH_HEADER = "Content-Length"
+
+DAG_NOT_FOUND_MESSAGE = "DAG not found"
+DAG_RUN_NOT_FOUND_MESSAGE = "DAG Run not found"
+XCOM_NOT_FOUND_MESSAGE = "XCom not found"
+
+STREAM_CHUNK_BYTES = configuration.getint("xcom_stream_chunk_bytes", 1024 * 1024)
+DEFAULT_MAX_VALUE_BYTES = configuration.getint("xcom_inline_value_max_bytes", 1024 * 1024)
+VALUES_BATCH_SIZE = 100
+
+xcom_model = api.model('Airflow XCom', OrderedDict([
+    (TASK_ID_KEY, fields.String),
+    (KEY_KEY, fields.String),
+    (SIZE_KEY, fields.Integer(description="The size of the stored value in bytes")),
+    (TIMESTAMP_KEY, fields.DateTime)
+]))
+
+XCOM_COLUMNS = [XCom.task_id, XCom.key, func.length(XCom.value), XCom.timestamp]
+
+# Follows the idx_xcom_dag_task_date index once the DAG and execution date are fixed
+KEYSET_COLUMNS = [XCom.task_id, XCom.key, XCom.id]
+
+xcom_serializer = get_serializer(xcom_model)
+page_serializer = get_serializer(xcom_model, offset=len(KEYSET_COLUMNS))
+
+task_id_param = APIParam(
+    name=TASK_ID_KEY,
+    data_type=str,
+    action="append",
+    required=False,
+    default=None,
+    param_help="A task id to return the XComs of. May be supplied multiple times, defaults to every task"
+)
+
+include_values_param = APIParam(
+    name=INCLUDE_VALUES_KEY,
+    data_type=inputs.boolean,
+    required=False,
+    default=False,
+    param_help="Stream every matching XCom with its value as JSON Lines instead of returning a page of keys and "
+               "sizes. Default to false"
+)
+
+max_value_bytes_param = APIParam(
+    name=MAX_VALUE_BYTES_KEY,
+    data_type=inputs.natural,
+    required=False,
+    default=DEFAULT_MAX_VALUE_BYTES,
+    param_help="With {include_values}, values larger than this many bytes are left out and have to be read one at a "
+               "time. Defaults to {default}".format(include_values=INCLUDE_VALUES_KEY, default=DEFAULT_MAX_VALUE_BYTES)
+)
+
+
+def _run_criteria(dag_id, run_id):
+    if check_for_dag_id(dag_id) is None:
+        abort(NOT_FOUND_RESPONSE_CODE, message=DAG_NOT_FOUND_MESSAGE)
+    with airflow_sql_alchemy_session() as session:
+        dr = get_dag_run(session, dag_id, run_id)
+    if dr is None:
+        abort(NOT_FOUND_RESPONSE_CODE, message=DAG_RUN_NOT_FOUND_MESSAGE)
+    return [XCom.dag_id == dag_id, XCom.execution_date == dr.execution_date]
+
+
+def encode_value(value):
+    """Return the encoding of a stored value and its JSON representation. Pickled values are returned base64 encoded
+    rather than unpickled, which would run code chosen by whoever wrote them"""
+    if not value.startswith(PICKLE_PROTOCOL_MARKER):
+        try:
+            return JSON_ENCODING, loads(value)
+        except ValueError:
+            pass
+    return PICKLE_ENCODING, base64.b64encode(value).decode("ascii")
+
+
+def _value_lines(criteria, max_value_bytes):
+    size = func.length(XCom.value)
+    # Values over the limit are replaced by NULL in the query so they never leave the database
+    value = case([(size <= max_value_bytes, XCom.value)], else_=null())
+    with airflow_sql_alchemy_session() as session:
+        rows = session.query(XCom.task_id, XCom.key, size, XCom.timestamp, value) \
+            .filter(*criteria) \
+            .order_by(*KEYSET_COLUMNS) \
+            .execution_options(stream_results=True) \
+            .yield_per(VALUES_BATCH_SIZE)
+        for row in rows:
+            item = xcom_serializer.to_dict(row)
+            if row[4] is not None:
+                item[ENCODING_KEY], item[VALUE_KEY] = encode_value(bytes(row[4]))
+            yield dumps_line(item)
+
+
+def _value_chunks(criteria, xcom_id, size):
+    """Read a value STREAM_CHUNK_BYTES at a time with SUBSTR, so a large value is never held in memory whole"""
+    with airflow_sql_alchemy_session() as session:
+        for offset in range(0, size, STREAM_CHUNK_BYTES):
+            chunk = session.query(func.substr(XCom.value, offset + 1, STREAM_CHUNK_BYTES)) \
+                .filter(XCom.id == xcom_id, *criteria) \
+                .scalar()
+            if chunk is None:
+                return
+            yield bytes(chunk)
+
+
+def _prepend(first_chunk, chunks):
+    yield first_chunk
+    yield from chunks
+
+
+class DagRunXComs(Resource):
+    get_parser = RequestParser(bundle_errors=True)
+    add_argument(get_parser, task_id_param)
+    add_argument(get_parser, include_values_param)
+    add_argument(get_parser, max_value_bytes_param)
+    add_argument(get_parser, limit_param)
+    add_argument(get_parser, cursor_param)
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION, [xcom_model])
+    @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
+    @api.expect(get_parser, validate=True)
+    def get(self, dag_id, run_id):
+        """Get the keys and sizes of the XComs of a DAG Run in Airflow, or stream them with their values"""
+        args = self.get_parser.parse_args()
+        criteria = _run_criteria(dag_id, run_id)
+        if args.get(task_id_param.name):
+            criteria.append(XCom.task_id.in_(args.get(task_id_param.name)))
+        if args.get(include_values_param.name):
+            return Response(
+                _value_lines(criteria, args.get(max_value_bytes_param.name)),
+                status=GET_RESPONSE_SUCCESS_CODE,
+                mimetype=JSON_LINES_MIME_TYPE
+            )
+        with airflow_sql_alchemy_session() as session:
+            query = session.query(*(KEYSET_COLUMNS + XCOM_COLUMNS)).filter(*criteria)
+            rows, next_cursor = paginate(query, KEYSET_COLUMNS, args.get(cursor_param.name), args.get(limit_param.name))
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        return Response(
+            page_serializer.dumps(rows),
+            status=GET_RESPONSE_SUCCESS_CODE,
+            mimetype=JSON_MIME_TYPE,
+            headers=headers
+        )
+
+
+class DagRunXComValue(Resource):
+
+    @api.response(GET_RESPONSE_SUCCESS_CODE, SUCCESS_DESCRIPTION)
+    @api.response(NOT_FOUND_RESPONSE_CODE, NOT_FOUND_DESCRIPTION)
+    def get(self, dag_id, run_id, task_id, key):
+        """Stream the stored value of an XCom, as JSON or as the bytes of a pickle"""
+        criteria = _run_criteria(dag_id, run_id) + [XCom.task_id == task_id, XCom.key == key]
+        with airflow_sql_alchemy_session() as session:
+            xcom = session.query(XCom.id, func.length(XCom.value)) \
+                .filter(*criteria) \
+                .order_by(XCom.id.desc()) \
+                .first()
+        if xcom is None:
+            abort(NOT_FOUND_RESPONSE_CODE, message=XCOM_NOT_FOUND_MESSAGE)
+        xcom_id, size = xcom
+        chunks = _value_chunks(criteria, xcom_id, size or 0)
+        first_chunk = next(chunks, b"")
+        mimetype = OCTET_STREAM_MIME_TYPE if first_chunk.startswith(PICKLE_PROTOCOL_MARKER) else JSON_MIME_TYPE
+        response = Response(_prepend(first_chunk, chunks), status=GET_RESPONSE_SUCCESS_CODE, mimetype=mimetype)
+        response.headers[ENCODING_HEADER] = PICKLE_ENCODING if mimetype == OCTET_STREAM_MIME_TYPE else JSON_ENCODING
+        response.headers[CONTENT_LENGTH_HEADER] = str(size or 0)
+        return response
@@ -0,0 +1,90 @@
+from functools import wraps
+from numbers import Number
+
+from flask import request
+from flask_restplus import abort
+from jsonschema import Draft4Validator
+
+from airflowapi.constants import BAD_REQUEST_RESPONSE_CODE
+
+VALIDATION_FAILED_MESSAGE = "Input payload validation failed"
+
+TYPE_CHECKS = {
+    "string": "isinstance({value}, str)",
+    "boolean": "isinstance({value}, bool)",
+    "integer": "(isinstance({value}, int) and not isinstance({value}, bool))",
+    "number": "(isinstance({value}, _Number) and not isinstance({value}, bool))"
+}
+BOUND_CHECKS = {"minimum": "{value} >= {bound!r}", "maximum": "{value} <= {bound!r}"}
+
+# Keywords that don't constrain the instance. "format" is one too, unless a format checker is given
+ANNOTATION_KEYWORDS = {"default", "description", "example", "readOnly", "title"}
+SCHEMA_KEYWORDS = {"type", "properties", "required", "description", "title"}
+
+
+def _compile_property_check(name, schema, format_checker):
+    ignored = ANNOTATION_KEYWORDS | ({"format"} if format_checker is None else set())
+    keywords = set(schema) - ignored
+    if schema.get("type") not in TYPE_CHECKS or not keywords <= {"type"} | set(BOUND_CHECKS):
+        return None
+    value = "item[{name!r}]".format(name=name)
+    checks = [TYPE_CHECKS[schema["type"]].format(value=value)]
+    if schema["type"] in ("integer", "number"):
+        checks.extend(BOUND_CHECKS[keyword].format(value=value, bound=schema[keyword])
+                      for keyword in BOUND_CHECKS if keyword in schema)
+    return " and ".join(checks)
+
+
+def _compile_is_valid(schema, format_checker):
+    """Generate a function telling whether an object is valid against a flat object schema, like the ones of api.models
+    made of scalar fields, or return None for schemas using anything else"""
+    if schema.get("type") != "object" or not set(schema) <= SCHEMA_KEYWORDS:
+        return None
+    checks = ["isinstance(item, dict)"]
+    required = set(schema.get("required", []))
+    checks.extend("{name!r} in item".format(name=name) for name in sorted(required))
+    for name, property_schema in sorted(schema.get("properties", {}).items()):
+        check = _compile_property_check(name, property_schema, format_checker)
+        if check is None:
+            return None
+        checks.append("({name!r} not in item or ({check}))".format(name=name, check=check))
+    source = "lambda item: {checks}".format(checks=" and ".join(checks))
+    return eval(compile(source, "<payload validator>", "eval"), {"_Number": Number})
+
+
+class PayloadValidator(object):
+    """Validates payloads against the JSON schema of an api.model, compiled once rather than on every request.
+
+    Valid payloads only go through the generated checks when the schema allows it, invalid ones are validated again by
+    jsonschema so that the errors are reported in the same format as flask_restplus' own validation.
+    """
+
+    def __init__(self, model, format_checker=None):
+        self.model = model
+        self.validator = Draft4Validator(model.__schema__, format_checker=format_checker)
+        self.is_valid = _compile_is_valid(model.__schema__, format_checker) or self.validator.is_valid
+
+    def errors(self, instance):
+        return dict(self.model.format_error(error) for error in self.validator.iter_errors(instance))
+
+    def validate(self, data, collection=False):
+        """Abort with a 400 listing the errors of the first invalid object. Like flask_restplus, a collection payload
+        that isn't a list is validated as a list of one object"""
+        items = (data if isinstance(data, list) else [data]) if collection else [data]
+        for item in items:
+            if not self.is_valid(item):
+                abort(BAD_REQUEST_RESPONSE_CODE, message=VALIDATION_FAILED_MESSAGE, errors=self.errors(item))
+
+
+def validate_payload(model, collection=False, format_checker=None):
+    """Validate the JSON payload of a handler with a PayloadValidator. Use it with `api.expect(..., validate=False)` so
+    the payload is still documented but not validated twice"""
+    validator = PayloadValidator(model, format_checker)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            validator.validate(request.get_json(), collection)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
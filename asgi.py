@@ -0,0 +1,3 @@
+from airflowapi.asgi import create_application
+
+application = create_application()
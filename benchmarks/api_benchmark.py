@@ -0,0 +1,216 @@
+"""Benchmark every route of the API against a seeded metadata database.
+
+Each GET route registered on the v1 blueprint is driven sequentially through the Flask test client and concurrently
+over HTTP against a threaded server. The latency percentiles and throughput of each route are reported as JSON.
+
+    python -m benchmarks.api_benchmark --dags 20 --dag-runs 200 --output results.json
+    python -m benchmarks.api_benchmark --baseline results.json --max-regression 0.25
+"""
+import argparse
+import http.client
+import json
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.seed import configure_environment
+
+BLUEPRINT_NAME = "v1"
+EXCLUDED_ENDPOINTS = {"v1.root"}
+JSON_HEADERS = {"Content-Type": "application/json"}
+REPORTED_PERCENTILES = (50, 95, 99)
+COMPARED_STATISTIC = "p95"
+SUCCESS_STATUSES = range(200, 300)
+
+# Routes that need a request body or that would change the seeded data while it's being measured
+WRITE_SCENARIOS = {
+    ("PUT", "/api/v1/dags/<string:dag_id>/pause"): None,
+    ("PUT", "/api/v1/dags/<string:dag_id>/unpause"): None,
+    ("POST", "/api/v1/variables/<string:var_name>"): {"value": "benchmark", "deserialize_json": False},
+}
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(percent / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, wall_seconds):
+    latencies = sorted(latencies)
+    summary = {"requests": len(latencies), "errors": errors}
+    for percent in REPORTED_PERCENTILES:
+        value = percentile(latencies, percent)
+        summary["p{}".format(percent)] = value * 1000 if value is not None else None
+    summary["requests_per_second"] = len(latencies) / wall_seconds if wall_seconds else None
+    return summary
+
+
+def build_app():
+    from flask import Flask
+    from airflowapi.v1.api_blueprint import blueprint
+
+    app = Flask(__name__)
+    app.register_blueprint(blueprint)
+    return app
+
+
+def collect_scenarios(app, seeded):
+    """Resolve a concrete URL for each benchmarked method and route, and list the routes that were skipped"""
+    scenarios, skipped = [], []
+    for rule in app.url_map.iter_rules():
+        if not rule.endpoint.startswith(BLUEPRINT_NAME + ".") or rule.endpoint in EXCLUDED_ENDPOINTS:
+            continue
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+            if method != "GET" and (method, rule.rule) not in WRITE_SCENARIOS:
+                skipped.append("{} {}".format(method, rule.rule))
+                continue
+            values = {argument: seeded.get(argument) for argument in rule.arguments}
+            if any(value is None for value in values.values()):
+                skipped.append("{} {}".format(method, rule.rule))
+                continue
+            url = rule.build(values, append_unknown=False)[1]
+            scenarios.append({
+                "name": "{} {}".format(method, rule.rule),
+                "method": method,
+                "url": url,
+                "body": WRITE_SCENARIOS.get((method, rule.rule))
+            })
+    return scenarios, skipped
+
+
+def run_test_client(app, scenario, requests):
+    client = app.test_client()
+    latencies, errors = [], 0
+    body = json.dumps(scenario["body"]) if scenario["body"] is not None else None
+    headers = JSON_HEADERS if body is not None else {}
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        request_started_at = time.perf_counter()
+        response = client.open(scenario["url"], method=scenario["method"], data=body, headers=headers)
+        latencies.append(time.perf_counter() - request_started_at)
+        errors += response.status_code not in SUCCESS_STATUSES
+    return summarize(latencies, errors, time.perf_counter() - started_at)
+
+
+def start_server(app):
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def run_http(port, scenario, requests, concurrency):
+    body = json.dumps(scenario["body"]) if scenario["body"] is not None else None
+    headers = JSON_HEADERS if body is not None else {}
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def worker(count):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        try:
+            for _ in range(count):
+                request_started_at = time.perf_counter()
+                connection.request(scenario["method"], scenario["url"], body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                latency = time.perf_counter() - request_started_at
+                with lock:
+                    latencies.append(latency)
+                    errors[0] += response.status not in SUCCESS_STATUSES
+        finally:
+            connection.close()
+
+    counts = [requests // concurrency + (index < requests % concurrency) for index in range(concurrency)]
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, [count for count in counts if count]))
+    return summarize(latencies, errors[0], time.perf_counter() - started_at)
+
+
+def find_regressions(results, baseline, max_regression):
+    regressions = []
+    for name, modes in results["endpoints"].items():
+        for mode, summary in modes.items():
+            previous = baseline.get("endpoints", {}).get(name, {}).get(mode, {}).get(COMPARED_STATISTIC)
+            current = summary.get(COMPARED_STATISTIC)
+            if previous and current and current > previous * (1 + max_regression):
+                regressions.append({
+                    "endpoint": name,
+                    "mode": mode,
+                    "baseline_{}".format(COMPARED_STATISTIC): previous,
+                    COMPARED_STATISTIC: current
+                })
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--airflow-home", help="Directory for the seeded database and DAG files. Defaults to a "
+                                               "temporary directory")
+    parser.add_argument("--sql-alchemy-conn", help="Metadata database to seed. Defaults to SQLite under the Airflow "
+                                                   "home, any database Airflow supports can be used instead")
+    parser.add_argument("--dags", type=int, default=10)
+    parser.add_argument("--dag-files", type=int, help="Number of DAG files to write. Defaults to one per DAG")
+    parser.add_argument("--dag-runs", type=int, default=100, help="DAG runs per DAG")
+    parser.add_argument("--tasks", type=int, default=3, help="Tasks per DAG")
+    parser.add_argument("--variables", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent HTTP clients")
+    parser.add_argument("--output", help="File to write the JSON report to, in addition to stdout")
+    parser.add_argument("--baseline", help="A previous JSON report to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Fail when an endpoint's {} latency grew by more than this ratio".format(
+                            COMPARED_STATISTIC))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    airflow_home = args.airflow_home or tempfile.mkdtemp(prefix="airflow_api_benchmark_")
+    configure_environment(airflow_home, args.sql_alchemy_conn)
+
+    from benchmarks.seed import seed
+
+    seeded = seed(
+        dags=args.dags,
+        dag_runs_per_dag=args.dag_runs,
+        tasks_per_dag=args.tasks,
+        variables=args.variables,
+        dag_files=args.dag_files
+    )
+    app = build_app()
+    scenarios, skipped = collect_scenarios(app, seeded)
+    server = start_server(app)
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "endpoints": {},
+        "skipped": skipped
+    }
+    try:
+        for scenario in scenarios:
+            results["endpoints"][scenario["name"]] = {
+                "test_client": run_test_client(app, scenario, args.requests),
+                "http": run_http(server.server_port, scenario, args.requests, args.concurrency)
+            }
+    finally:
+        server.shutdown()
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            results["regressions"] = find_regressions(results, json.load(baseline_file), args.max_regression)
+    report = json.dumps(results, indent=2, sort_keys=True)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report)
+    return 1 if results.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Compare serving the API from the ASGI entry point with serving it from Flask.
+
+Every GET route is driven concurrently over HTTP against a threaded Werkzeug server and against uvicorn running the
+ASGI application. Then many clients long-poll a DAG run through the ASGI wait route until their timeout, which shows
+how many worker threads idle waiters hold. The results are reported as JSON.
+
+    python -m benchmarks.asgi_benchmark --dags 5 --dag-runs 50 --waiters 500 --output asgi.json
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.api_benchmark import build_app, collect_scenarios, run_http, start_server, summarize
+from benchmarks.seed import configure_environment
+
+# A state the seeded DAG runs never reach, so every waiter waits until its timeout
+UNREACHED_STATE = "up_for_retry"
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_asgi_server(application):
+    import uvicorn
+
+    class Server(uvicorn.Server):
+
+        def install_signal_handlers(self):
+            pass
+
+    port = _free_port()
+    server = Server(uvicorn.Config(application, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.serve())
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, port
+
+
+def run_waiters(port, url, waiters, timeout):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def wait():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout + 30)
+        try:
+            request_started_at = time.perf_counter()
+            connection.request("GET", url)
+            response = connection.getresponse()
+            response.read()
+            with lock:
+                latencies.append(time.perf_counter() - request_started_at)
+                errors[0] += response.status != 200
+        finally:
+            connection.close()
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=waiters) as executor:
+        list(executor.map(lambda _: wait(), range(waiters)))
+    return summarize(latencies, errors[0], time.perf_counter() - started_at)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--airflow-home", help="Directory for the seeded database and DAG files. Defaults to a "
+                                               "temporary directory")
+    parser.add_argument("--sql-alchemy-conn", help="Metadata database to seed. Defaults to SQLite under the Airflow "
+                                                   "home")
+    parser.add_argument("--dags", type=int, default=5)
+    parser.add_argument("--dag-runs", type=int, default=50, help="DAG runs per DAG")
+    parser.add_argument("--tasks", type=int, default=3, help="Tasks per DAG")
+    parser.add_argument("--variables", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and server")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent HTTP clients")
+    parser.add_argument("--worker-threads", type=int, default=8, help="Threads of the ASGI application's pool")
+    parser.add_argument("--waiters", type=int, default=200, help="Concurrent clients long-polling a DAG run")
+    parser.add_argument("--wait-timeout", type=float, default=5.0, help="Seconds each waiter waits")
+    parser.add_argument("--output", help="File to write the JSON report to, in addition to stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    airflow_home = args.airflow_home or tempfile.mkdtemp(prefix="airflow_api_benchmark_")
+    configure_environment(airflow_home, args.sql_alchemy_conn)
+
+    from benchmarks.seed import seed
+    from airflowapi.asgi import AsgiApplication
+
+    seeded = seed(
+        dags=args.dags,
+        dag_runs_per_dag=args.dag_runs,
+        tasks_per_dag=args.tasks,
+        variables=args.variables
+    )
+    app = build_app()
+    scenarios, skipped = collect_scenarios(app, seeded)
+    scenarios = [scenario for scenario in scenarios if scenario["method"] == "GET"]
+    application = AsgiApplication(app.wsgi_app, worker_threads=args.worker_threads)
+    flask_server = start_server(app)
+    asgi_server, asgi_thread, asgi_port = start_asgi_server(application)
+    results = {"config": {key: value for key, value in vars(args).items() if key != "output"}, "endpoints": {}}
+    try:
+        for scenario in scenarios:
+            results["endpoints"][scenario["name"]] = {
+                "flask": run_http(flask_server.server_port, scenario, args.requests, args.concurrency),
+                "asgi": run_http(asgi_port, scenario, args.requests, args.concurrency)
+            }
+        wait_url = "/api/v1/dags/{dag_id}/dag-runs/{run_id}/wait?state={state}&timeout={timeout}".format(
+            dag_id=seeded["dag_id"],
+            run_id=seeded["run_id"],
+            state=UNREACHED_STATE,
+            timeout=args.wait_timeout
+        )
+        results["long_poll"] = run_waiters(asgi_port, wait_url, args.waiters, args.wait_timeout)
+        results["long_poll"]["waiters"] = args.waiters
+        results["long_poll"]["worker_threads_used"] = len(application.executor._threads)
+    finally:
+        flask_server.shutdown()
+        asgi_server.should_exit = True
+        asgi_thread.join()
+
+    report = json.dumps(results, indent=2, sort_keys=True)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
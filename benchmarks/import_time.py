@@ -0,0 +1,93 @@
+"""Measure what loading the plugin costs the processes that never register its blueprint.
+
+Airflow imports `plugin.py` in the scheduler and in every task process. This compares importing it, which only defines
+the lazily registered blueprint, with importing the API's resources as loading the plugin used to do. Each variant runs
+in a fresh interpreter; the time of the import statement and the peak memory of the process are reported as JSON, along
+with the slowest modules reported by `python -X importtime` on Python 3.7+.
+
+    python -m benchmarks.import_time --repeat 5
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BASELINE_STATEMENT = "import airflow.plugins_manager"
+VARIANTS = {
+    "plugin": "import plugin",
+    "plugin_with_api": "import plugin; import airflowapi.v1.api_blueprint",
+}
+
+MEASURE_TEMPLATE = """
+import json, resource, time
+{baseline}
+started_at = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started_at
+print(json.dumps({{"seconds": elapsed, "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+SLOWEST_MODULES = 15
+
+
+def _run(code, extra_args=()):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPOSITORY_ROOT, os.environ.get("PYTHONPATH")])))
+    env.setdefault("SLUGIFY_USES_TEXT_UNIDECODE", "yes")
+    return subprocess.run(
+        [sys.executable] + list(extra_args) + ["-c", code],
+        cwd=REPOSITORY_ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+
+
+def measure(statement, repeat):
+    """Time the statement once the modules every variant shares are already imported"""
+    runs = []
+    for _ in range(repeat):
+        output = _run(MEASURE_TEMPLATE.format(baseline=BASELINE_STATEMENT, statement=statement)).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "median_seconds": statistics.median(run["seconds"] for run in runs),
+        "median_max_rss_kb": statistics.median(run["max_rss_kb"] for run in runs)
+    }
+
+
+def slowest_modules(statement):
+    if sys.version_info < (3, 7):
+        return None
+    stderr = _run("{baseline}; {statement}".format(baseline=BASELINE_STATEMENT, statement=statement),
+                  ["-X", "importtime"]).stderr
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            modules.append({"module": match.group(4), "cumulative_us": int(match.group(2))})
+    return sorted(modules, key=lambda module: module["cumulative_us"], reverse=True)[:SLOWEST_MODULES]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    results = {name: measure(statement, args.repeat) for name, statement in VARIANTS.items()}
+    for name, statement in VARIANTS.items():
+        results[name]["slowest_modules"] = slowest_modules(statement)
+    results["saving_seconds"] = results["plugin_with_api"]["median_seconds"] - results["plugin"]["median_seconds"]
+    results["saving_max_rss_kb"] = (
+        results["plugin_with_api"]["median_max_rss_kb"] - results["plugin"]["median_max_rss_kb"]
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Seed an Airflow metadata database with DAGs, DAG files, DAG runs, task instances and variables.
+
+Airflow reads its configuration when it is imported, so the environment has to point at the database to seed before
+this module is imported (see `configure_environment`).
+"""
+import os
+from datetime import timedelta
+
+DAG_ID_FORMAT = "benchmark_dag_{index}"
+TASK_ID_FORMAT = "task_{index}"
+VARIABLE_KEY_FORMAT = "benchmark_variable_{index}"
+RUN_ID_FORMAT = "scheduled__{execution_date}"
+INSERT_BATCH_SIZE = 5000
+
+DAG_FILE_TEMPLATE = """
+from datetime import datetime
+
+from airflow import DAG
+from airflow.operators.dummy_operator import DummyOperator
+
+dag = DAG("{dag_id}", start_date=datetime(2018, 10, 1), schedule_interval="@daily")
+tasks = [DummyOperator(dag=dag, task_id="task_{{}}".format(index)) for index in range({tasks})]
+for upstream, downstream in zip(tasks, tasks[1:]):
+    upstream.set_downstream(downstream)
+"""
+
+
+def configure_environment(airflow_home, sql_alchemy_conn=None):
+    dags_folder = os.path.join(airflow_home, "dags")
+    os.makedirs(dags_folder, exist_ok=True)
+    os.environ["AIRFLOW_HOME"] = airflow_home
+    os.environ["AIRFLOW__CORE__DAGS_FOLDER"] = dags_folder
+    os.environ["AIRFLOW__CORE__LOAD_EXAMPLES"] = "False"
+    os.environ["AIRFLOW__CORE__SQL_ALCHEMY_CONN"] = sql_alchemy_conn or "sqlite:///{path}".format(
+        path=os.path.join(airflow_home, "airflow.db")
+    )
+    os.environ.setdefault("SLUGIFY_USES_TEXT_UNIDECODE", "yes")
+    return dags_folder
+
+
+def _insert(session, table, rows):
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        session.execute(table.insert(), rows[start:start + INSERT_BATCH_SIZE])
+
+
+def seed(dags=10, dag_runs_per_dag=100, tasks_per_dag=3, variables=100, dag_files=None):
+    """Reset the metadata database and fill it, returning the ids of the seeded objects"""
+    from airflow import settings
+    from airflow.models import DagModel, DagRun, TaskInstance, Variable
+    from airflow.utils import timezone
+    from airflow.utils.db import resetdb
+
+    resetdb(False)
+    dag_files = dags if dag_files is None else dag_files
+    start_date = timezone.datetime(2018, 10, 1)
+    dag_ids = [DAG_ID_FORMAT.format(index=index) for index in range(dags)]
+    dag_models, dag_runs, task_instances = [], [], []
+    for index, dag_id in enumerate(dag_ids):
+        fileloc = os.path.join(settings.DAGS_FOLDER, "{dag_id}.py".format(dag_id=dag_id))
+        if index < dag_files:
+            with open(fileloc, "w") as dag_file:
+                dag_file.write(DAG_FILE_TEMPLATE.format(dag_id=dag_id, tasks=tasks_per_dag))
+        dag_models.append({"dag_id": dag_id, "is_paused": False, "is_active": True, "fileloc": fileloc})
+        for run in range(dag_runs_per_dag):
+            execution_date = start_date + timedelta(days=run)
+            dag_runs.append({
+                "dag_id": dag_id,
+                "run_id": RUN_ID_FORMAT.format(execution_date=execution_date.isoformat()),
+                "execution_date": execution_date,
+                "start_date": execution_date,
+                "end_date": execution_date + timedelta(minutes=5),
+                "state": "success",
+                "external_trigger": False
+            })
+            for task in range(tasks_per_dag):
+                task_instances.append({
+                    "dag_id": dag_id,
+                    "task_id": TASK_ID_FORMAT.format(index=task),
+                    "execution_date": execution_date,
+                    "start_date": execution_date,
+                    "end_date": execution_date + timedelta(minutes=1),
+                    "duration": 60.0,
+                    "state": "success",
+                    "try_number": 1,
+                    "max_tries": 0,
+                    "hostname": "benchmark",
+                    "pool": None,
+                    "queue": "default",
+                    "priority_weight": 1,
+                    "operator": "DummyOperator"
+                })
+    variable_keys = [VARIABLE_KEY_FORMAT.format(index=index) for index in range(variables)]
+    session = settings.Session()
+    try:
+        _insert(session, DagModel.__table__, dag_models)
+        _insert(session, DagRun.__table__, dag_runs)
+        _insert(session, TaskInstance.__table__, task_instances)
+        for key in variable_keys:
+            Variable.set(key, '{"benchmark": true}', session=session)
+        session.commit()
+    finally:
+        session.close()
+    return {
+        "dag_id": dag_ids[0] if dag_ids else None,
+        "run_id": dag_runs[0]["run_id"] if dag_runs else None,
+        "dag_run_id": dag_runs[0]["run_id"] if dag_runs else None,
+        "var_name": variable_keys[0] if variable_keys else None
+    }
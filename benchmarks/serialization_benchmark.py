@@ -0,0 +1,83 @@
+"""Compare the compiled row serializers with building a dict per row and calling json.dumps.
+
+    python -m benchmarks.serialization_benchmark --rows 100000
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from flask_restplus import Model, fields
+
+from airflowapi import serialization
+from airflowapi.serialization import RowSerializer
+
+DAG_RUN_KEYS = ["dag_id", "dag_run_id", "execution_date", "state", "start_date", "end_date"]
+
+dag_run_model = Model('Airflow DAG Run', {
+    "dag_id": fields.String,
+    "dag_run_id": fields.String,
+    "execution_date": fields.DateTime,
+    "state": fields.String,
+    "start_date": fields.DateTime,
+    "end_date": fields.DateTime
+})
+
+
+def build_rows(count):
+    start = datetime(2018, 10, 1, tzinfo=timezone.utc)
+    rows = []
+    for index in range(count):
+        execution_date = start + timedelta(minutes=index)
+        rows.append((
+            "dag_{}".format(index % 100),
+            "scheduled__{}".format(execution_date.isoformat()),
+            execution_date,
+            "success",
+            execution_date + timedelta(seconds=5),
+            execution_date + timedelta(minutes=3) if index % 10 else None
+        ))
+    return rows
+
+
+def dict_per_row(rows):
+    return json.dumps([
+        {
+            "dag_id": row[0],
+            "dag_run_id": row[1],
+            "execution_date": row[2].isoformat(),
+            "state": row[3],
+            "start_date": row[4].isoformat(),
+            "end_date": row[5].isoformat() if row[5] else None
+        }
+        for row in rows
+    ])
+
+
+def run(row_count, repeat):
+    rows = build_rows(row_count)
+    serializer = RowSerializer(dag_run_model, DAG_RUN_KEYS)
+    assert json.loads(dict_per_row(rows)) == json.loads(serializer.dumps(rows))
+    baseline = min(timeit.repeat(lambda: dict_per_row(rows), number=1, repeat=repeat))
+    compiled = min(timeit.repeat(lambda: serializer.dumps(rows), number=1, repeat=repeat))
+    return {
+        "rows": row_count,
+        "orjson": serialization.orjson is not None,
+        "dict_per_row_seconds": baseline,
+        "compiled_seconds": compiled,
+        "dict_per_row_rows_per_second": row_count / baseline,
+        "compiled_rows_per_second": row_count / compiled,
+        "speedup": baseline / compiled
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
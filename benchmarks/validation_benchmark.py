@@ -0,0 +1,58 @@
+"""Compare validating bulk payloads with the compiled PayloadValidator and with flask_restplus' own validation.
+
+flask_restplus builds a jsonschema validator for every object of a collection payload. The time taken by both for each
+payload size is reported as JSON.
+
+    python -m benchmarks.validation_benchmark --sizes 100 1000 10000
+"""
+import argparse
+import json
+import timeit
+
+from flask_restplus import Model, fields
+
+from airflowapi.validation import PayloadValidator
+
+# The same fields as multi_airflow_variable_body_model, which can't be imported without an Airflow home
+variable_body_model = Model('Airflow Multiple Variable Body', {
+    "name": fields.String(required=True),
+    "value": fields.String(required=True),
+    "deserialize_json": fields.Boolean(required=True, default=False)
+})
+
+
+def build_payload(size):
+    return [
+        {"name": "variable_{}".format(index), "value": json.dumps({"index": index}), "deserialize_json": index % 2 == 0}
+        for index in range(size)
+    ]
+
+
+def restplus_validate(payload):
+    for item in payload:
+        variable_body_model.validate(item)
+
+
+def run(size, repeat):
+    payload = build_payload(size)
+    validator = PayloadValidator(variable_body_model)
+    baseline = min(timeit.repeat(lambda: restplus_validate(payload), number=1, repeat=repeat))
+    compiled = min(timeit.repeat(lambda: validator.validate(payload, collection=True), number=1, repeat=repeat))
+    return {
+        "objects": size,
+        "flask_restplus_seconds": baseline,
+        "compiled_seconds": compiled,
+        "speedup": baseline / compiled
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps([run(size, args.repeat) for size in args.sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main()
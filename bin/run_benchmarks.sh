@@ -0,0 +1,9 @@
+#!/usr/bin/env bash
+set -e
+
+# Slugify user text is necessary for apache-airflow
+export SLUGIFY_USES_TEXT_UNIDECODE=yes
+
+pip install --user ".[test]"
+
+python -m benchmarks.api_benchmark "$@"
@@ -0,0 +1,45 @@
+import json
+import uuid
+
+import pytest
+import requests
+
+from airflowapi.constants import GET_RESPONSE_SUCCESS_CODE, BAD_REQUEST_RESPONSE_CODE
+from airflowapi.v1.api_blueprint import CHANGES_RESOURCE_ROUTE, VARIABLES_RESOURCE_ROUTE
+from airflowapi.v1.changes import SINCE_KEY, CHANGES_KEY, NEXT_KEY, KIND_KEY, KEY_KEY, ACTION_KEY
+from airflowapi import change_log
+
+
+@pytest.fixture(scope="module")
+def changes_resource_uri(request, api_uri):
+    return "{api_uri}{changes_route}".format(api_uri=api_uri, changes_route=CHANGES_RESOURCE_ROUTE)
+
+
+class TestChangesResource:
+
+    def test_get_changes_returns_variable_changes_since_the_token(self, changes_resource_uri, api_uri, json_header):
+        since = requests.get(changes_resource_uri).json()[NEXT_KEY]
+        var_name = "test_change_{suffix}".format(suffix=uuid.uuid4().hex[:8])
+        variable_uri = "{api_uri}{variables_route}/{var_name}".format(
+            api_uri=api_uri,
+            variables_route=VARIABLES_RESOURCE_ROUTE,
+            var_name=var_name
+        )
+        for value in ("1", "2"):
+            payload = {"value": value, "deserialize_json": False}
+            requests.post(variable_uri, data=json.dumps(payload), headers=json_header)
+
+        resp = requests.get(changes_resource_uri, params={SINCE_KEY: since})
+        assert resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert {KIND_KEY: change_log.VARIABLE_KIND, KEY_KEY: var_name, ACTION_KEY: change_log.UPSERTED} in [
+            {key: change[key] for key in (KIND_KEY, KEY_KEY, ACTION_KEY)} for change in resp.json()[CHANGES_KEY]
+        ]
+        requests.delete(variable_uri)
+        resp = requests.get(changes_resource_uri, params={SINCE_KEY: resp.json()[NEXT_KEY]})
+        # The upserts are read again, being within the commit lag, but only the last change of the Variable is returned
+        assert [(change[KEY_KEY], change[ACTION_KEY]) for change in resp.json()[CHANGES_KEY]
+                if change[KEY_KEY] == var_name] == [(var_name, change_log.DELETED)]
+
+    def test_get_changes_rejects_invalid_tokens(self, changes_resource_uri):
+        resp = requests.get(changes_resource_uri, params={SINCE_KEY: "invalid"})
+        assert resp.status_code == BAD_REQUEST_RESPONSE_CODE
@@ -0,0 +1,75 @@
+import json
+import uuid
+
+import pytest
+import requests
+
+from airflowapi.constants import \
+    GET_RESPONSE_SUCCESS_CODE, \
+    POST_RESPONSE_SUCCESS_CODE, \
+    DELETE_RESPONSE_SUCCESS_CODE, \
+    NOT_FOUND_RESPONSE_CODE, \
+    BAD_REQUEST_RESPONSE_CODE
+from airflowapi.v1.api_blueprint import CONNECTIONS_RESOURCE_ROUTE
+from airflowapi.v1.connections import CONN_ID_KEY, CONN_TYPE_KEY, HOST_KEY, PASSWORD_KEY, EXTRA_KEY, PREFIX_KEY, \
+    MASKED_PASSWORD
+
+
+@pytest.fixture(scope="module")
+def connections_resource_uri(request, api_uri):
+    return "{api_uri}{connections_route}".format(api_uri=api_uri, connections_route=CONNECTIONS_RESOURCE_ROUTE)
+
+
+@pytest.fixture
+def connection_prefix(request, connections_resource_uri):
+    prefix = "test_conn_{suffix}_".format(suffix=uuid.uuid4().hex[:8])
+
+    def teardown_connections():
+        get_resp = requests.get(connections_resource_uri, params={PREFIX_KEY: prefix})
+        for connection in get_resp.json():
+            requests.delete("{base_uri}/{conn_id}".format(
+                base_uri=connections_resource_uri,
+                conn_id=connection[CONN_ID_KEY]
+            ))
+    request.addfinalizer(teardown_connections)
+    return prefix
+
+
+class TestConnectionsResource:
+
+    def test_post_connections_masks_passwords(self, connections_resource_uri, connection_prefix, json_header):
+        payload = [
+            {CONN_ID_KEY: connection_prefix + "db", CONN_TYPE_KEY: "postgres", PASSWORD_KEY: "secret"},
+            {CONN_ID_KEY: connection_prefix + "http", CONN_TYPE_KEY: "http", EXTRA_KEY: "{\"timeout\": 5}"}
+        ]
+        post_resp = requests.post(connections_resource_uri, data=json.dumps(payload), headers=json_header)
+        assert post_resp.status_code == POST_RESPONSE_SUCCESS_CODE
+        get_resp = requests.get(connections_resource_uri, params={PREFIX_KEY: connection_prefix})
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        body = {connection[CONN_ID_KEY]: connection for connection in get_resp.json()}
+        assert set(body) == {connection_prefix + "db", connection_prefix + "http"}
+        assert body[connection_prefix + "db"][PASSWORD_KEY] == MASKED_PASSWORD
+        assert body[connection_prefix + "http"][PASSWORD_KEY] is None
+        assert body[connection_prefix + "http"][EXTRA_KEY] == "{\"timeout\": 5}"
+
+    def test_post_connection_by_id_updates_connection(
+            self,
+            connections_resource_uri,
+            connection_prefix,
+            json_header
+    ):
+        uri = "{base_uri}/{conn_id}".format(base_uri=connections_resource_uri, conn_id=connection_prefix + "db")
+        for host in ["first", "second"]:
+            post_resp = requests.post(uri, data=json.dumps({CONN_TYPE_KEY: "postgres", HOST_KEY: host}),
+                                      headers=json_header)
+            assert post_resp.status_code == POST_RESPONSE_SUCCESS_CODE
+        get_resp = requests.get(uri)
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert get_resp.json()[HOST_KEY] == "second"
+        delete_resp = requests.delete(uri)
+        assert delete_resp.status_code == DELETE_RESPONSE_SUCCESS_CODE
+        assert requests.get(uri).status_code == NOT_FOUND_RESPONSE_CODE
+
+    def test_post_connections_will_not_post_empty_data(self, connections_resource_uri, json_header):
+        post_resp = requests.post(connections_resource_uri, data=json.dumps([]), headers=json_header)
+        assert post_resp.status_code == BAD_REQUEST_RESPONSE_CODE
@@ -7,8 +7,9 @@ from airflowapi.constants import \
     CONFLICT_RESPONSE_CODE, \
     BAD_REQUEST_RESPONSE_CODE, \
     NOT_FOUND_RESPONSE_CODE, \
-    PUT_RESPONSE_SUCCESS_CODE
-from airflowapi.v1.dag_files import FILE_KEY
+    PUT_RESPONSE_SUCCESS_CODE, \
+    MULTI_STATUS_RESPONSE_CODE
+from airflowapi.v1.dag_files import FILE_KEY, DAG_COUNT_KEY, IMPORT_ERROR_KEY, PARSE_STATS_ROUTE, STATUS_KEY
 
 
 class TestGetDagFilesResource:
@@ -99,4 +100,54 @@ class TestPutDagFilesResource:
         assert(put_resp.status_code == BAD_REQUEST_RESPONSE_CODE)
 
 
-
+class TestMultipleDagFilesResource:
+    def test_post_many_dag_files_reports_each_file(self, dag_files_resource_uri, test_dag_file_on_server):
+        files = [
+            (FILE_KEY, ("other_test_dag.py", "# not a DAG")),
+            (FILE_KEY, test_dag_file_on_server.post_data[FILE_KEY]),
+            (FILE_KEY, ("test.txt", "123"))
+        ]
+        try:
+            post_resp = requests.post(dag_files_resource_uri, files=files)
+            assert post_resp.status_code == MULTI_STATUS_RESPONSE_CODE
+            body = post_resp.json()
+            assert body["other_test_dag.py"][STATUS_KEY] == POST_RESPONSE_SUCCESS_CODE
+            assert body[test_dag_file_on_server.filename][STATUS_KEY] == CONFLICT_RESPONSE_CODE
+            assert body["test.txt"][STATUS_KEY] == BAD_REQUEST_RESPONSE_CODE
+        finally:
+            requests.delete(dag_files_resource_uri, params={"file": "other_test_dag.py"})
+
+    def test_put_many_dag_files_reports_each_file(self, dag_files_resource_uri, test_dag_file_on_server):
+        files = [(FILE_KEY, test_dag_file_on_server.post_data[FILE_KEY]), (FILE_KEY, ("test.py", "123"))]
+        put_resp = requests.put(dag_files_resource_uri, files=files)
+        assert put_resp.status_code == MULTI_STATUS_RESPONSE_CODE
+        body = put_resp.json()
+        assert body[test_dag_file_on_server.filename][STATUS_KEY] == PUT_RESPONSE_SUCCESS_CODE
+        assert body["test.py"][STATUS_KEY] == NOT_FOUND_RESPONSE_CODE
+
+    def test_delete_many_dag_files_reports_each_file(self, dag_files_resource_uri, test_dag_file_on_server):
+        delete_resp = requests.delete(
+            dag_files_resource_uri,
+            params={"file": [test_dag_file_on_server.filename, "test.py", "test.txt"]}
+        )
+        assert delete_resp.status_code == MULTI_STATUS_RESPONSE_CODE
+        body = delete_resp.json()
+        assert body[test_dag_file_on_server.filename][STATUS_KEY] == DELETE_RESPONSE_SUCCESS_CODE
+        assert body["test.py"][STATUS_KEY] == NOT_FOUND_RESPONSE_CODE
+        assert body["test.txt"][STATUS_KEY] == BAD_REQUEST_RESPONSE_CODE
+
+
+class TestGetDagFileParseStatsResource:
+    def test_get_parse_stats_reports_parsed_files(
+            self,
+            test_dag_file_on_server,
+            dags_resource_uri,
+            dag_files_resource_uri
+    ):
+        assert requests.get(dags_resource_uri).status_code == GET_RESPONSE_SUCCESS_CODE
+        get_resp = requests.get(dag_files_resource_uri + PARSE_STATS_ROUTE, params={"limit": 1000})
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        stats = [item for item in get_resp.json() if item[FILE_KEY].endswith("/" + test_dag_file_on_server.filename)]
+        assert len(stats) == 1
+        assert stats[0][DAG_COUNT_KEY] == 1
+        assert stats[0][IMPORT_ERROR_KEY] is None
@@ -12,9 +12,12 @@ from airflowapi.constants import \
     CONFLICT_RESPONSE_CODE, \
     BAD_REQUEST_RESPONSE_CODE
 from airflowapi.v1.dag_runs import DAG_ID_KEY, DAG_RUN_EXECUTION_DATE_KEY, DAG_RUN_START_DATE_KEY,\
-    DAG_RUN_END_DATE_KEY, DAG_RUN_ID_KEY, DAG_RUN_STATE_KEY
+    DAG_RUN_END_DATE_KEY, DAG_RUN_ID_KEY, DAG_RUN_STATE_KEY, SORT_KEY, RUN_ID_PREFIX, INDEX_REPORT_KEY, \
+    DAG_RUN_IDS_KEY, FILTER_KEY, ROWS_KEY, CLEAR_TASK_INSTANCES_KEY, CLEAR_REQUIRES_RUNNING_MESSAGE
+from airflowapi.v1.pagination import LIMIT_KEY, CURSOR_KEY, NEXT_CURSOR_HEADER
 
 GET_DAG_RUN_BY_ID_ROUTE = "{url}/{dag_run_id}"
+MANUAL_RUN_ID_PREFIX = "manual__"
 
 
 class TestPostDagRunResource:
@@ -88,3 +91,83 @@ class TestGetDagRunsResource:
         get_url = GET_DAG_RUN_BY_ID_ROUTE.format(url=dag_runs_resource_uri, dag_run_id="THISISINVALID")
         get_resp = requests.get(get_url)
         assert get_resp.status_code == NOT_FOUND_RESPONSE_CODE
+
+
+class TestSearchDagRunsResource:
+
+    def test_search_dag_runs_by_dag_id_pages_through_the_runs(
+            self,
+            dag_runs_resource_uri,
+            existing_dag_run,
+            existing_dag_run_in_past,
+            test_dag_id
+    ):
+        params = {
+            DAG_ID_KEY: test_dag_id,
+            RUN_ID_PREFIX: MANUAL_RUN_ID_PREFIX,
+            SORT_KEY: "-" + DAG_RUN_EXECUTION_DATE_KEY,
+            LIMIT_KEY: 1
+        }
+        get_resp = requests.get(dag_runs_resource_uri, params=params)
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert [dag_run[DAG_RUN_ID_KEY] for dag_run in get_resp.json()] == [existing_dag_run[DAG_RUN_ID_KEY]]
+        params[CURSOR_KEY] = get_resp.headers[NEXT_CURSOR_HEADER]
+        get_resp = requests.get(dag_runs_resource_uri, params=params)
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert [dag_run[DAG_RUN_ID_KEY] for dag_run in get_resp.json()] == [existing_dag_run_in_past[DAG_RUN_ID_KEY]]
+
+    def test_search_dag_runs_by_run_id_prefix(self, dag_runs_resource_uri, existing_dag_run, test_dag_id):
+        params = {DAG_ID_KEY: test_dag_id, RUN_ID_PREFIX: existing_dag_run[DAG_RUN_ID_KEY][:-1]}
+        get_resp = requests.get(dag_runs_resource_uri, params=params)
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert existing_dag_run[DAG_RUN_ID_KEY] in [dag_run[DAG_RUN_ID_KEY] for dag_run in get_resp.json()]
+
+    def test_search_dag_runs_index_report_flags_full_scans(self, dag_runs_resource_uri):
+        params = {DAG_RUN_STATE_KEY: State.RUNNING, INDEX_REPORT_KEY: True}
+        get_resp = requests.get(dag_runs_resource_uri, params=params)
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert get_resp.json()["full_scan"]
+
+
+class TestUpdateDagRunsResource:
+
+    def test_patch_dag_runs_marks_the_selected_runs(
+            self,
+            dag_runs_resource_uri,
+            existing_dag_run,
+            existing_dag_run_in_past,
+            test_dag_id,
+            json_header
+    ):
+        payload = {
+            DAG_RUN_STATE_KEY: State.FAILED,
+            DAG_RUN_IDS_KEY: [existing_dag_run[DAG_RUN_ID_KEY]],
+            FILTER_KEY: {DAG_ID_KEY: [test_dag_id]}
+        }
+        patch_resp = requests.patch(dag_runs_resource_uri, data=json.dumps(payload), headers=json_header)
+        assert patch_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert patch_resp.json()[ROWS_KEY]["dag_run"] == 1
+        params = {DAG_ID_KEY: test_dag_id, DAG_RUN_STATE_KEY: State.FAILED}
+        get_resp = requests.get(dag_runs_resource_uri, params=params)
+        assert [dag_run[DAG_RUN_ID_KEY] for dag_run in get_resp.json()] == [existing_dag_run[DAG_RUN_ID_KEY]]
+
+    def test_patch_dag_runs_requires_a_selection(self, dag_runs_resource_uri, json_header):
+        payload = {DAG_RUN_STATE_KEY: State.FAILED}
+        patch_resp = requests.patch(dag_runs_resource_uri, data=json.dumps(payload), headers=json_header)
+        assert patch_resp.status_code == BAD_REQUEST_RESPONSE_CODE
+
+    def test_patch_dag_runs_only_clears_task_instances_of_running_runs(
+            self,
+            dag_runs_resource_uri,
+            existing_dag_run,
+            json_header
+    ):
+        payload = {
+            DAG_RUN_STATE_KEY: State.SUCCESS,
+            CLEAR_TASK_INSTANCES_KEY: True,
+            DAG_RUN_IDS_KEY: [existing_dag_run[DAG_RUN_ID_KEY]],
+            FILTER_KEY: {DAG_ID_KEY: [existing_dag_run[DAG_ID_KEY]]}
+        }
+        patch_resp = requests.patch(dag_runs_resource_uri, data=json.dumps(payload), headers=json_header)
+        assert patch_resp.status_code == BAD_REQUEST_RESPONSE_CODE
+        assert patch_resp.json()["message"] == CLEAR_REQUIRES_RUNNING_MESSAGE
@@ -8,8 +8,12 @@ from airflowapi.constants import \
     GET_RESPONSE_SUCCESS_CODE, \
     DELETE_RESPONSE_SUCCESS_CODE, \
     NOT_FOUND_RESPONSE_CODE, \
-    PUT_RESPONSE_SUCCESS_CODE
-from airflowapi.v1.dags import FILE_LOCATION_KEY, DAG_ID_KEY, IS_PAUSED_KEY, PAUSE_ROUTE, UNPAUSE_ROUTE
+    PUT_RESPONSE_SUCCESS_CODE, \
+    BAD_REQUEST_RESPONSE_CODE
+from airflowapi.v1.dags import FILE_LOCATION_KEY, DAG_ID_KEY, IS_PAUSED_KEY, PAUSE_ROUTE, UNPAUSE_ROUTE, \
+    STRUCTURE_ROUTE, PATTERN_KEY, DAG_IDS_KEY, FILES_KEY, ROWS_KEY, XCOMS_ROUTE, SKIPPED_FILES_KEY
+from airflowapi.dag_structure import TASKS_KEY, TASK_ID_KEY, EDGES_KEY, UPSTREAM_TASK_ID_KEY, DOWNSTREAM_TASK_ID_KEY, \
+    SCHEDULE_INTERVAL_KEY
 from airflowapi.v1.dag_runs import DAG_RUN_EXECUTION_DATE_KEY, EXECUTION_DATE_BEFORE, EXECUTION_DATE_AFTER, \
     DAG_RUN_ID_KEY
 from airflowapi.v1.api_blueprint import DAG_RUNS_RESOURCE_ROUTE
@@ -46,6 +50,23 @@ class TestGetDagByIdResource:
         assert get_resp.status_code == NOT_FOUND_RESPONSE_CODE
 
 
+class TestGetDagStructureResource:
+    def test_get_dag_structure_works(self, test_dag_file_on_server, dag_by_dag_id_format):
+        uri = dag_by_dag_id_format.format(dag_id=test_dag_file_on_server.dag_id) + STRUCTURE_ROUTE
+        get_resp = requests.get(uri)
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        body = get_resp.json()
+        assert body[DAG_ID_KEY] == test_dag_file_on_server.dag_id
+        assert body[SCHEDULE_INTERVAL_KEY] == "0 0 * * *"
+        assert [task[TASK_ID_KEY] for task in body[TASKS_KEY]] == ["task1", "task2"]
+        assert body[EDGES_KEY] == [{UPSTREAM_TASK_ID_KEY: "task1", DOWNSTREAM_TASK_ID_KEY: "task2"}]
+
+    def test_get_dag_structure_will_throw_404(self, dag_by_dag_id_format):
+        uri = dag_by_dag_id_format.format(dag_id="123") + STRUCTURE_ROUTE
+        get_resp = requests.get(uri)
+        assert get_resp.status_code == NOT_FOUND_RESPONSE_CODE
+
+
 class TestDeleteDagByIdResource:
     def test_delete_dag_by_id_works(self, test_dag_file_on_server, dag_by_dag_id_format):
         uri = dag_by_dag_id_format.format(dag_id=test_dag_file_on_server.dag_id)
@@ -58,6 +79,29 @@ class TestDeleteDagByIdResource:
         assert delete_resp.status_code == NOT_FOUND_RESPONSE_CODE
 
 
+class TestDeleteDagsResource:
+    def test_delete_dags_by_pattern_purges_runs_and_files(
+            self,
+            dags_resource_uri,
+            dag_by_dag_id_format,
+            existing_dag_run,
+            test_dag_id
+    ):
+        delete_resp = requests.delete(dags_resource_uri, params={PATTERN_KEY: test_dag_id[:-1] + "*"})
+        assert delete_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        body = delete_resp.json()
+        assert body[DAG_IDS_KEY] == [test_dag_id]
+        assert len(body[FILES_KEY]) == 1
+        assert body[SKIPPED_FILES_KEY] == {}
+        assert body[ROWS_KEY]["dag_run"] == 1
+        assert body[ROWS_KEY]["dag"] == 1
+        assert requests.get(dag_by_dag_id_format.format(dag_id=test_dag_id)).status_code == NOT_FOUND_RESPONSE_CODE
+
+    def test_delete_dags_requires_a_selection(self, dags_resource_uri):
+        delete_resp = requests.delete(dags_resource_uri)
+        assert delete_resp.status_code == BAD_REQUEST_RESPONSE_CODE
+
+
 class TestPauseDagByDagIdResource:
     def test_pause_dag_by_id_works(self, test_dag_file_on_server, dag_by_dag_id_format):
         sleep(10)
@@ -149,3 +193,26 @@ class TestGetDagRunsByDagIdResource:
             else:
                 assert key in dr
 
+
+class TestGetDagRunXComsResource:
+    def test_get_dag_run_xcoms_works(self, dag_by_dag_id_format, existing_dag_run):
+        base_uri = dag_by_dag_id_format.format(dag_id=existing_dag_run[DAG_ID_KEY])
+        url = "{dag_runs_uri}/{run_id}{xcoms_route}".format(
+            dag_runs_uri=DAG_RUNS_BY_DAG_ID_FORMAT.format(base_uri=base_uri),
+            run_id=existing_dag_run[DAG_RUN_ID_KEY],
+            xcoms_route=XCOMS_ROUTE
+        )
+        get_resp = requests.get(url)
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert isinstance(get_resp.json(), list)
+        value_resp = requests.get("{url}/missing_task/missing_key".format(url=url))
+        assert value_resp.status_code == NOT_FOUND_RESPONSE_CODE
+
+    def test_get_dag_run_xcoms_will_throw_404(self, dag_by_dag_id_format, existing_dag_run):
+        base_uri = dag_by_dag_id_format.format(dag_id=existing_dag_run[DAG_ID_KEY])
+        url = "{dag_runs_uri}/missing_run{xcoms_route}".format(
+            dag_runs_uri=DAG_RUNS_BY_DAG_ID_FORMAT.format(base_uri=base_uri),
+            xcoms_route=XCOMS_ROUTE
+        )
+        get_resp = requests.get(url)
+        assert get_resp.status_code == NOT_FOUND_RESPONSE_CODE
@@ -1,7 +1,7 @@
 import pytest
 import requests
 
-from airflowapi.constants import GET_RESPONSE_SUCCESS_CODE
+from airflowapi.constants import GET_RESPONSE_SUCCESS_CODE, SERVICE_UNAVAILABLE_RESPONSE_CODE
 from airflowapi.v1.api_blueprint import HEALTH_ROUTE
 
 
@@ -17,3 +17,12 @@ class TestHealthResource:
         resp = requests.get(health_resource_uri)
         assert resp.status_code == GET_RESPONSE_SUCCESS_CODE
         assert resp.json()["health"] == "ok"
+
+    def test_deep_health_resource_reports_checks(self, health_resource_uri):
+
+        resp = requests.get(health_resource_uri, params={"deep": True})
+        assert resp.status_code in [GET_RESPONSE_SUCCESS_CODE, SERVICE_UNAVAILABLE_RESPONSE_CODE]
+        checks = resp.json()["checks"]
+        assert set(checks) == {"database", "pool", "dags_folder", "scheduler"}
+        assert checks["database"]["status"] == "ok"
+        assert all("latency_ms" in check for check in checks.values())
@@ -0,0 +1,62 @@
+import json
+import time
+
+import pytest
+import requests
+
+from airflowapi.authorization import ADMIN_TOKEN_HEADER
+from airflowapi.background_jobs import ID_KEY, STATE_KEY, RUNNING_STATE, SUCCESS_STATE
+from airflowapi.constants import GET_RESPONSE_SUCCESS_CODE, ACCEPTED_RESPONSE_CODE, FORBIDDEN_RESPONSE_CODE, \
+    NOT_FOUND_RESPONSE_CODE
+from airflowapi.v1.api_blueprint import MAINTENANCE_RESOURCE_ROUTE
+from airflowapi.v1.maintenance import PURGE_ROUTE, CUTOFF_KEY, DAG_ID_KEY, DRY_RUN_KEY, ROWS_KEY
+
+# Matches AIRFLOW__AIRFLOW_API__ADMIN_TOKEN in docker-compose-LocalExecutor.yml
+ADMIN_TOKEN = "integration-test-admin-token"
+JOB_TIMEOUT = 60
+# Before any DAG run the tests create, so purging it deletes nothing they rely on
+PAST_CUTOFF = "2000-01-01T00:00:00+00:00"
+
+
+@pytest.fixture(scope="module")
+def purge_resource_uri(request, api_uri):
+    return "{api_uri}{maintenance_route}{purge_route}".format(
+        api_uri=api_uri,
+        maintenance_route=MAINTENANCE_RESOURCE_ROUTE,
+        purge_route=PURGE_ROUTE
+    )
+
+
+@pytest.fixture
+def admin_header(request, json_header):
+    return dict(json_header, **{ADMIN_TOKEN_HEADER: ADMIN_TOKEN})
+
+
+class TestPurgeResource:
+
+    def test_purge_requires_the_admin_token(self, purge_resource_uri, json_header):
+        post_resp = requests.post(purge_resource_uri, data=json.dumps({CUTOFF_KEY: PAST_CUTOFF}), headers=json_header)
+        assert post_resp.status_code == FORBIDDEN_RESPONSE_CODE
+
+    def test_dry_run_counts_the_rows_to_delete(self, purge_resource_uri, admin_header, existing_dag_run, test_dag_id):
+        payload = {CUTOFF_KEY: PAST_CUTOFF, DAG_ID_KEY: test_dag_id, DRY_RUN_KEY: True}
+        post_resp = requests.post(purge_resource_uri, data=json.dumps(payload), headers=admin_header)
+        assert post_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert post_resp.json()[ROWS_KEY]["dag_run"] == 0
+
+    def test_purge_runs_in_a_job_that_can_be_followed(self, purge_resource_uri, admin_header):
+        post_resp = requests.post(purge_resource_uri, data=json.dumps({CUTOFF_KEY: PAST_CUTOFF}), headers=admin_header)
+        assert post_resp.status_code == ACCEPTED_RESPONSE_CODE
+        job_uri = "{base_uri}/{job_id}".format(base_uri=purge_resource_uri, job_id=post_resp.json()[ID_KEY])
+        started_at = time.time()
+        job = requests.get(job_uri, headers=admin_header).json()
+        while job[STATE_KEY] == RUNNING_STATE:
+            assert time.time() - started_at < JOB_TIMEOUT
+            time.sleep(1)
+            job = requests.get(job_uri, headers=admin_header).json()
+        assert job[STATE_KEY] == SUCCESS_STATE
+
+    def test_unknown_job_is_not_found(self, purge_resource_uri, admin_header):
+        get_resp = requests.get("{base_uri}/{job_id}".format(base_uri=purge_resource_uri, job_id="0" * 32),
+                                headers=admin_header)
+        assert get_resp.status_code == NOT_FOUND_RESPONSE_CODE
@@ -0,0 +1,38 @@
+import json
+import uuid
+
+import pytest
+import requests
+
+from airflowapi.constants import GET_RESPONSE_SUCCESS_CODE, POST_RESPONSE_SUCCESS_CODE, BAD_REQUEST_RESPONSE_CODE
+from airflowapi.v1.api_blueprint import POOLS_RESOURCE_ROUTE
+from airflowapi.v1.pools import POOL_KEY, SLOTS_KEY, DESCRIPTION_KEY, RUNNING_SLOTS_KEY, QUEUED_SLOTS_KEY, \
+    OPEN_SLOTS_KEY
+
+
+@pytest.fixture(scope="module")
+def pools_resource_uri(request, api_uri):
+    return "{api_uri}{pools_route}".format(api_uri=api_uri, pools_route=POOLS_RESOURCE_ROUTE)
+
+
+class TestPoolsResource:
+
+    def test_post_pools_creates_and_updates_pools(self, pools_resource_uri, json_header):
+        pool_name = "test_pool_{suffix}".format(suffix=uuid.uuid4().hex[:8])
+        payload = [{POOL_KEY: pool_name, SLOTS_KEY: 2, DESCRIPTION_KEY: "test"}, {POOL_KEY: pool_name, SLOTS_KEY: 5}]
+        post_resp = requests.post(pools_resource_uri, data=json.dumps(payload), headers=json_header)
+        assert post_resp.status_code == POST_RESPONSE_SUCCESS_CODE
+        get_resp = requests.get(pools_resource_uri, params={POOL_KEY: pool_name})
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert get_resp.json() == [{
+            POOL_KEY: pool_name,
+            SLOTS_KEY: 5,
+            DESCRIPTION_KEY: None,
+            RUNNING_SLOTS_KEY: 0,
+            QUEUED_SLOTS_KEY: 0,
+            OPEN_SLOTS_KEY: 5
+        }]
+
+    def test_post_pools_will_not_post_empty_data(self, pools_resource_uri, json_header):
+        post_resp = requests.post(pools_resource_uri, data=json.dumps([]), headers=json_header)
+        assert post_resp.status_code == BAD_REQUEST_RESPONSE_CODE
@@ -0,0 +1,50 @@
+import requests
+
+from airflowapi.constants import GET_RESPONSE_SUCCESS_CODE, NOT_FOUND_RESPONSE_CODE
+from airflowapi.v1.api_blueprint import DAG_RUNS_RESOURCE_ROUTE, TASK_INSTANCES_RESOURCE_ROUTE
+from airflowapi.v1.dags import TASK_INSTANCES_ROUTE
+from airflowapi.v1.dag_runs import DAG_ID_KEY, DAG_RUN_ID_KEY
+from airflowapi.v1.pagination import FIELDS_KEY, LIMIT_KEY, CURSOR_KEY, NEXT_CURSOR_HEADER
+from airflowapi.v1.task_instances import TASK_ID_KEY, STATE_KEY
+
+DAG_RUN_TASKS_FORMAT = "{{base_uri}}{dag_runs_route}/{{run_id}}{tasks_route}".format(
+    dag_runs_route=DAG_RUNS_RESOURCE_ROUTE,
+    tasks_route=TASK_INSTANCES_ROUTE
+)
+
+
+class TestDagRunTaskInstancesResource:
+    def test_get_task_instances_of_dag_run_works(self, dag_by_dag_id_format, existing_dag_run):
+        base_uri = dag_by_dag_id_format.format(dag_id=existing_dag_run[DAG_ID_KEY])
+        url = DAG_RUN_TASKS_FORMAT.format(base_uri=base_uri, run_id=existing_dag_run[DAG_RUN_ID_KEY])
+        get_resp = requests.get(url)
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert sorted(ti[TASK_ID_KEY] for ti in get_resp.json()) == ["task1", "task2"]
+
+    def test_get_task_instances_projects_fields(self, dag_by_dag_id_format, existing_dag_run):
+        base_uri = dag_by_dag_id_format.format(dag_id=existing_dag_run[DAG_ID_KEY])
+        url = DAG_RUN_TASKS_FORMAT.format(base_uri=base_uri, run_id=existing_dag_run[DAG_RUN_ID_KEY])
+        get_resp = requests.get(url, params={FIELDS_KEY: "{},{}".format(TASK_ID_KEY, STATE_KEY)})
+        assert get_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        for ti in get_resp.json():
+            assert set(ti.keys()) == {TASK_ID_KEY, STATE_KEY}
+
+    def test_get_task_instances_of_missing_dag_run_will_throw_404(self, dag_by_dag_id_format, test_dag_file_on_server):
+        base_uri = dag_by_dag_id_format.format(dag_id=test_dag_file_on_server.dag_id)
+        url = DAG_RUN_TASKS_FORMAT.format(base_uri=base_uri, run_id="123")
+        get_resp = requests.get(url)
+        assert get_resp.status_code == NOT_FOUND_RESPONSE_CODE
+
+
+class TestMultiTaskInstanceResource:
+    def test_get_task_instances_pages_through_results(self, api_uri, existing_dag_run):
+        url = "{api_uri}{route}".format(api_uri=api_uri, route=TASK_INSTANCES_RESOURCE_ROUTE)
+        params = {DAG_ID_KEY: existing_dag_run[DAG_ID_KEY], LIMIT_KEY: 1}
+        first_resp = requests.get(url, params=params)
+        assert first_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert len(first_resp.json()) == 1
+        params[CURSOR_KEY] = first_resp.headers[NEXT_CURSOR_HEADER]
+        second_resp = requests.get(url, params=params)
+        assert second_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        assert len(second_resp.json()) == 1
+        assert first_resp.json()[0][TASK_ID_KEY] != second_resp.json()[0][TASK_ID_KEY]
@@ -1,15 +1,20 @@
+import gzip
 import pytest
 import requests
 import json
+import uuid
 
 from airflowapi.constants import \
     GET_RESPONSE_SUCCESS_CODE, \
     DELETE_RESPONSE_SUCCESS_CODE, \
     POST_RESPONSE_SUCCESS_CODE, \
     NOT_FOUND_RESPONSE_CODE, \
-    BAD_REQUEST_RESPONSE_CODE
+    BAD_REQUEST_RESPONSE_CODE, \
+    UNPROCESSABLE_ENTITY_RESPONSE_CODE
+from airflowapi.idempotency import IDEMPOTENCY_KEY_HEADER, REPLAYED_HEADER
 
-from airflowapi.v1.variables import NAME_KEY, VALUE_KEY, DESERIALIZE_JSON_KEY
+from airflowapi.v1.variables import NAME_KEY, VALUE_KEY, DESERIALIZE_JSON_KEY, GZIP_KEY, IMPORTED_KEY, \
+    JSON_LINES_MIME_TYPE
 
 
 @pytest.fixture(scope='module')
@@ -104,6 +109,28 @@ class TestPostVariablesResource:
         post_resp = requests.post(variables_resource_uri, data=json.dumps([]), headers=json_header)
         assert post_resp.status_code == BAD_REQUEST_RESPONSE_CODE
 
+    def test_post_variables_replays_retries_with_the_same_idempotency_key(
+            self,
+            variables_resource_uri,
+            variable_payload,
+            json_header
+    ):
+        headers = dict(json_header, **{IDEMPOTENCY_KEY_HEADER: str(uuid.uuid4())})
+        data = json.dumps([variable_payload])
+        post_resp = requests.post(variables_resource_uri, data=data, headers=headers)
+        assert post_resp.status_code == POST_RESPONSE_SUCCESS_CODE
+        retry_resp = requests.post(variables_resource_uri, data=data, headers=headers)
+        assert retry_resp.status_code == POST_RESPONSE_SUCCESS_CODE
+        assert retry_resp.headers[REPLAYED_HEADER] == "true"
+        assert retry_resp.json() == post_resp.json()
+        reused_resp = requests.post(variables_resource_uri, data=json.dumps([variable_payload] * 2), headers=headers)
+        assert reused_resp.status_code == UNPROCESSABLE_ENTITY_RESPONSE_CODE
+        delete_resp = requests.delete("{variables_resource_uri}/{var_name}".format(
+            variables_resource_uri=variables_resource_uri,
+            var_name=variable_payload[NAME_KEY]
+        ))
+        assert delete_resp.status_code == DELETE_RESPONSE_SUCCESS_CODE
+
 
 class TestGetVariablesResource:
     def test_get_variables_works_with_variable(self, variables_resource_uri, existing_variable):
@@ -234,3 +261,33 @@ class TestPostVariableByIdResource:
         assert body[DESERIALIZE_JSON_KEY] == json_variable_payload[DESERIALIZE_JSON_KEY]
         delete_resp = requests.delete(uri)
         assert delete_resp.status_code == DELETE_RESPONSE_SUCCESS_CODE
+
+
+class TestExportImportVariablesResource:
+    def test_imported_variables_are_exported(self, variables_resource_uri, variable_payload):
+        lines = [json.dumps({NAME_KEY: variable_payload[NAME_KEY], VALUE_KEY: value}) for value in ["first", "last"]]
+        import_resp = requests.post(
+            "{base_uri}/_import".format(base_uri=variables_resource_uri),
+            data="\n".join(lines),
+            headers={"Content-Type": JSON_LINES_MIME_TYPE}
+        )
+        assert import_resp.status_code == POST_RESPONSE_SUCCESS_CODE
+        assert import_resp.json()[IMPORTED_KEY] == 1
+        export_uri = "{base_uri}/_export".format(base_uri=variables_resource_uri)
+        export_resp = requests.get(export_uri, params={GZIP_KEY: True})
+        assert export_resp.status_code == GET_RESPONSE_SUCCESS_CODE
+        exported = [json.loads(line) for line in gzip.decompress(export_resp.content).decode("utf-8").splitlines()]
+        assert {NAME_KEY: variable_payload[NAME_KEY], VALUE_KEY: "last"} in exported
+        delete_resp = requests.delete("{variables_resource_uri}/{var_name}".format(
+            variables_resource_uri=variables_resource_uri,
+            var_name=variable_payload[NAME_KEY]
+        ))
+        assert delete_resp.status_code == DELETE_RESPONSE_SUCCESS_CODE
+
+    def test_import_rejects_invalid_lines(self, variables_resource_uri):
+        import_resp = requests.post(
+            "{base_uri}/_import".format(base_uri=variables_resource_uri),
+            data="not json",
+            headers={"Content-Type": JSON_LINES_MIME_TYPE}
+        )
+        assert import_resp.status_code == BAD_REQUEST_RESPONSE_CODE
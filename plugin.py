@@ -1,7 +1,7 @@
 from airflow.plugins_manager import AirflowPlugin
-from airflowapi.v1.api_blueprint import blueprint
+from airflowapi.blueprints import v1_blueprint
 
 
 class AirflowAPIPlugin(AirflowPlugin):
     name = "airflow_api"
-    flask_blueprints = [blueprint]
+    flask_blueprints = [v1_blueprint]
@@ -28,7 +28,10 @@ setup(
     include_package_data=True,
     install_requires=install_requires,
     extras_require={
-      "test": setup_requires + test_requires + install_requires
+      "test": setup_requires + test_requires + install_requires,
+      "speedups": ['orjson'],
+      "metrics": ['prometheus_client'],
+      "asgi": ['uvicorn']
     },
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -0,0 +1,82 @@
+import threading
+
+from flask import Flask, Response
+
+from airflowapi import admission
+from airflowapi.admission import RateLimiter, TokenBucket
+from airflowapi.constants import SERVICE_UNAVAILABLE_RESPONSE_CODE, TOO_MANY_REQUESTS_RESPONSE_CODE
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdmission:
+
+    def test_token_bucket_allows_a_burst_then_waits_for_a_token(self):
+        bucket = TokenBucket(rate=2, capacity=3, now=0)
+        assert [bucket.acquire(0) for _ in range(3)] == [0, 0, 0]
+        assert bucket.acquire(0) == 0.5
+
+    def test_token_bucket_refills_at_its_rate(self):
+        bucket = TokenBucket(rate=2, capacity=1, now=0)
+        bucket.acquire(0)
+        assert bucket.acquire(0.25) > 0
+        assert bucket.acquire(0.75) == 0
+
+    def test_rate_limiter_limits_clients_separately(self):
+        limiter = RateLimiter(rate=1, capacity=1, clock=FakeClock())
+        assert limiter.acquire("10.0.0.1") == 0
+        assert limiter.acquire("10.0.0.1") > 0
+        assert limiter.acquire("10.0.0.2") == 0
+
+    def test_rate_limiter_forgets_idle_clients(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=1, capacity=1, max_clients=2, clock=clock)
+        limiter.acquire("10.0.0.1")
+        limiter.acquire("10.0.0.2")
+        clock.now = 5
+        limiter.acquire("10.0.0.3")
+        assert list(limiter._buckets) == ["10.0.0.3"]
+
+    def test_rate_limiter_forgets_the_least_recent_clients_when_all_are_active(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=1, capacity=1, max_clients=2, clock=clock)
+        limiter.acquire("10.0.0.1")
+        limiter.acquire("10.0.0.2")
+        limiter.acquire("10.0.0.1")
+        limiter.acquire("10.0.0.3")
+        assert list(limiter._buckets) == ["10.0.0.1", "10.0.0.3"]
+
+    def test_routes_of_a_namespace_are_limited_separately(self, monkeypatch):
+        monkeypatch.setattr(admission, "rate_limiter_for_namespace", lambda name: RateLimiter(rate=1, capacity=1))
+        app = Flask(__name__)
+        app.add_url_rule("/api/dags", "dags", lambda: "dags")
+        app.add_url_rule("/api/dags/<dag_id>", "dag", lambda dag_id: dag_id)
+        app.before_request(admission.rate_limit_namespaces("/api", {"/dags": "dags"}))
+        client = app.test_client()
+        assert client.get("/api/dags").status_code == 200
+        assert client.get("/api/dags").status_code == TOO_MANY_REQUESTS_RESPONSE_CODE
+        assert client.get("/api/dags/example").status_code == 200
+        assert client.get("/api/dags/other").status_code == TOO_MANY_REQUESTS_RESPONSE_CODE
+
+    def test_streamed_heavy_requests_hold_their_slot_until_closed(self, monkeypatch):
+        monkeypatch.setattr(admission, "_heavy_requests", threading.BoundedSemaphore(1))
+        app = Flask(__name__)
+
+        @app.route("/export")
+        @admission.heavy_request
+        def export():
+            return Response(iter([b"a", b"b"]))
+
+        client = app.test_client()
+        streaming = client.get("/export", buffered=False)
+        assert client.get("/export").status_code == SERVICE_UNAVAILABLE_RESPONSE_CODE
+        assert b"".join(streaming.response) == b"ab"
+        streaming.close()
+        assert client.get("/export").status_code == 200
@@ -0,0 +1,109 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from airflowapi.admission import RateLimiter
+from airflowapi.asgi import AsgiApplication, DagRunWatcher
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def hello_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [b"hello ", environ["PATH_INFO"].encode("latin-1"), b" ", environ["wsgi.input"].read()]
+
+
+async def call(application, scope, body=b""):
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    return sent
+
+
+class TestAsgi:
+
+    def test_wsgi_requests_are_bridged(self):
+        application = AsgiApplication(hello_app, worker_threads=1)
+        scope = {"type": "http", "method": "POST", "path": "/api/v1/variables", "query_string": b"", "headers": []}
+        sent = run(call(application, scope, b"body"))
+        assert sent[0]["status"] == 200
+        assert b"".join(message.get("body", b"") for message in sent[1:]) == b"hello /api/v1/variables body"
+        assert not sent[-1]["more_body"]
+
+    def test_waiters_are_resolved_by_one_poll(self):
+        states = {("dag", "run_1"): "running", ("dag", "run_2"): "running"}
+        fetches = []
+
+        def fetch(keys):
+            fetches.append(keys)
+            return {key: key + (states[key],) for key in keys}
+
+        watcher = DagRunWatcher(ThreadPoolExecutor(max_workers=1), poll_interval=0.01, fetch=fetch, state_index=2)
+
+        async def wait_for_both():
+            waiting = asyncio.gather(
+                watcher.wait("dag", "run_1", {"success"}, timeout=5),
+                watcher.wait("dag", "run_2", {"success"}, timeout=5)
+            )
+            await asyncio.sleep(0.05)
+            states[("dag", "run_1")] = states[("dag", "run_2")] = "success"
+            return await waiting
+
+        results = run(wait_for_both())
+        assert results == [(("dag", "run_1", "success"), False), (("dag", "run_2", "success"), False)]
+        assert [len(keys) for keys in fetches[2:]] == [2] * len(fetches[2:])
+
+    def test_waiters_time_out_with_the_latest_row(self):
+        watcher = DagRunWatcher(
+            ThreadPoolExecutor(max_workers=1),
+            poll_interval=0.01,
+            fetch=lambda keys: {key: key + ("running",) for key in keys if key[1] != "missing"},
+            state_index=2
+        )
+        assert run(watcher.wait("dag", "run", {"success"}, timeout=0.05)) == (("dag", "run", "running"), True)
+        assert run(watcher.wait("dag", "missing", {"success"}, timeout=0.05)) == (None, False)
+
+    def test_requests_whose_client_disconnects_are_not_handled(self):
+        handled = []
+
+        def app(environ, start_response):
+            handled.append(environ["wsgi.input"].read())
+            return hello_app(environ, start_response)
+
+        messages = [{"type": "http.request", "body": b"part", "more_body": True}, {"type": "http.disconnect"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/api/v1/files", "query_string": b"", "headers": []}
+        run(AsgiApplication(app, worker_threads=1)(scope, receive, send))
+        assert handled == []
+        assert sent == []
+
+    def test_waiting_is_rate_limited(self):
+        application = AsgiApplication(hello_app, worker_threads=1, wait_rate_limiter=RateLimiter(1, 1, clock=lambda: 0))
+
+        async def wait_for_dag_run(scope, dag_id, run_id):
+            return 200, [], b"{}"
+
+        application._wait_for_dag_run = wait_for_dag_run
+        scope = {
+            "type": "http", "method": "GET", "path": "/api/v1/dags/dag/dag-runs/run/wait", "query_string": b"",
+            "headers": [], "client": ("10.0.0.1", 1234)
+        }
+        assert run(call(application, scope))[0]["status"] == 200
+        rejected = run(call(application, scope))[0]
+        assert rejected["status"] == 429
+        assert (b"retry-after", b"1") in rejected["headers"]
@@ -0,0 +1,35 @@
+import pytest
+from flask import Flask
+from werkzeug.exceptions import Forbidden
+
+from airflowapi import authorization
+from airflowapi.authorization import ADMIN_TOKEN_HEADER, admin_required, is_admin_request
+
+app = Flask(__name__)
+
+
+@admin_required
+def admin_operation():
+    return "done"
+
+
+class TestAuthorization:
+
+    def test_admin_operations_are_disabled_without_a_token(self, monkeypatch):
+        monkeypatch.setattr(authorization, "ADMIN_TOKEN", None)
+        with app.test_request_context(headers={ADMIN_TOKEN_HEADER: ""}):
+            assert not is_admin_request()
+
+    def test_matching_token_is_admin(self, monkeypatch):
+        monkeypatch.setattr(authorization, "ADMIN_TOKEN", "secret")
+        with app.test_request_context(headers={ADMIN_TOKEN_HEADER: "secret"}):
+            assert is_admin_request()
+            assert admin_operation() == "done"
+
+    def test_wrong_or_missing_token_is_forbidden(self, monkeypatch):
+        monkeypatch.setattr(authorization, "ADMIN_TOKEN", "secret")
+        for headers in ({ADMIN_TOKEN_HEADER: "guess"}, {}):
+            with app.test_request_context(headers=headers):
+                assert not is_admin_request()
+                with pytest.raises(Forbidden):
+                    admin_operation()
@@ -0,0 +1,98 @@
+import os
+import subprocess
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from dateutil.parser import isoparse
+from airflow.utils import timezone
+
+from airflowapi import background_jobs
+from airflowapi.utilities import write_json_atomically
+
+JOB_TIMEOUT = 5
+
+
+def wait_for(job_id):
+    started_at = time.time()
+    job = background_jobs.get_job(job_id)
+    while job[background_jobs.STATE_KEY] == background_jobs.RUNNING_STATE:
+        assert time.time() - started_at < JOB_TIMEOUT
+        time.sleep(0.01)
+        job = background_jobs.get_job(job_id)
+    return job
+
+
+def write_running_job(hostname, pid, heartbeat_at):
+    job = {
+        background_jobs.ID_KEY: uuid.uuid4().hex,
+        background_jobs.KIND_KEY: "test",
+        background_jobs.STATE_KEY: background_jobs.RUNNING_STATE,
+        background_jobs.HOSTNAME_KEY: hostname,
+        background_jobs.PID_KEY: pid,
+        background_jobs.UPDATED_AT_KEY: heartbeat_at.isoformat(),
+        background_jobs.HEARTBEAT_AT_KEY: heartbeat_at.isoformat()
+    }
+    write_json_atomically(background_jobs._job_path(job[background_jobs.ID_KEY]), job)
+    return job
+
+
+class TestBackgroundJobs:
+
+    def test_job_records_its_progress(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(background_jobs, "JOB_DIRECTORY", str(tmpdir))
+
+        def target(report_progress):
+            for done in range(3):
+                report_progress({"done": done + 1})
+
+        job = background_jobs.start_job("test", {"size": 3}, target)
+        job = wait_for(job[background_jobs.ID_KEY])
+        assert job[background_jobs.STATE_KEY] == background_jobs.SUCCESS_STATE
+        assert job[background_jobs.PROGRESS_KEY] == {"done": 3}
+        assert job[background_jobs.PARAMETERS_KEY] == {"size": 3}
+
+    def test_job_records_its_failure(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(background_jobs, "JOB_DIRECTORY", str(tmpdir))
+
+        def target(report_progress):
+            raise ValueError("broken")
+
+        job = wait_for(background_jobs.start_job("test", {}, target)[background_jobs.ID_KEY])
+        assert job[background_jobs.STATE_KEY] == background_jobs.FAILED_STATE
+        assert job[background_jobs.ERROR_KEY] == "ValueError: broken"
+
+    def test_unknown_job_ids_are_not_read(self):
+        assert background_jobs.get_job("../../etc/passwd") is None
+
+    def test_running_job_without_a_recent_heartbeat_is_reported_failed(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(background_jobs, "JOB_DIRECTORY", str(tmpdir))
+        monkeypatch.setattr(background_jobs, "JOB_HEARTBEAT_TIMEOUT", 60)
+        job = write_running_job("other-host", os.getpid(), timezone.utcnow() - timedelta(seconds=61))
+        assert background_jobs.get_job(job[background_jobs.ID_KEY])[background_jobs.STATE_KEY] == \
+            background_jobs.FAILED_STATE
+        job = write_running_job("other-host", os.getpid(), timezone.utcnow())
+        assert background_jobs.get_job(job[background_jobs.ID_KEY])[background_jobs.STATE_KEY] == \
+            background_jobs.RUNNING_STATE
+
+    def test_running_job_whose_process_is_gone_is_reported_failed(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(background_jobs, "JOB_DIRECTORY", str(tmpdir))
+        process = subprocess.Popen(["true"])
+        process.wait()
+        job = write_running_job(os.uname().nodename, process.pid, timezone.utcnow())
+        job = background_jobs.get_job(job[background_jobs.ID_KEY])
+        assert job[background_jobs.STATE_KEY] == background_jobs.FAILED_STATE
+        assert job[background_jobs.ERROR_KEY] == background_jobs.STOPPED_MESSAGE
+
+    def test_running_job_writes_heartbeats(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(background_jobs, "JOB_DIRECTORY", str(tmpdir))
+        monkeypatch.setattr(background_jobs, "JOB_HEARTBEAT_INTERVAL", 0.01)
+        release = threading.Event()
+        job = background_jobs.start_job("test", {}, lambda report_progress: release.wait(JOB_TIMEOUT))
+        started_heartbeat = isoparse(job[background_jobs.HEARTBEAT_AT_KEY])
+        time.sleep(0.1)
+        assert isoparse(background_jobs.get_job(job[background_jobs.ID_KEY])[background_jobs.HEARTBEAT_AT_KEY]) > \
+            started_heartbeat
+        release.set()
+        assert wait_for(job[background_jobs.ID_KEY])[background_jobs.STATE_KEY] == background_jobs.SUCCESS_STATE
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from airflow.utils import timezone
+
+from airflowapi import change_log
+
+
+@pytest.fixture
+def session(monkeypatch):
+    engine = create_engine("sqlite://")
+    change_log.metadata.create_all(engine)
+    monkeypatch.setattr(change_log, "_table_created", True)
+    monkeypatch.setattr(change_log, "_last_compaction", [None])
+    monkeypatch.setattr(change_log, "CHANGE_LOG_COMMIT_LAG", 0)
+    return sessionmaker(bind=engine)()
+
+
+class TestChangeLog:
+
+    def test_read_changes_returns_the_latest_change_of_each_key(self, session):
+        change_log.record(session, change_log.VARIABLE_KIND, change_log.UPSERTED, ["a", "b"])
+        change_log.record(session, change_log.DAG_KIND, change_log.PAUSED, ["a"])
+        change_log.record(session, change_log.VARIABLE_KIND, change_log.DELETED, ["a"])
+        session.commit()
+
+        entries, last_id, has_more = change_log.read_changes(session, 0, 10)
+
+        assert [(entry.kind, entry.key, entry.action) for entry in entries] == [
+            (change_log.VARIABLE_KIND, "b", change_log.UPSERTED),
+            (change_log.DAG_KIND, "a", change_log.PAUSED),
+            (change_log.VARIABLE_KIND, "a", change_log.DELETED)
+        ]
+        assert last_id == change_log.latest_id(session) == 4
+        assert not has_more
+
+    def test_read_changes_resumes_after_the_last_entry_read(self, session):
+        change_log.record(session, change_log.VARIABLE_KIND, change_log.UPSERTED, ["a", "b", "c"])
+        session.commit()
+
+        entries, last_id, has_more = change_log.read_changes(session, 0, 2)
+        assert [entry.key for entry in entries] == ["a", "b"] and has_more
+        entries, last_id, has_more = change_log.read_changes(session, last_id, 2)
+        assert [entry.key for entry in entries] == ["c"] and not has_more
+        assert change_log.read_changes(session, last_id, 2) == ([], last_id, False)
+
+    def test_the_cursor_stays_before_entries_that_may_not_be_committed(self, session, monkeypatch):
+        monkeypatch.setattr(change_log, "CHANGE_LOG_COMMIT_LAG", 60)
+        change_log.record(session, change_log.VARIABLE_KIND, change_log.UPSERTED, ["settled"])
+        session.commit()
+        now = timezone.utcnow() + timedelta(seconds=61)
+        # Written at `now`, while an entry with a smaller id could still be waiting for its transaction to commit
+        monkeypatch.setattr(timezone, "utcnow", lambda: now)
+        change_log.record(session, change_log.VARIABLE_KIND, change_log.UPSERTED, ["recent", "later"])
+        session.commit()
+
+        entries, next_id, has_more = change_log.read_changes(session, 0, 3, now)
+        assert [entry.key for entry in entries] == ["settled", "recent", "later"]
+        assert next_id == 1 and not has_more
+        assert change_log.latest_id(session, now) == 1
+        entries, next_id, has_more = change_log.read_changes(session, 1, 3, now + timedelta(seconds=61))
+        assert [entry.key for entry in entries] == ["recent", "later"]
+        assert next_id == 3 and not has_more
+        assert change_log.latest_id(session, now + timedelta(seconds=61)) == 3
+
+    def test_the_first_cursor_stays_before_entries_committed_late(self, session, monkeypatch):
+        monkeypatch.setattr(change_log, "CHANGE_LOG_COMMIT_LAG", 60)
+        now = timezone.utcnow()
+
+        def insert(entry_id, key, changed_at):
+            session.execute(change_log.change_log.insert().values(
+                id=entry_id, kind=change_log.VARIABLE_KIND, key=key, action=change_log.UPSERTED, changed_at=changed_at
+            ))
+            session.commit()
+
+        insert(1, "settled", now - timedelta(seconds=120))
+        # Id 2 is taken by a transaction that hasn't committed yet, while id 3 already has
+        insert(3, "committed", now - timedelta(seconds=10))
+        cursor = change_log.latest_id(session, now)
+        assert cursor == 1
+        insert(2, "pending", now - timedelta(seconds=20))
+
+        entries, _, _ = change_log.read_changes(session, cursor, 10, now)
+        assert [entry.key for entry in entries] == ["pending", "committed"]
+
+    def test_old_entries_are_compacted(self, session, monkeypatch):
+        change_log.record(session, change_log.VARIABLE_KIND, change_log.UPSERTED, ["old"])
+        later = timezone.utcnow() + timedelta(seconds=change_log.CHANGE_LOG_RETENTION + 1)
+        monkeypatch.setattr(timezone, "utcnow", lambda: later)
+        monkeypatch.setattr(change_log, "_last_compaction", [None])
+        change_log.record(session, change_log.VARIABLE_KIND, change_log.UPSERTED, ["new"])
+        session.commit()
+
+        assert [entry.key for entry in change_log.read_changes(session, 0, 10)[0]] == ["new"]
+        assert change_log.is_expired(later - timedelta(seconds=change_log.CHANGE_LOG_RETENTION + 1), later)
+        assert not change_log.is_expired(later, later)
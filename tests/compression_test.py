@@ -0,0 +1,23 @@
+import zlib
+
+from werkzeug.datastructures import Accept
+
+from airflowapi.compression import GzipCompressor, compress_chunks, negotiate_encoding, GZIP_ENCODING, GZIP_WBITS
+
+
+class TestCompression:
+
+    def test_compress_chunks_produces_a_single_gzip_stream(self):
+        chunks = ["[", '{"a": 1}', ",", '{"b": 2}', "]"]
+        compressed = b"".join(compress_chunks(chunks, GzipCompressor()))
+        assert zlib.decompress(compressed, GZIP_WBITS) == "".join(chunks).encode("utf-8")
+
+    def test_compress_chunks_emits_data_per_chunk(self):
+        compressed = list(compress_chunks(["a" * 100, "b" * 100], GzipCompressor()))
+        assert len(compressed) == 3
+
+    def test_negotiate_encoding_picks_gzip(self):
+        assert negotiate_encoding(Accept([(GZIP_ENCODING, 1)])) == GZIP_ENCODING
+
+    def test_negotiate_encoding_without_supported_encoding(self):
+        assert negotiate_encoding(Accept([("deflate", 1)])) is None
@@ -0,0 +1,119 @@
+import contextlib
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from airflow.models import DagModel
+
+from airflowapi import dag_index as dag_index_module
+from airflowapi.dag_index import DagIndex
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://")
+    DagModel.__table__.create(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    factory = sessionmaker(bind=engine)
+    factory.statements = statements
+
+    @contextlib.contextmanager
+    def session_scope():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+    monkeypatch.setattr(dag_index_module, "airflow_sql_alchemy_session", session_scope)
+    return factory
+
+
+def add_dag(session_factory, dag_id, is_paused=False):
+    session = session_factory()
+    session.add(DagModel(dag_id=dag_id, is_paused=is_paused, fileloc="/dags/{}.py".format(dag_id)))
+    session.commit()
+    session.close()
+
+
+class TestDagIndex:
+
+    def test_lookups_between_polls_do_not_query(self, session_factory):
+        add_dag(session_factory, "indexed_dag")
+        index = DagIndex(poll_interval=5, max_staleness=60, clock=FakeClock())
+        assert index.get("indexed_dag").fileloc == "/dags/indexed_dag.py"
+        del session_factory.statements[:]
+        assert index.get("indexed_dag").is_paused is False
+        assert session_factory.statements == []
+
+    def test_changes_are_picked_up_after_the_poll_interval(self, session_factory):
+        clock = FakeClock()
+        index = DagIndex(poll_interval=5, max_staleness=60, clock=clock)
+        index.refresh()
+        add_dag(session_factory, "paused_dag", is_paused=True)
+        clock.now = 5
+        index.refresh()
+        del session_factory.statements[:]
+        assert index.get("paused_dag").is_paused is True
+        assert session_factory.statements == []
+
+    def test_missing_dags_are_looked_up(self, session_factory):
+        index = DagIndex(poll_interval=5, max_staleness=60, clock=FakeClock())
+        assert index.get("new_dag") is None
+        add_dag(session_factory, "new_dag")
+        assert index.get("new_dag").dag_id == "new_dag"
+
+    def test_scheduler_parses_do_not_reload_the_index(self, session_factory):
+        add_dag(session_factory, "parsed_dag")
+        clock = FakeClock()
+        index = DagIndex(poll_interval=5, max_staleness=60, clock=clock)
+        index.refresh()
+        session = session_factory()
+        session.query(DagModel).update({DagModel.last_scheduler_run: datetime(2018, 10, 1, tzinfo=timezone.utc)})
+        session.commit()
+        session.close()
+        clock.now = 5
+        del session_factory.statements[:]
+        index.refresh()
+        assert len(session_factory.statements) == 1
+
+    def test_pausing_one_dag_while_unpausing_another_reloads_the_index(self, session_factory):
+        add_dag(session_factory, "short", is_paused=True)
+        add_dag(session_factory, "longer_dag")
+        clock = FakeClock()
+        index = DagIndex(poll_interval=5, max_staleness=60, clock=clock)
+        index.refresh()
+        session = session_factory()
+        session.query(DagModel).filter(DagModel.dag_id == "short").update({DagModel.is_paused: False})
+        session.query(DagModel).filter(DagModel.dag_id == "longer_dag").update({DagModel.is_paused: True})
+        session.commit()
+        session.close()
+        clock.now = 5
+        assert index.get("short").is_paused is False
+        assert index.get("longer_dag").is_paused is True
+
+    def test_replacing_a_dag_by_another_reloads_the_index(self, session_factory):
+        add_dag(session_factory, "a_first")
+        add_dag(session_factory, "m_removed")
+        add_dag(session_factory, "z_last")
+        clock = FakeClock()
+        index = DagIndex(poll_interval=5, max_staleness=60, clock=clock)
+        index.refresh()
+        session = session_factory()
+        session.query(DagModel).filter(DagModel.dag_id == "m_removed").delete()
+        session.commit()
+        session.close()
+        add_dag(session_factory, "m_added_dag")
+        clock.now = 5
+        assert index.get("m_removed") is None
+        assert index.get("m_added_dag").dag_id == "m_added_dag"
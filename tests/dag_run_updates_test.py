@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from airflow.models import DagRun, TaskInstance
+from airflow.utils.state import State
+
+from airflowapi.dag_run_updates import update_dag_runs
+
+START = datetime(2018, 10, 1, tzinfo=timezone.utc)
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    for model in (DagRun, TaskInstance):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    for index in range(5):
+        session.execute(DagRun.__table__.insert().values(
+            dag_id="dag",
+            run_id="run_{}".format(index),
+            execution_date=START + timedelta(days=index),
+            state=State.RUNNING
+        ))
+    for task_id, state in (("running", State.RUNNING), ("done", State.SUCCESS)):
+        session.execute(TaskInstance.__table__.insert().values(
+            task_id=task_id, dag_id="dag", execution_date=START, state=state
+        ))
+    session.commit()
+    return session
+
+
+class TestUpdateDagRuns:
+
+    def test_updates_the_matching_dag_runs_in_batches(self):
+        session = make_session()
+        commits = []
+        commit = session.commit
+        session.commit = lambda: commits.append(commit())
+
+        counts = update_dag_runs(session, [DagRun.execution_date > START], State.FAILED, batch_size=3)
+
+        assert counts == {"dag_run": 4, "task_instance": 0}
+        assert len(commits) == 2
+        rows = session.query(DagRun.run_id, DagRun._state, DagRun.end_date).order_by(DagRun.id).all()
+        assert [state for _, state, _ in rows] == [State.RUNNING] + [State.FAILED] * 4
+        assert rows[0][2] is None and all(end_date is not None for _, _, end_date in rows[1:])
+
+    def test_clearing_resets_task_instances_and_shuts_running_ones_down(self):
+        session = make_session()
+
+        counts = update_dag_runs(session, [DagRun.run_id == "run_0"], State.RUNNING, clear_task_instances=True)
+
+        assert counts == {"dag_run": 1, "task_instance": 2}
+        assert dict(session.query(TaskInstance.task_id, TaskInstance.state)) == {
+            "running": State.SHUTDOWN,
+            "done": None
+        }
+
+    def test_task_instances_succeed_with_their_dag_run(self):
+        session = make_session()
+
+        counts = update_dag_runs(session, [DagRun.run_id == "run_0"], State.SUCCESS)
+
+        assert counts == {"dag_run": 1, "task_instance": 1}
+        assert dict(session.query(TaskInstance.task_id, TaskInstance.state)) == {
+            "running": State.SUCCESS,
+            "done": State.SUCCESS
+        }
+
+    def test_only_unfinished_task_instances_fail_with_their_dag_run(self):
+        session = make_session()
+        session.execute(TaskInstance.__table__.insert().values(
+            task_id="waiting", dag_id="dag", execution_date=START, state=None
+        ))
+        session.commit()
+
+        counts = update_dag_runs(session, [DagRun.run_id == "run_0"], State.FAILED)
+
+        assert counts == {"dag_run": 1, "task_instance": 2}
+        assert dict(session.query(TaskInstance.task_id, TaskInstance.state)) == {
+            "running": State.FAILED,
+            "waiting": State.FAILED,
+            "done": State.SUCCESS
+        }
+
+    def test_task_instances_are_only_cleared_under_running_dag_runs(self):
+        session = make_session()
+
+        with pytest.raises(ValueError):
+            update_dag_runs(session, [DagRun.run_id == "run_0"], State.SUCCESS, clear_task_instances=True)
@@ -0,0 +1,80 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+from airflowapi import dag_structure
+
+DAG_FILE = """
+from datetime import datetime
+from airflow import DAG
+from airflow.operators.dummy_operator import DummyOperator
+
+dag = DAG("structure_dag", start_date=datetime(2018, 10, 1), schedule_interval="{schedule}")
+first = DummyOperator(dag=dag, task_id="first")
+second = DummyOperator(dag=dag, task_id="second")
+first.set_downstream(second)
+"""
+
+
+def write_dag_file(path, schedule):
+    with open(path, "w") as dag_file:
+        dag_file.write(DAG_FILE.format(schedule=schedule))
+
+
+class TestDagStructure:
+
+    def test_to_json_value_converts_dates_and_durations(self):
+        value = {"start_date": datetime(2018, 10, 1), "retry_delay": timedelta(minutes=15), "callback": print}
+        assert dag_structure.to_json_value(value) == {
+            "start_date": "2018-10-01T00:00:00",
+            "retry_delay": 900.0,
+            "callback": repr(print)
+        }
+
+    def test_structure_is_reparsed_only_when_the_file_changes(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(dag_structure, "CACHE_DIRECTORY", str(tmpdir.mkdir("cache")))
+        path = str(tmpdir.join("structure_dag.py"))
+        write_dag_file(path, "@daily")
+        structure = dag_structure.get_dag_structure("structure_dag", path)
+        assert structure[dag_structure.SCHEDULE_INTERVAL_KEY] == "@daily"
+        assert structure[dag_structure.EDGES_KEY] == [{
+            dag_structure.UPSTREAM_TASK_ID_KEY: "first",
+            dag_structure.DOWNSTREAM_TASK_ID_KEY: "second"
+        }]
+
+        parsed = []
+        monkeypatch.setattr(dag_structure, "_parse", lambda fileloc: parsed.append(fileloc) or {})
+        dag_structure._loaded.clear()
+        assert dag_structure.get_dag_structure("structure_dag", path) == structure
+        assert parsed == []
+
+        write_dag_file(path, "@hourly")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert dag_structure.get_dag_structure("structure_dag", path) is None
+        assert parsed == [path]
+
+    def test_structure_is_reparsed_once_stale(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(dag_structure, "CACHE_DIRECTORY", str(tmpdir.mkdir("cache")))
+        monkeypatch.setattr(dag_structure, "MAX_STALENESS", 300)
+        path = str(tmpdir.join("structure_dag.py"))
+        write_dag_file(path, "@daily")
+        parsed = []
+        monkeypatch.setattr(dag_structure, "_parse", lambda fileloc: parsed.append(fileloc) or {"parsed": len(parsed)})
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now)
+        dag_structure._loaded.clear()
+        assert dag_structure.get_dag_structure("parsed", path) == 1
+
+        now += 299
+        assert dag_structure.get_dag_structure("parsed", path) == 1
+        dag_structure._loaded.clear()
+        assert dag_structure.get_dag_structure("parsed", path) == 1
+        now += 1
+        assert dag_structure.get_dag_structure("parsed", path) == 2
+        dag_structure._loaded.clear()
+        assert dag_structure.get_dag_structure("parsed", path) == 2
+        assert parsed == [path, path]
+
+    def test_missing_file_has_no_structure(self, tmpdir):
+        assert dag_structure.get_dag_structure("structure_dag", str(tmpdir.join("missing.py"))) is None
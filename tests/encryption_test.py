@@ -0,0 +1,24 @@
+from cryptography.fernet import Fernet
+
+from airflowapi import encryption
+
+
+class TestEncryption:
+
+    def test_values_round_trip(self):
+        fernet = Fernet(Fernet.generate_key())
+        fernet.is_encrypted = True
+        stored_value, is_encrypted = encryption.encrypt(fernet, "secret")
+        assert is_encrypted
+        assert stored_value != "secret"
+        assert encryption.decrypt(fernet, stored_value, is_encrypted) == "secret"
+
+    def test_empty_values_are_not_encrypted(self):
+        assert encryption.encrypt(Fernet(Fernet.generate_key()), "") == (None, False)
+
+    def test_values_encrypted_with_another_key_decrypt_to_none(self):
+        stored_value = Fernet(Fernet.generate_key()).encrypt(b"secret").decode("utf-8")
+        assert encryption.decrypt(Fernet(Fernet.generate_key()), stored_value, True) is None
+
+    def test_plain_values_are_returned_as_stored(self):
+        assert encryption.decrypt(None, "plain", False) == "plain"
@@ -0,0 +1,56 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from airflowapi import health_checks
+
+
+def failing_probe():
+    raise health_checks.ProbeFailure("Broken", {"detail": 1})
+
+
+class TestHealthChecks:
+
+    def test_probes_report_their_status_and_latency(self):
+        results = health_checks.run_probes([("working", lambda: {"detail": 1}), ("broken", failing_probe)])
+        assert results["working"]["status"] == health_checks.OK_STATUS
+        assert results["broken"] == {"status": health_checks.FAILED_STATUS, "error": "Broken", "detail": 1,
+                                     "latency_ms": results["broken"]["latency_ms"]}
+        assert not health_checks.is_healthy(results)
+
+    def test_unexpected_errors_fail_the_probe(self):
+        result = health_checks.run_probe(lambda: 1 / 0)
+        assert result["status"] == health_checks.FAILED_STATUS
+        assert result["error"].startswith("ZeroDivisionError")
+
+    def test_warnings_leave_the_webserver_healthy(self):
+        def warning_probe():
+            raise health_checks.ProbeWarning("Busy", {})
+
+        results = health_checks.run_probes([("working", lambda: {}), ("busy", warning_probe)])
+        assert results["busy"]["status"] == health_checks.WARNING_STATUS
+        assert results["busy"]["warning"] == "Busy"
+        assert health_checks.is_healthy(results)
+
+    def test_database_probe_does_not_wait_for_an_exhausted_pool(self, monkeypatch, tmpdir):
+        engine = create_engine("sqlite:///{}".format(tmpdir.join("db.sqlite")), poolclass=QueuePool, pool_size=1,
+                               max_overflow=0, pool_timeout=30)
+        monkeypatch.setattr(health_checks.settings, "engine", engine)
+        connection = engine.connect()
+        try:
+            result = health_checks.run_probe(health_checks.check_database)
+        finally:
+            connection.close()
+        assert result["status"] == health_checks.OK_STATUS
+        assert result["latency_ms"] < 5000
+
+    def test_saturated_pool_warns(self, monkeypatch):
+        engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0)
+        monkeypatch.setattr(health_checks.settings, "engine", engine)
+        assert health_checks.run_probe(health_checks.check_pool)["status"] == health_checks.OK_STATUS
+        connection = engine.connect()
+        try:
+            result = health_checks.run_probe(health_checks.check_pool)
+        finally:
+            connection.close()
+        assert result["status"] == health_checks.WARNING_STATUS
+        assert result["saturation"] == 1
@@ -0,0 +1,150 @@
+import hashlib
+import io
+import json
+
+import pytest
+from flask import Flask, Response, request
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from airflow import settings
+
+from airflowapi import idempotency
+from airflowapi.caching import TTLCache
+from airflowapi.constants import CONFLICT_RESPONSE_CODE, JSON_MIME_TYPE, UNPROCESSABLE_ENTITY_RESPONSE_CODE
+from airflowapi.idempotency import IDEMPOTENCY_KEY_HEADER, REPLAYED_HEADER
+
+
+@pytest.fixture
+def app(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    idempotency.metadata.create_all(engine)
+    monkeypatch.setattr(settings, "Session", sessionmaker(bind=engine))
+    monkeypatch.setattr(idempotency, "_table_created", True)
+    monkeypatch.setattr(idempotency, "_last_purge", [None])
+    monkeypatch.setattr(idempotency, "_responses", TTLCache(10, idempotency.IDEMPOTENCY_KEY_TTL))
+
+    app = Flask(__name__)
+    app.calls = []
+
+    @app.route("/things", methods=["POST"])
+    def create_thing():
+        if request.is_json:
+            app.calls.append(request.get_json())
+        elif request.files:
+            app.calls.append({name: upload.read() for name, upload in request.files.items()})
+        else:
+            app.calls.append(request.get_data())
+        status = 503 if app.config.get("FAIL") else 201
+        return Response(json.dumps({"created": len(app.calls)}), status=status, mimetype=JSON_MIME_TYPE)
+
+    app.before_request(idempotency.claim_request)
+    app.after_request(idempotency.store_response)
+    app.teardown_request(idempotency.release_request)
+    return app
+
+
+def post(app, key, body):
+    return app.test_client().post(
+        "/things",
+        data=json.dumps(body),
+        content_type=JSON_MIME_TYPE,
+        headers={IDEMPOTENCY_KEY_HEADER: key}
+    )
+
+
+def upload(app, key, content):
+    # The test client picks a new multipart boundary for every request, like clients retrying an upload do
+    return app.test_client().post(
+        "/things",
+        data={"file": (io.BytesIO(content), "dag.py")},
+        content_type="multipart/form-data",
+        headers={IDEMPOTENCY_KEY_HEADER: key}
+    )
+
+
+def boundary_free_digest(chunks, boundary):
+    digest = hashlib.sha256()
+    idempotency._hash_without_boundary(digest, chunks, boundary)
+    return digest.hexdigest()
+
+
+class TestIdempotency:
+
+    def test_retry_replays_the_stored_response(self, app):
+        first = post(app, "key", {"name": "a"})
+        retry = post(app, "key", {"name": "a"})
+        assert first.status_code == retry.status_code == 201
+        assert retry.get_data() == first.get_data()
+        assert retry.headers[REPLAYED_HEADER] == "true"
+        assert len(app.calls) == 1
+
+    def test_retry_is_replayed_from_the_database_by_other_processes(self, app, monkeypatch):
+        post(app, "key", {"name": "a"})
+        monkeypatch.setattr(idempotency, "_responses", TTLCache(10, idempotency.IDEMPOTENCY_KEY_TTL))
+        retry = post(app, "key", {"name": "a"})
+        assert retry.headers[REPLAYED_HEADER] == "true"
+        assert len(app.calls) == 1
+
+    def test_reusing_a_key_for_a_different_request_is_rejected(self, app):
+        post(app, "key", {"name": "a"})
+        assert post(app, "key", {"name": "b"}).status_code == UNPROCESSABLE_ENTITY_RESPONSE_CODE
+        assert len(app.calls) == 1
+
+    def test_retry_of_a_request_in_progress_is_rejected(self, app):
+        body = {"name": "a"}
+        with app.test_request_context(
+                "/things",
+                method="POST",
+                data=json.dumps(body),
+                content_type=JSON_MIME_TYPE,
+                headers={IDEMPOTENCY_KEY_HEADER: "key"}
+        ):
+            assert idempotency.claim_request() is None
+            assert post(app, "key", body).status_code == CONFLICT_RESPONSE_CODE
+        assert app.calls == []
+
+    def test_responses_asking_for_a_retry_release_the_key(self, app):
+        app.config["FAIL"] = True
+        assert post(app, "key", {"name": "a"}).status_code == 503
+        app.config["FAIL"] = False
+        retry = post(app, "key", {"name": "a"})
+        assert retry.status_code == 201
+        assert REPLAYED_HEADER not in retry.headers
+        assert len(app.calls) == 2
+
+    def test_upload_retries_with_the_same_files_are_replayed(self, app):
+        first = upload(app, "key", b"dag = 1")
+        retry = upload(app, "key", b"dag = 1")
+        assert first.status_code == 201
+        assert retry.headers[REPLAYED_HEADER] == "true"
+        assert app.calls == [{"file": b"dag = 1"}]
+
+    def test_reusing_a_key_for_different_files_is_rejected(self, app):
+        upload(app, "key", b"dag = 1")
+        assert upload(app, "key", b"dag = 2").status_code == UNPROCESSABLE_ENTITY_RESPONSE_CODE
+        assert app.calls == [{"file": b"dag = 1"}]
+
+    def test_streamed_bodies_are_fingerprinted(self, app, monkeypatch):
+        # Spill the body to disk to make sure the handler reads the spooled copy either way
+        monkeypatch.setattr(idempotency, "SPOOLED_BODY_BYTES", 4)
+        client = app.test_client()
+        for line in (b'{"key": "a"}\n', b'{"key": "a"}\n', b'{"key": "b"}\n'):
+            response = client.post(
+                "/things", data=line, content_type="application/x-ndjson", headers={IDEMPOTENCY_KEY_HEADER: "key"}
+            )
+        assert response.status_code == UNPROCESSABLE_ENTITY_RESPONSE_CODE
+        assert app.calls == [b'{"key": "a"}\n']
+
+    def test_boundaries_split_across_chunks_are_ignored(self):
+        body = b"--abc\r\nfile\r\n--abc--"
+        expected = boundary_free_digest([body.replace(b"abc", b"xyz")], b"xyz")
+        assert boundary_free_digest([body], b"abc") == expected
+        assert boundary_free_digest([body[i:i + 1] for i in range(len(body))], b"abc") == expected
+        assert boundary_free_digest([body[:3], body[3:]], b"abc") == expected
+
+    def test_requests_without_a_key_are_always_handled(self, app):
+        client = app.test_client()
+        for _ in range(2):
+            assert client.post("/things", data="{}", content_type=JSON_MIME_TYPE).status_code == 201
+        assert len(app.calls) == 2
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, UniqueConstraint
+
+from airflowapi.index_advisor import index_report
+
+runs = Table(
+    "runs",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("dag_id", String(250)),
+    Column("run_id", String(250)),
+    Column("state", String(50)),
+    Column("execution_date", DateTime),
+    UniqueConstraint("dag_id", "execution_date"),
+    Index("dag_id_state", "dag_id", "state")
+)
+
+
+class TestIndexAdvisor:
+
+    def test_filter_on_a_leading_column_uses_the_longest_matching_index(self):
+        report = index_report(runs, ["dag_id"], ["execution_date"], ["id"])
+        assert report["index"] == "unique (dag_id, execution_date)"
+        assert not report["full_scan"]
+        assert report["sorted_by_index"]
+        assert report["warnings"] == []
+
+    def test_filter_without_a_leading_column_is_a_full_scan(self):
+        report = index_report(runs, ["state"], [], ["execution_date"])
+        assert report["full_scan"]
+        assert not report["sorted_by_index"]
+        assert len(report["warnings"]) == 2
+
+    def test_filters_outside_the_index_are_reported(self):
+        report = index_report(runs, ["dag_id"], ["run_id"], [])
+        assert report["index"] in ("unique (dag_id, execution_date)", "dag_id_state")
+        assert any("run_id" in warning for warning in report["warnings"])
@@ -0,0 +1,37 @@
+import gzip
+
+import pytest
+
+from airflowapi.json_lines import InvalidGzipError, InvalidLineError, gunzip_chunks, iter_lines, iter_objects
+
+
+class TestJsonLines:
+
+    def test_lines_are_split_across_chunks(self):
+        lines = list(iter_lines([b'{"a":', b' 1}\n{"b"', b": 2}\n\n{}"], max_line_bytes=100))
+        assert lines == [(1, b'{"a": 1}'), (2, b'{"b": 2}'), (3, b""), (4, b"{}")]
+
+    def test_long_lines_are_refused(self):
+        with pytest.raises(InvalidLineError) as error:
+            list(iter_lines([b"{}\n", b"x" * 11], max_line_bytes=10))
+        assert error.value.line_number == 2
+
+    def test_gunzip_inflates_in_bounded_chunks(self):
+        data = b"{}\n" * 1000
+        compressed = gzip.compress(data)
+        chunks = list(gunzip_chunks([compressed[:10], compressed[10:]], read_size=100))
+        assert b"".join(chunks) == data
+        assert max(len(chunk) for chunk in chunks) <= 100
+
+    def test_objects_skip_blank_lines_and_reject_other_values(self):
+        assert list(iter_objects([b'{"a": 1}\n\n'], max_line_bytes=100)) == [(1, {"a": 1})]
+        with pytest.raises(InvalidLineError) as error:
+            list(iter_objects([b'{"a": 1}\n[1]'], max_line_bytes=100))
+        assert error.value.line_number == 2
+
+    def test_gunzip_refuses_truncated_or_corrupt_data(self):
+        compressed = gzip.compress(b"{}\n" * 1000)
+        with pytest.raises(InvalidGzipError):
+            list(gunzip_chunks([compressed[:len(compressed) // 2]]))
+        with pytest.raises(InvalidGzipError):
+            list(gunzip_chunks([compressed[:10] + b"corrupt" + compressed[17:]]))
@@ -0,0 +1,54 @@
+import multiprocessing
+
+from airflowapi import parse_stats
+
+
+def record_repeatedly(dag_file, store, times):
+    for attempt in range(times):
+        parse_stats.record({dag_file: [0.1, 1, None, float(attempt)]}, store)
+
+
+class TestParseStats:
+
+    def test_record_merges_and_drops_missing_files(self, tmp_path):
+        store = str(tmp_path / "parse_stats.json")
+        files = [tmp_path / "{}.py".format(name) for name in ("fast", "slow", "removed")]
+        for dag_file in files:
+            dag_file.write_text("")
+        fast, slow, removed = (str(dag_file) for dag_file in files)
+        parse_stats.record({fast: [0.1, 1, None, 1.0], removed: [0.5, 1, None, 1.0]}, store)
+        files[2].unlink()
+        parse_stats.record({slow: [2.0, 0, "boom", 2.0]}, store)
+
+        assert parse_stats.load(store) == {fast: [0.1, 1, None, 1.0], slow: [2.0, 0, "boom", 2.0]}
+        assert parse_stats.slowest(1, store) == [(slow, [2.0, 0, "boom", 2.0])]
+
+    def test_concurrent_processes_keep_each_others_stats(self, tmp_path):
+        store = str(tmp_path / "parse_stats.json")
+        dag_files = [str(tmp_path / "dag_{}.py".format(index)) for index in range(4)]
+        for dag_file in dag_files:
+            open(dag_file, "w").close()
+        processes = [
+            multiprocessing.Process(target=record_repeatedly, args=(dag_file, store, 25)) for dag_file in dag_files
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert all(process.exitcode == 0 for process in processes)
+        assert {dag_file: stats[parse_stats.PARSED_AT] for dag_file, stats in parse_stats.load(store).items()} == {
+            dag_file: 24.0 for dag_file in dag_files
+        }
+
+    def test_stats_dag_bag_records_import_errors(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(parse_stats, "STORE_PATH", str(tmp_path / "parse_stats.json"))
+        broken = tmp_path / "broken.py"
+        broken.write_text("from airflow import DAG\nraise ValueError('boom')\n")
+
+        parse_stats.StatsDagBag(dag_folder=str(tmp_path), include_examples=False)
+
+        stats = parse_stats.load()[str(broken)]
+        assert stats[parse_stats.DAG_COUNT] == 0
+        assert "boom" in stats[parse_stats.IMPORT_ERROR]
+        assert stats[parse_stats.DURATION] >= 0
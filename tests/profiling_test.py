@@ -0,0 +1,38 @@
+import os
+
+from flask import Flask, Response
+
+from airflowapi import authorization, profiling
+from airflowapi.authorization import ADMIN_TOKEN_HEADER
+from airflowapi.profiling import PROFILE_ARTIFACT_HEADER, PROFILE_HEADER, PROFILE_PARAMETER
+
+app = Flask(__name__)
+
+
+def profile(path, headers):
+    with app.test_request_context(path, headers=headers):
+        profiling.start_profiling()
+        return profiling.finish_profiling(Response("ok"))
+
+
+class TestProfiling:
+
+    def test_requests_are_only_profiled_for_admins(self, monkeypatch, tmpdir):
+        monkeypatch.setattr(authorization, "ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(profiling, "PROFILE_DIRECTORY", str(tmpdir))
+        response = profile("/dags?{}=1".format(PROFILE_PARAMETER), {ADMIN_TOKEN_HEADER: "guess"})
+        assert PROFILE_ARTIFACT_HEADER not in response.headers
+        assert os.listdir(str(tmpdir)) == []
+
+    def test_profile_is_stored_and_named_in_a_header(self, monkeypatch, tmpdir):
+        monkeypatch.setattr(authorization, "ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(profiling, "PROFILE_DIRECTORY", str(tmpdir))
+        response = profile("/dags", {ADMIN_TOKEN_HEADER: "secret", PROFILE_HEADER: "1"})
+        assert response.get_data() == b"ok"
+        assert os.listdir(str(tmpdir)) == [response.headers[PROFILE_ARTIFACT_HEADER]]
+
+    def test_profiles_of_one_endpoint_in_the_same_second_are_kept_apart(self, monkeypatch, tmpdir):
+        monkeypatch.setattr(profiling, "PROFILE_DIRECTORY", str(tmpdir))
+        monkeypatch.setattr(profiling.time, "strftime", lambda *args: "20200101T000000")
+        with app.test_request_context("/dags"):
+            assert profiling._artifact_path("pstats") != profiling._artifact_path("pstats")
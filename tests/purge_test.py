@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from airflow.models import DagModel, DagRun, TaskInstance
+from airflow.utils.state import State
+
+from airflowapi import purge
+from airflowapi.purge import delete_in_batches, remove_dag_files, count_dag_runs_before, purge_dag_runs_before, \
+    OUTSIDE_DAGS_FOLDER_REASON, SHARED_FILE_REASON
+
+START = datetime(2018, 10, 1, tzinfo=timezone.utc)
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "row"
+    id = Column(Integer, primary_key=True)
+    dag_id = Column(String(250))
+
+
+class TestPurge:
+
+    def test_delete_in_batches_commits_each_batch(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add_all([Row(dag_id="purged") for _ in range(5)] + [Row(dag_id="kept")])
+        session.commit()
+        commits = []
+        commit = session.commit
+        session.commit = lambda: commits.append(commit())
+
+        deleted = delete_in_batches(session, Row, Row.id, [Row.dag_id == "purged"], batch_size=2)
+
+        assert deleted == 5
+        assert len(commits) == 3
+        assert [row.dag_id for row in session.query(Row)] == ["kept"]
+
+    def test_remove_dag_files_only_removes_files_of_selected_dags_in_the_dags_folder(self, tmpdir):
+        engine = create_engine("sqlite://")
+        DagModel.__table__.create(engine)
+        session = sessionmaker(bind=engine)()
+        dags_folder = tmpdir.mkdir("dags")
+        own, shared, outside = dags_folder.join("own.py"), dags_folder.join("shared.py"), tmpdir.join("outside.py")
+        for path in (own, shared, outside):
+            path.write("")
+        for dag_id, fileloc in (("own", own), ("shared_a", shared), ("shared_b", shared), ("outside", outside)):
+            session.add(DagModel(dag_id=dag_id, fileloc=str(fileloc)))
+        session.commit()
+
+        removed, skipped = remove_dag_files(
+            session,
+            [("own", str(own)), ("shared_a", str(shared)), ("outside", str(outside))],
+            str(dags_folder)
+        )
+
+        assert removed == [str(own)]
+        assert skipped == {
+            str(outside): OUTSIDE_DAGS_FOLDER_REASON,
+            str(shared): SHARED_FILE_REASON.format(dag_ids="shared_b")
+        }
+        assert not own.exists() and shared.exists() and outside.exists()
+
+    def test_purge_dag_rows_batches_execution_dates_one_dag_at_a_time(self, monkeypatch):
+        engine = create_engine("sqlite://")
+        TaskInstance.__table__.create(engine)
+        session = sessionmaker(bind=engine)()
+        for dag_id in ("a", "b"):
+            for day in range(2):
+                session.execute(TaskInstance.__table__.insert().values(
+                    task_id="task", dag_id=dag_id, execution_date=START + timedelta(days=day)
+                ))
+        session.commit()
+        batches = []
+
+        def delete(session, model, batch_column, criteria, batch_size):
+            batches.append(str(criteria[0].compile(compile_kwargs={"literal_binds": True})))
+            return delete_in_batches(session, model, batch_column, criteria, batch_size)
+
+        monkeypatch.setattr(purge, "PURGED_TABLES", [(TaskInstance, TaskInstance.execution_date)])
+        monkeypatch.setattr(purge, "delete_in_batches", delete)
+
+        counts = purge.purge_dag_rows(session, ["a", "b"], batch_size=1)
+
+        assert counts == {"task_instance": 4}
+        assert batches == ["task_instance.dag_id IN ('a')", "task_instance.dag_id IN ('b')"]
+
+    def test_purge_dag_runs_before_keeps_running_and_recent_runs(self):
+        engine = create_engine("sqlite://")
+        for model in purge.DAG_RUN_ROWS + [DagRun]:
+            model.__table__.create(engine)
+        session = sessionmaker(bind=engine)()
+        for day, state in enumerate([State.SUCCESS, None, State.RUNNING, State.FAILED]):
+            execution_date = START + timedelta(days=day)
+            session.execute(DagRun.__table__.insert().values(
+                dag_id="dag", run_id="run_{}".format(day), execution_date=execution_date, state=state
+            ))
+            session.execute(TaskInstance.__table__.insert().values(
+                task_id="task", dag_id="dag", execution_date=execution_date, state=state
+            ))
+        session.commit()
+        cutoff = START + timedelta(days=3)
+        expected = {"dag_run": 2, "task_instance": 2, "xcom": 0}
+
+        assert {table: count for table, count in count_dag_runs_before(session, cutoff).items()
+                if table in expected} == expected
+        progress = []
+        counts = purge_dag_runs_before(session, cutoff, batch_size=1, report_progress=progress.append)
+
+        assert {table: count for table, count in counts.items() if table in expected} == expected
+        assert len(progress) == 2
+        assert sorted(run_id for run_id, in session.query(DagRun.run_id)) == ["run_2", "run_3"]
@@ -0,0 +1,23 @@
+from flask import Flask
+from sqlalchemy import create_engine
+
+from airflowapi.query_tracking import install, start_tracking, current_query_log
+
+
+class TestQueryTracking:
+
+    def test_statements_are_attributed_to_the_tracking_request(self):
+        engine = create_engine("sqlite://")
+        install(engine)
+        with Flask(__name__).test_request_context():
+            query_log = start_tracking(record_statements=True)
+            engine.execute("SELECT 1")
+            assert query_log.count == 1
+            assert query_log.statements[0][0] == "SELECT 1"
+
+    def test_statements_are_ignored_without_tracking(self):
+        engine = create_engine("sqlite://")
+        install(engine)
+        with Flask(__name__).test_request_context():
+            engine.execute("SELECT 1")
+            assert current_query_log() is None
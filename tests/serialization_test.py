@@ -0,0 +1,35 @@
+import json
+from datetime import datetime, timezone
+
+from flask_restplus import Model, fields
+
+from airflowapi.serialization import RowSerializer
+
+model = Model('Test Model', {
+    "name": fields.String,
+    "created": fields.DateTime,
+    "count": fields.Integer
+})
+
+
+class TestRowSerializer:
+
+    def test_to_dict_formats_dates(self):
+        created = datetime(2018, 10, 1, tzinfo=timezone.utc)
+        serializer = RowSerializer(model, ["name", "created", "count"])
+        assert serializer.to_dict(("a", created, 1)) == {"name": "a", "created": created.isoformat(), "count": 1}
+
+    def test_dumps_matches_json_dumps(self):
+        created = datetime(2018, 10, 1, 12, 30, tzinfo=timezone.utc)
+        rows = [("a", created, 1), ("b", None, 2)]
+        serializer = RowSerializer(model, ["name", "created", "count"])
+        assert json.loads(serializer.dumps(rows)) == [serializer.to_dict(row) for row in rows]
+
+    def test_iter_dumps_builds_a_json_array(self):
+        rows = [("a", None, index) for index in range(5)]
+        serializer = RowSerializer(model, ["name", "created", "count"], offset=0)
+        assert json.loads("".join(serializer.iter_dumps(rows, chunk_size=2))) == json.loads(serializer.dumps(rows))
+
+    def test_offset_skips_leading_columns(self):
+        serializer = RowSerializer(model, ["count"], offset=2)
+        assert serializer.to_dict(("ignored", "ignored", 3)) == {"count": 3}
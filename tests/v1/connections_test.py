@@ -0,0 +1,85 @@
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from airflow import settings
+from airflow.models import Connection
+
+from airflowapi import encryption
+from airflowapi.caching import TTLCache
+from airflowapi.v1 import connections
+from airflowapi.v1.connections import query_connections, upsert_connections, MASKED_PASSWORD
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def session(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Connection.__table__.create(engine)
+    monkeypatch.setattr(settings, "Session", sessionmaker(bind=engine))
+    fernet = Fernet(Fernet.generate_key())
+    fernet.is_encrypted = True
+    monkeypatch.setattr(encryption, "get_fernet", lambda: fernet)
+    clock = FakeClock()
+    monkeypatch.setattr(connections, "_connections", TTLCache(maxsize=10, ttl=30, clock=clock))
+    monkeypatch.setattr(connections, "_decrypted_extras", TTLCache(maxsize=10, ttl=30, clock=clock))
+    session = sessionmaker(bind=engine)()
+    session.clock = clock
+    return session
+
+
+def extras(rows):
+    return [(row[0], row[7]) for row in rows]
+
+
+class TestConnections:
+
+    def test_query_connections_decrypts_each_connection_once(self, session, monkeypatch):
+        upsert_connections(session, {"db": {"conn_type": "postgres", "password": "secret", "extra": "{}"}})
+        decrypted = []
+        decrypt = encryption.decrypt
+        monkeypatch.setattr(encryption, "decrypt", lambda *args: decrypted.append(args) or decrypt(*args))
+
+        first = query_connections(session)
+        second = query_connections(session)
+
+        assert first == second
+        assert first[0][5] == MASKED_PASSWORD
+        assert extras(first) == [("db", "{}")]
+        assert len(decrypted) == 1
+
+    def test_upsert_connections_invalidates_the_cached_rows(self, session):
+        upsert_connections(session, {"db": {"conn_type": "postgres", "extra": "old"}})
+        assert connections.get_connection("db")[7] == "old"
+        upsert_connections(session, {"db": {"conn_type": "postgres", "extra": "new"}})
+        assert connections.get_connection("db")[7] == "new"
+
+    def test_listings_see_changes_made_elsewhere_straight_away(self, session):
+        upsert_connections(session, {"db": {"conn_type": "postgres", "host": "old", "extra": "old"}})
+        query_connections(session)
+        extra, is_extra_encrypted = encryption.encrypt(encryption.get_fernet(), "new")
+        session.query(Connection).update({
+            Connection.host: "new",
+            Connection._extra: extra,
+            Connection.is_extra_encrypted: is_extra_encrypted
+        }, synchronize_session=False)
+        session.commit()
+        assert [(row[2], row[7]) for row in query_connections(session)] == [("new", "new")]
+
+    def test_lookups_see_changes_made_elsewhere_once_the_cache_expires(self, session):
+        upsert_connections(session, {"db": {"conn_type": "postgres", "host": "old"}})
+        assert connections.get_connection("db")[2] == "old"
+        session.query(Connection).update({Connection.host: "new"})
+        session.commit()
+        assert connections.get_connection("db")[2] == "old"
+        session.clock.now = 30
+        assert connections.get_connection("db")[2] == "new"
@@ -1,5 +1,27 @@
+import errno
+import json
+import os
 
-from airflowapi.v1.dag_files import check_for_allowed_file
+import pytest
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import HTTPException
+from airflow import settings
+
+from airflowapi.constants import *
+from airflowapi.v1 import dag_files
+from airflowapi.v1.dag_files import check_for_allowed_file, validate_file_for_upload
+
+
+@pytest.fixture
+def dags_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DAGS_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+def uploaded(dags_folder, filename, content):
+    stream = open(str(dags_folder / ".airflow_api_upload_test.tmp"), "xb+")
+    stream.write(content)
+    return FileStorage(stream=stream, filename=filename)
 
 
 class TestDagFiles:
@@ -12,3 +34,62 @@ class TestDagFiles:
 
     def test_check_for_allowed_file_with_no_extension(self):
         assert not check_for_allowed_file('test')
+
+    def test_validate_file_for_upload_rejects_directories(self):
+        assert validate_file_for_upload('test.py') is None
+        assert validate_file_for_upload('') == dag_files.NOT_PROVIDED_MESSAGE
+        assert validate_file_for_upload('../test.py') == dag_files.DIRECTORY_MESSAGE
+        assert validate_file_for_upload('nested/test.py') == dag_files.DIRECTORY_MESSAGE
+        assert validate_file_for_upload('test.txt') == dag_files.IMPROPER_EXTENSION_MESSAGE
+
+    def test_results_of_several_files_are_mapped_by_name(self):
+        response = dag_files._results_response({
+            "stored.py": (POST_RESPONSE_SUCCESS_CODE, None),
+            "existing.py": (CONFLICT_RESPONSE_CODE, dag_files.ALREADY_EXISTS_MESSAGE)
+        }, POST_RESPONSE_SUCCESS_CODE)
+
+        assert response.status_code == MULTI_STATUS_RESPONSE_CODE
+        assert json.loads(response.get_data(as_text=True)) == {
+            "stored.py": {dag_files.STATUS_KEY: POST_RESPONSE_SUCCESS_CODE, dag_files.MESSAGE_KEY: None},
+            "existing.py": {
+                dag_files.STATUS_KEY: CONFLICT_RESPONSE_CODE,
+                dag_files.MESSAGE_KEY: dag_files.ALREADY_EXISTS_MESSAGE
+            }
+        }
+
+    def test_the_result_of_a_single_file_is_the_response(self):
+        assert dag_files._results_response(
+            {"stored.py": (POST_RESPONSE_SUCCESS_CODE, None)}, POST_RESPONSE_SUCCESS_CODE
+        ).status_code == POST_RESPONSE_SUCCESS_CODE
+        with pytest.raises(HTTPException) as error:
+            dag_files._results_response(
+                {"existing.py": (CONFLICT_RESPONSE_CODE, dag_files.ALREADY_EXISTS_MESSAGE)}, POST_RESPONSE_SUCCESS_CODE
+            )
+        assert error.value.code == CONFLICT_RESPONSE_CODE
+
+    def test_uploads_are_copied_without_hard_links(self, dags_folder, monkeypatch):
+        def link(source, destination):
+            raise OSError(errno.EPERM, "Operation not permitted")
+
+        monkeypatch.setattr(os, "link", link)
+        file = uploaded(dags_folder, "dag.py", b"print('dag')")
+
+        assert dag_files._store_file(file, replace=False) == (POST_RESPONSE_SUCCESS_CODE, None)
+        assert (dags_folder / "dag.py").read_bytes() == b"print('dag')"
+        assert dag_files._store_file(file, replace=False) == (CONFLICT_RESPONSE_CODE, dag_files.ALREADY_EXISTS_MESSAGE)
+        file.stream.close()
+
+    def test_deleting_a_file_the_server_may_not_delete_is_forbidden(self, dags_folder, monkeypatch):
+        (dags_folder / "dag.py").write_text("")
+
+        real_unlink = os.unlink
+
+        def unlink(path):
+            if os.path.basename(path) == "dag.py":
+                raise PermissionError(errno.EACCES, "Permission denied")
+            real_unlink(path)
+
+        monkeypatch.setattr(os, "unlink", unlink)
+
+        assert dag_files._delete_file("dag.py") == (FORBIDDEN_RESPONSE_CODE, dag_files.NOT_PERMITTED_MESSAGE)
+        assert dag_files._delete_file("missing.py") == (NOT_FOUND_RESPONSE_CODE, dag_files.NOT_FOUND_MESSAGE)
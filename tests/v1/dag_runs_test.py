@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from werkzeug.exceptions import HTTPException
+from airflow.models import DagRun, TaskInstance
+from airflow.utils.state import State
+
+from airflowapi.constants import BAD_REQUEST_RESPONSE_CODE
+from airflowapi.dag_run_updates import update_dag_runs
+from airflowapi.v1.dag_runs import DAG_ID_KEY, DAG_RUN_IDS_KEY, FILTER_KEY, _update_criteria
+
+RUN_ID = "scheduled__2019-01-01T00:00:00+00:00"
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    for model in (DagRun, TaskInstance):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    for dag_id in ("first", "second"):
+        session.execute(DagRun.__table__.insert().values(
+            dag_id=dag_id,
+            run_id=RUN_ID,
+            execution_date=datetime(2019, 1, 1, tzinfo=timezone.utc),
+            state=State.RUNNING
+        ))
+    session.commit()
+    return session
+
+
+class TestUpdateCriteria:
+
+    def test_run_ids_only_select_the_runs_of_the_filtered_dags(self):
+        session = make_session()
+
+        criteria = _update_criteria({DAG_RUN_IDS_KEY: [RUN_ID], FILTER_KEY: {DAG_ID_KEY: ["first"]}})
+        update_dag_runs(session, criteria, State.FAILED)
+
+        assert dict(session.query(DagRun.dag_id, DagRun._state)) == {"first": State.FAILED, "second": State.RUNNING}
+
+    def test_run_ids_need_a_dag_id_filter(self):
+        with pytest.raises(HTTPException) as error:
+            _update_criteria({DAG_RUN_IDS_KEY: [RUN_ID]})
+        assert error.value.code == BAD_REQUEST_RESPONSE_CODE
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer
+
+from airflowapi.v1.pagination import encode_cursor, decode_cursor, keyset_filter, parse_fields
+
+
+class TestPagination:
+
+    def test_cursor_round_trips_values(self):
+        values = ["my_dag", "task1", datetime(2018, 10, 1, tzinfo=timezone.utc)]
+        assert decode_cursor(encode_cursor(values), len(values)) == values
+
+    def test_parse_fields_defaults_to_all_fields(self):
+        assert parse_fields(None, ["dag_id", "state"]) == ["dag_id", "state"]
+
+    def test_parse_fields_keeps_available_field_order(self):
+        assert parse_fields("state, dag_id", ["dag_id", "task_id", "state"]) == ["dag_id", "state"]
+
+    def test_keyset_filter_compares_the_other_way_when_descending(self):
+        column = Column("id", Integer)
+        assert str(keyset_filter([column], [10], descending=True)) == "id < :id_1"
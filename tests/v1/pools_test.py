@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from airflow.models import Pool
+
+from airflowapi.v1.pools import upsert_pools
+
+
+class TestPools:
+
+    def test_upsert_pools_creates_and_updates(self, tmpdir):
+        engine = create_engine("sqlite:///{}".format(tmpdir.join("db.sqlite")))
+        Pool.__table__.create(engine)
+        session = sessionmaker(bind=engine)()
+        upsert_pools(session, {"a": {"pool": "a", "slots": 1, "description": "first"}})
+        upsert_pools(session, {"a": {"pool": "a", "slots": 2}, "b": {"pool": "b", "slots": 3}})
+        assert sorted((pool.pool, pool.slots, pool.description) for pool in session.query(Pool)) == [
+            ("a", 2, "first"),
+            ("b", 3, None)
+        ]
+
+    def test_pool_created_concurrently_is_a_conflict_that_a_retry_resolves(self, tmpdir):
+        engine = create_engine("sqlite:///{}".format(tmpdir.join("db.sqlite")))
+        Pool.__table__.create(engine)
+        factory = sessionmaker(bind=engine)
+        session = factory()
+        commit = session.commit
+
+        def commit_after_another_request():
+            other_session = factory()
+            other_session.add(Pool(pool="a", slots=1))
+            other_session.commit()
+            other_session.close()
+            session.commit = commit
+            commit()
+
+        session.commit = commit_after_another_request
+        definitions = {"a": {"pool": "a", "slots": 5}}
+        with pytest.raises(IntegrityError):
+            upsert_pools(session, definitions)
+        session.rollback()
+        upsert_pools(session, definitions)
+        assert [(pool.pool, pool.slots) for pool in session.query(Pool)] == [("a", 5)]
@@ -0,0 +1,49 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from airflow import settings
+from airflow.models import Variable
+
+from airflowapi import change_log
+from airflowapi.constants import BAD_REQUEST_RESPONSE_CODE, POST_RESPONSE_SUCCESS_CODE
+from airflowapi.json_lines import dumps_line
+from airflowapi.v1.api_blueprint import blueprint
+
+IMPORT_URL = "/api/v1/variables/_import"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Variable.__table__.create(engine)
+    change_log.metadata.create_all(engine)
+    monkeypatch.setattr(change_log, "_table_created", True)
+    monkeypatch.setattr(settings, "Session", sessionmaker(bind=engine))
+    app = Flask("airflowapi")
+    app.register_blueprint(blueprint)
+    return app.test_client()
+
+
+def gzipped_lines(count):
+    return gzip.compress("".join(dumps_line({"name": "var_{}".format(index), "value": index}) for index in range(count))
+                         .encode("utf-8"))
+
+
+class TestImportVariables:
+
+    def test_gzipped_import(self, client):
+        response = client.post(IMPORT_URL, data=gzipped_lines(3), content_type="application/gzip")
+        assert response.status_code == POST_RESPONSE_SUCCESS_CODE
+        assert json.loads(response.get_data(as_text=True))["imported"] == 3
+
+    def test_truncated_or_corrupt_gzip_is_a_bad_request(self, client):
+        compressed = gzipped_lines(100)
+        for body in (compressed[:len(compressed) // 2], compressed[:10] + b"corrupt" + compressed[17:]):
+            response = client.post(IMPORT_URL, data=body, content_type="application/gzip")
+            assert response.status_code == BAD_REQUEST_RESPONSE_CODE
+            assert "gzipped data" in json.loads(response.get_data(as_text=True))["message"]
@@ -0,0 +1,17 @@
+import base64
+import json
+import pickle
+
+from airflowapi.v1.xcoms import encode_value, JSON_ENCODING, PICKLE_ENCODING
+
+
+class TestXComs:
+
+    def test_json_values_are_decoded(self):
+        assert encode_value(json.dumps({"a": [1, 2]}).encode("utf-8")) == (JSON_ENCODING, {"a": [1, 2]})
+
+    def test_pickled_values_are_returned_base64_encoded(self):
+        value = pickle.dumps({1, 2})
+        encoding, encoded = encode_value(value)
+        assert encoding == PICKLE_ENCODING
+        assert base64.b64decode(encoded) == value
@@ -0,0 +1,54 @@
+import pytest
+from flask_restplus import Model, fields
+from jsonschema import Draft4Validator
+from werkzeug.exceptions import BadRequest
+
+from airflowapi.validation import PayloadValidator, VALIDATION_FAILED_MESSAGE
+
+model = Model('Test Body', {
+    "name": fields.String(required=True),
+    "enabled": fields.Boolean(required=True, default=False),
+    "slots": fields.Integer(min=0),
+    "created": fields.DateTime
+})
+
+PAYLOADS = [
+    {"name": "a", "enabled": True},
+    {"name": "a", "enabled": False, "slots": 3, "created": "2018-10-01T00:00:00+00:00", "other": [1]},
+    {"name": "a", "enabled": False, "created": "not a date"},
+    {"name": "a"},
+    {"name": 1, "enabled": True},
+    {"name": "a", "enabled": 1},
+    {"name": "a", "enabled": True, "slots": True},
+    {"name": "a", "enabled": True, "slots": 1.0},
+    {"name": "a", "enabled": True, "slots": -1},
+    {"name": None, "enabled": None},
+    [],
+    "a",
+    None
+]
+
+
+class TestPayloadValidator:
+
+    @pytest.mark.parametrize("payload", PAYLOADS)
+    def test_agrees_with_jsonschema(self, payload):
+        assert PayloadValidator(model).is_valid(payload) == Draft4Validator(model.__schema__).is_valid(payload)
+
+    def test_flat_models_are_compiled(self):
+        validator = PayloadValidator(model)
+        assert validator.is_valid != validator.validator.is_valid
+
+    def test_errors_match_flask_restplus(self):
+        with pytest.raises(BadRequest) as validated:
+            PayloadValidator(model).validate([{"name": "a", "enabled": True}, {"slots": -1}], collection=True)
+        with pytest.raises(BadRequest) as restplus_validated:
+            model.validate({"slots": -1})
+        assert validated.value.data["message"] == VALIDATION_FAILED_MESSAGE
+        assert validated.value.data == restplus_validated.value.data
+        assert set(validated.value.data["errors"]) == {"name", "enabled", "slots"}
+
+    def test_collection_payloads_may_be_a_single_object(self):
+        PayloadValidator(model).validate({"name": "a", "enabled": True}, collection=True)
+        with pytest.raises(BadRequest):
+            PayloadValidator(model).validate({"name": "a"}, collection=True)